@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fan-out Scaling Benchmark
+Büyük bir odada broadcast dağıtımının fan-out worker sayısıyla ölçeklenmesini ölçer
+
+Loopback üzerinde gerçek TCP bağlantıları kurulur ve her worker sayısı için
+aynı broadcast serisi gönderilir. Süre, son byte'ın karşı uçta okunmasına
+kadar ölçülür (fan-out ve yazma birleştirme kuyrukları dahil); 'submit' süresi
+broadcast eden thread'in ne kadar meşgul kaldığıdır. 0 worker, broadcast eden
+thread'in tüm alıcıları kendisinin dolaştığı yoldur.
+
+CPython'da Python kodu GIL altında çalışır; standart build'de worker'lar
+arasında paralel yürüyen kısım send syscall'larıdır. Çekirdek sayısıyla tam
+ölçeklenme free-threaded build'de (python3.13t) görülür; rapor çekirdek
+sayısını ve GIL durumunu yazar.
+
+Kullanım:
+    python -m bench.fanout                                   # 2000 client, 0/1/2/4/8 worker
+    python -m bench.fanout --clients 10000 --workers 0,4,8,16 --messages 20
+    python -m bench.fanout --coalesce 0.002 --output fanout.json
+"""
+
+import argparse
+import json
+import os
+import selectors
+import socket
+import sys
+import tempfile
+import threading
+import time
+from common.config import MESSAGE_TYPE_PUBLIC
+from common.protocol import Message, encode_message
+from server.chat_server import ChatServer
+from server.client_handler import ClientHandler
+
+
+def raise_fd_limit():
+    """Açık dosya limitini hard limite çek (binlerce socket için)"""
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if hard == resource.RLIM_INFINITY or hard > soft:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    except (ImportError, ValueError, OSError):
+        pass
+
+
+def gil_enabled():
+    """Free-threaded build'de (3.13t) GIL kapalı olabilir"""
+    check = getattr(sys, '_is_gil_enabled', None)
+    return check() if check else True
+
+
+def tcp_pairs(count):
+    """Loopback üzerinde count adet bağlı (server ucu, client ucu) TCP çifti"""
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(min(count, 4096))
+    pairs = []
+    for _ in range(count):
+        peer = socket.create_connection(listener.getsockname())
+        sock, _ = listener.accept()
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        peer.setblocking(False)
+        pairs.append((sock, peer))
+    listener.close()
+    return pairs
+
+
+class Drainer:
+    """Client uçlarını tek thread'de okuyan ve gelen byte'ları sayan alıcı"""
+    
+    def __init__(self, peers):
+        self.selector = selectors.DefaultSelector()
+        for peer in peers:
+            self.selector.register(peer, selectors.EVENT_READ)
+        self.received = 0
+        self.target = 0
+        self.done = threading.Event()
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True, name='drainer')
+        self.thread.start()
+    
+    def expect(self, total):
+        """Sayacı sıfırla, total byte okununca done set edilir"""
+        self.received = 0
+        self.target = total
+        self.done.clear()
+    
+    def stop(self):
+        self.running = False
+        self.thread.join(2)
+        self.selector.close()
+    
+    def _run(self):
+        while self.running:
+            for key, _ in self.selector.select(0.1):
+                try:
+                    while True:
+                        data = key.fileobj.recv(262144)
+                        if not data:
+                            break
+                        self.received += len(data)
+                except BlockingIOError:
+                    pass
+            if self.target and self.received >= self.target:
+                self.done.set()
+
+
+def run_case(pairs, drainer, workers, messages, coalesce, timeout):
+    """Tek bir worker sayısını ölç"""
+    server = ChatServer(port=0, http_port=0, ws_port=0,
+                        write_coalesce_delay=coalesce, fanout_workers=workers)
+    for i, (sock, _) in enumerate(pairs):
+        handler = ClientHandler(sock, ('127.0.0.1', 40000 + i), server)
+        handler.nickname = f"user{i}"
+        server.clients[handler.nickname] = handler
+        if server.fanout:
+            server.fanout.add(handler)
+    if server.fanout:
+        server.fanout.start()
+        server.fanout.wait_idle()
+    
+    message = Message(MESSAGE_TYPE_PUBLIC, sender='alice', content='Merhaba, nasılsınız? ' * 3)
+    drainer.expect(len(pairs) * messages * len(encode_message(message)))
+    
+    started = time.perf_counter()
+    for _ in range(messages):
+        server.broadcast_message(message)
+    submitted = time.perf_counter()
+    delivered = drainer.done.wait(timeout)
+    elapsed = time.perf_counter() - started
+    
+    if server.fanout:
+        server.fanout.stop()
+    server.write_flusher.stop()
+    
+    deliveries = len(pairs) * messages
+    fan_out = server.latency['fan_out'].summary()
+    return {
+        'workers': workers,
+        'delivered': delivered,
+        'elapsed_ms': round(elapsed * 1000, 1),
+        'submit_ms': round((submitted - started) * 1000, 1),
+        'deliveries_per_sec': round(deliveries / elapsed),
+        'fan_out_p99_ms': round(fan_out[0.99] / 1e6, 2),
+    }
+
+
+def main(argv=None):
+    """Ana fonksiyon"""
+    parser = argparse.ArgumentParser(description='Broadcast fan-out scaling benchmark')
+    parser.add_argument('--clients', type=int, default=2000,
+                       help='Connected recipients (default: 2000)')
+    parser.add_argument('--messages', type=int, default=50,
+                       help='Broadcasts per case (default: 50)')
+    parser.add_argument('--workers', type=str, default='0,1,2,4,8',
+                       help='Comma separated worker counts, 0 = inline (default: 0,1,2,4,8)')
+    parser.add_argument('--coalesce', type=float, default=0.0,
+                       help='Write coalescing delay in seconds (default: 0, one send per frame)')
+    parser.add_argument('--repeat', type=int, default=3,
+                       help='Runs per case, the fastest is reported (default: 3)')
+    parser.add_argument('--timeout', type=float, default=60.0,
+                       help='Seconds to wait for delivery per run (default: 60)')
+    parser.add_argument('--output', type=str, default=None,
+                       help='Write the JSON report to this file')
+    
+    args = parser.parse_args(argv)
+    worker_counts = [int(w) for w in args.workers.split(',')]
+    
+    raise_fd_limit()
+    print(f"🧪 {args.clients} clients x {args.messages} broadcasts, "
+          f"{os.cpu_count()} CPU(s), GIL {'enabled' if gil_enabled() else 'disabled'}, "
+          f"coalesce {args.coalesce:g}s")
+    
+    pairs = tcp_pairs(args.clients)
+    drainer = Drainer([peer for _, peer in pairs])
+    results = []
+    
+    # ChatServer log/index dosyalarını cwd'ye yazar, geçici dizinde kur
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            for workers in worker_counts:
+                runs = [run_case(pairs, drainer, workers, args.messages, args.coalesce,
+                                 args.timeout) for _ in range(args.repeat)]
+                result = min(runs, key=lambda run: run['elapsed_ms'])
+                results.append(result)
+        finally:
+            os.chdir(cwd)
+            drainer.stop()
+            for sock, peer in pairs:
+                sock.close()
+                peer.close()
+    
+    base = results[0]['elapsed_ms']
+    print(f"\n{'WORKERS':>7} {'ELAPSED':>10} {'SUBMIT':>9} {'DELIVERIES/S':>13} "
+          f"{'FAN-OUT P99':>12} {'SPEEDUP':>8}")
+    for result in results:
+        result['speedup'] = round(base / result['elapsed_ms'], 2)
+        mark = '' if result['delivered'] else '  ⚠️ timed out'
+        print(f"{result['workers']:>7} {result['elapsed_ms']:>8.1f}ms {result['submit_ms']:>7.1f}ms "
+              f"{result['deliveries_per_sec']:>13,} {result['fan_out_p99_ms']:>10.2f}ms "
+              f"{result['speedup']:>7.2f}x{mark}")
+    
+    if args.output:
+        report = {
+            'clients': args.clients,
+            'messages': args.messages,
+            'coalesce': args.coalesce,
+            'cpus': os.cpu_count(),
+            'gil': gil_enabled(),
+            'python': sys.version.split()[0],
+            'results': results,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
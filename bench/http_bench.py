@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP Benchmark
+Dashboard web server'ını eşzamanlı poll eden client'larla ölçer
+
+Kullanım:
+    python -m bench.http_bench --pollers 12 --duration 5
+"""
+
+import argparse
+import http.client
+import json
+import threading
+import time
+from server.web_server import WebServer
+
+
+ENDPOINTS = ('/api/stats', '/api/users', '/api/logs')
+
+
+def percentile(sorted_values, pct):
+    """Sıralı listeden yüzdelik değer"""
+    if not sorted_values:
+        return 0.0
+    index = min(int(len(sorted_values) * pct / 100), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def poller(port, keep_alive, deadline, latencies, errors):
+    """Bir dashboard gibi endpoint'leri sürekli çek"""
+    conn = None
+    i = 0
+    while time.perf_counter() < deadline:
+        path = ENDPOINTS[i % len(ENDPOINTS)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            if conn is None:
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+            headers = {} if keep_alive else {'Connection': 'close'}
+            conn.request('GET', path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if not keep_alive or response.will_close:
+                conn.close()
+                conn = None
+        except (OSError, http.client.HTTPException):
+            errors.append(path)
+            if conn:
+                conn.close()
+            conn = None
+            continue
+        latencies.append(time.perf_counter() - started)
+    
+    if conn:
+        conn.close()
+
+
+def run_case(threaded, keep_alive, pollers, duration):
+    """Tek bir engine/bağlantı kombinasyonunu ölç"""
+    web = WebServer(port=0, threaded=threaded)
+    web.start()
+    port = web.server.server_address[1]
+    
+    latencies = []
+    errors = []
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=poller, args=(port, keep_alive, deadline, latencies, errors),
+                         daemon=True)
+        for _ in range(pollers)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(duration + 15)
+    
+    web.stop()
+    
+    latencies.sort()
+    return {
+        'engine': 'threaded' if threaded else 'single',
+        'keep_alive': keep_alive,
+        'pollers': pollers,
+        'requests': len(latencies),
+        'errors': len(errors),
+        'requests_per_sec': round(len(latencies) / duration, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'max_ms': round(latencies[-1] * 1000, 3) if latencies else 0.0
+    }
+
+
+def main(argv=None):
+    """Ana fonksiyon"""
+    parser = argparse.ArgumentParser(description='Dashboard HTTP benchmark')
+    parser.add_argument('--pollers', type=int, default=12,
+                       help='Concurrent dashboard pollers (default: 12)')
+    parser.add_argument('--duration', type=float, default=5.0,
+                       help='Seconds per case (default: 5)')
+    parser.add_argument('--output', type=str, default=None,
+                       help='Write JSON results to this file')
+    
+    args = parser.parse_args(argv)
+    
+    # Eski davranış (tek thread, her istekte yeni bağlantı) ve yeni engine
+    cases = [(False, False), (True, False), (True, True)]
+    results = []
+    for threaded, keep_alive in cases:
+        result = run_case(threaded, keep_alive, args.pollers, args.duration)
+        results.append(result)
+        print(f"{result['engine']:>8} keep_alive={str(keep_alive):<5} "
+              f"{result['requests_per_sec']:>9} req/s  p50={result['p50_ms']}ms "
+              f"p99={result['p99_ms']}ms  errors={result['errors']}")
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Impairment Proxy
+Client'larla server arasına giren, bağlantı başına gecikme, bant genişliği
+sınırı, okuma durması ve ani reset uygulayan TCP proxy
+
+Durdurulmuş okuma (stall) server -> client yönünde uygulanır: proxy server'dan
+okumayı bırakır, server'ın socket buffer'ı dolar ve sendall bloklanır; yani
+yavaş bir tüketicinin server'a etkisi birebir üretilir. Proxy kendi içinde de
+en fazla --buffer byte tutar, fazlası backpressure olarak server'a yansır.
+
+Kullanım:
+    python -m bench.impair_proxy --listen 7000 --target 127.0.0.1:5000 --latency 80 --jitter 20
+    python -m bench.impair_proxy --listen 7000 --bandwidth 2048 --fraction 0.1
+    python -m bench.impair_proxy --listen 7000 --stall-after 5 --stall-for 0     # hiç okumayan client
+    python -m bench.impair_proxy --listen 7000 --reset-after 10 --fraction 0.05
+    
+    # Yük testinde client'ların %10'unu proxy'den geçir
+    python -m bench.loadgen --port 5000 --impaired 0.1 --proxy-port 7000
+"""
+
+import argparse
+import asyncio
+import itertools
+import random
+import socket
+import struct
+import sys
+import time
+from common.config import SERVER_HOST, SERVER_PORT
+
+
+CHUNK_SIZE = 4096
+
+
+class Impairment:
+    """Bir bağlantıya uygulanacak bozulmalar (0/None = kapalı)"""
+    
+    def __init__(self, latency=0.0, jitter=0.0, bandwidth=0, stall_after=None,
+                 stall_for=0.0, stall_every=0.0, reset_after=None, buffer=64 * 1024):
+        self.latency = latency          # saniye, her iki yön
+        self.jitter = jitter            # saniye, +/- rastgele (sıra korunur)
+        self.bandwidth = bandwidth      # byte/s, server -> client
+        self.stall_after = stall_after  # saniye - bağlantıdan sonra okumayı durdur
+        self.stall_for = stall_for      # saniye - 0 ise sonsuza kadar
+        self.stall_every = stall_every  # saniye - durmayı bu periyotla tekrarla (0 = bir kez)
+        self.reset_after = reset_after  # saniye - bağlantıyı RST ile kes
+        self.buffer = buffer            # proxy'nin yön başına tuttuğu en fazla byte
+    
+    def is_stalled(self, elapsed):
+        """Bağlantı açıldıktan elapsed saniye sonra okuma durmuş mu?"""
+        if self.stall_after is None or elapsed < self.stall_after:
+            return False
+        if not self.stall_for:
+            return True
+        since = elapsed - self.stall_after
+        if self.stall_every:
+            since %= self.stall_every
+        elif since >= self.stall_for:
+            return False
+        return since < self.stall_for
+    
+    def describe(self):
+        parts = []
+        if self.latency or self.jitter:
+            parts.append(f"latency {self.latency * 1000:.0f}±{self.jitter * 1000:.0f}ms")
+        if self.bandwidth:
+            parts.append(f"bandwidth {self.bandwidth}B/s")
+        if self.stall_after is not None:
+            duration = f"{self.stall_for:g}s" if self.stall_for else 'forever'
+            repeat = f" every {self.stall_every:g}s" if self.stall_every else ''
+            parts.append(f"stall after {self.stall_after:g}s for {duration}{repeat}")
+        if self.reset_after is not None:
+            parts.append(f"reset after {self.reset_after:g}s")
+        return ', '.join(parts) or 'none'
+
+
+class ImpairmentProxy:
+    """asyncio tabanlı proxy; bağlantıların fraction kadarı bozulur, kalanı aynen geçer"""
+    
+    def __init__(self, listen_host, listen_port, target_host, target_port,
+                 impairment, fraction=1.0, seed=1):
+        self.listen_host = listen_host
+        self.listen_port = listen_port
+        self.target_host = target_host
+        self.target_port = target_port
+        self.impairment = impairment
+        self.fraction = fraction
+        self.rng = random.Random(seed)
+        self.counter = itertools.count()
+        self.server = None
+        self.stats = dict.fromkeys(('connections', 'impaired', 'active', 'bytes_up',
+                                    'bytes_down', 'stalls', 'resets', 'errors'), 0)
+    
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, self.listen_host,
+                                                 self.listen_port)
+        return self.server
+    
+    def _is_impaired(self, index):
+        """Bağlantı sırasına göre eşit dağılım: fraction=0.1 -> her 10 bağlantıdan biri"""
+        return int((index + 1) * self.fraction) > int(index * self.fraction)
+    
+    async def _handle(self, client_reader, client_writer):
+        index = next(self.counter)
+        impairment = self.impairment if self._is_impaired(index) else None
+        self.stats['connections'] += 1
+        self.stats['impaired'] += impairment is not None
+        
+        try:
+            server_reader, server_writer = await asyncio.open_connection(
+                self.target_host, self.target_port)
+        except OSError:
+            self.stats['errors'] += 1
+            client_writer.close()
+            return
+        
+        self.stats['active'] += 1
+        opened = time.monotonic()
+        tasks = [
+            asyncio.ensure_future(self._pipe(client_reader, server_writer, impairment,
+                                             opened, 'bytes_up', downstream=False)),
+            asyncio.ensure_future(self._pipe(server_reader, client_writer, impairment,
+                                             opened, 'bytes_down', downstream=True)),
+        ]
+        if impairment and impairment.reset_after is not None:
+            tasks.append(asyncio.ensure_future(
+                self._reset_later(impairment.reset_after, client_writer, server_writer)))
+        
+        # Bir yön kapanınca diğerini de kapat
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in tasks:
+            task.cancel()
+        for writer in (client_writer, server_writer):
+            writer.close()
+        self.stats['active'] -= 1
+    
+    async def _pipe(self, reader, writer, impairment, opened, counter, downstream):
+        """
+        Bir yönü aktar: okuyucu gecikme zamanıyla kuyruğa koyar, yazıcı zamanı
+        gelince (ve bant genişliği izin verince) yazar; kuyruk dolarsa okuma durur
+        """
+        if impairment is None:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    return
+                self.stats[counter] += len(data)
+                writer.write(data)
+                await writer.drain()
+        
+        queue = asyncio.Queue(maxsize=max(1, impairment.buffer // CHUNK_SIZE))
+        
+        async def deliver():
+            while True:
+                deliver_at, data = await queue.get()
+                if data is None:
+                    return
+                delay = deliver_at - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                writer.write(data)
+                await writer.drain()
+                self.stats[counter] += len(data)
+                if downstream and impairment.bandwidth:
+                    await asyncio.sleep(len(data) / impairment.bandwidth)
+        
+        writer_task = asyncio.ensure_future(deliver())
+        last_delivery = 0.0
+        stalled = False
+        try:
+            while not writer_task.done():
+                if downstream:
+                    now_stalled = impairment.is_stalled(time.monotonic() - opened)
+                    if now_stalled and not stalled:
+                        self.stats['stalls'] += 1
+                    stalled = now_stalled
+                    if stalled:
+                        await asyncio.sleep(0.05)
+                        continue
+                
+                data = await reader.read(CHUNK_SIZE)
+                if not data:
+                    await queue.put((0, None))
+                    await writer_task
+                    return
+                
+                delay = impairment.latency
+                if impairment.jitter:
+                    delay += self.rng.uniform(-impairment.jitter, impairment.jitter)
+                # TCP sırası korunur: jitter bir önceki parçanın önüne geçiremez
+                last_delivery = max(last_delivery, time.monotonic() + max(delay, 0))
+                await queue.put((last_delivery, data))
+        finally:
+            writer_task.cancel()
+    
+    async def _reset_later(self, seconds, *writers):
+        """Süre dolunca iki tarafa da RST gönder"""
+        await asyncio.sleep(seconds)
+        self.stats['resets'] += 1
+        for writer in writers:
+            sock = writer.get_extra_info('socket')
+            if sock is not None:
+                try:
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+                except OSError:
+                    pass
+            writer.transport.abort()
+
+
+def parse_target(text):
+    """'host:port' veya 'port'"""
+    host, _, port = text.rpartition(':')
+    return host or SERVER_HOST, int(port)
+
+
+async def run(proxy, report_interval):
+    """Proxy'yi başlat ve periyodik özet yazdır"""
+    server = await proxy.start()
+    async with server:
+        while True:
+            await asyncio.sleep(report_interval)
+            if report_interval:
+                print(f"📊 {proxy.stats}", flush=True)
+
+
+def main(argv=None):
+    """Ana fonksiyon"""
+    parser = argparse.ArgumentParser(description='TCP impairment proxy for the chat server')
+    parser.add_argument('--listen', type=str, default='7000',
+                       help='Listen address, host:port or port (default: 7000)')
+    parser.add_argument('--target', type=str, default=f"{SERVER_HOST}:{SERVER_PORT}",
+                       help=f'Chat server address (default: {SERVER_HOST}:{SERVER_PORT})')
+    parser.add_argument('--latency', type=float, default=0.0,
+                       help='Added one-way latency in ms, both directions')
+    parser.add_argument('--jitter', type=float, default=0.0,
+                       help='Latency jitter in ms (order is preserved)')
+    parser.add_argument('--bandwidth', type=int, default=0,
+                       help='Server-to-client bandwidth cap in bytes/s (0 = unlimited)')
+    parser.add_argument('--stall-after', type=float, default=None,
+                       help='Stop reading from the server this many seconds after connect')
+    parser.add_argument('--stall-for', type=float, default=0.0,
+                       help='Stall duration in seconds (0 = never resume)')
+    parser.add_argument('--stall-every', type=float, default=0.0,
+                       help='Repeat the stall with this period in seconds')
+    parser.add_argument('--reset-after', type=float, default=None,
+                       help='Abruptly reset the connection after this many seconds')
+    parser.add_argument('--buffer', type=int, default=64 * 1024,
+                       help='Bytes the proxy buffers per direction (default: 65536)')
+    parser.add_argument('--fraction', type=float, default=1.0,
+                       help='Share of connections to impair, the rest pass through (default: 1)')
+    parser.add_argument('--seed', type=int, default=1,
+                       help='Jitter random seed (default: 1)')
+    parser.add_argument('--report-interval', type=float, default=5.0,
+                       help='Seconds between stats lines (default: 5)')
+    
+    args = parser.parse_args(argv)
+    
+    impairment = Impairment(
+        latency=args.latency / 1000, jitter=args.jitter / 1000, bandwidth=args.bandwidth,
+        stall_after=args.stall_after, stall_for=args.stall_for, stall_every=args.stall_every,
+        reset_after=args.reset_after, buffer=args.buffer)
+    listen_host, listen_port = parse_target(args.listen)
+    target_host, target_port = parse_target(args.target)
+    proxy = ImpairmentProxy(listen_host, listen_port, target_host, target_port,
+                            impairment, fraction=args.fraction, seed=args.seed)
+    
+    print(f"🐢 Proxy {listen_host}:{listen_port} -> {target_host}:{target_port}, "
+          f"{args.fraction:.0%} of connections impaired: {impairment.describe()}")
+    try:
+        asyncio.run(run(proxy, args.report_interval))
+    except KeyboardInterrupt:
+        print(f"\n📊 {proxy.stats}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,644 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Load Generator
+Gerçek protokolü konuşan binlerce simüle client ile chat server'ın
+throughput ve uçtan uca teslim gecikmesini ölçer
+
+Her client asyncio ile çalışır; --processes ile client'lar birden çok
+process'e bölünür (tek process'in CPU'su client tarafında darboğaz olmasın diye).
+Gönderilen mesajın içeriğine gönderim zamanı gömülür, alıcı taraf teslim
+gecikmesini aynı monotonic saatle (loopback) hesaplar.
+
+Kullanım:
+    python -m bench.loadgen --spawn --clients 500 --duration 20
+    python -m bench.loadgen --port 5000 --clients 2000 --processes 4 --mix burst
+    python -m bench.loadgen --spawn --mix public=0.5,private=0.3,rejoin=0.2 --output report.json
+    python -m bench.loadgen --spawn --impaired 0.05 --proxy-args "--bandwidth 1024"
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import shlex
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from common.config import (
+    SERVER_HOST, SERVER_PORT, MUTE_DURATION,
+    MESSAGE_TYPE_PUBLIC, MESSAGE_TYPE_PRIVATE, MESSAGE_TYPE_SYSTEM,
+    MESSAGE_TYPE_WARNING, MESSAGE_TYPE_MUTE, MESSAGE_TYPE_KICK
+)
+from common.protocol import encode_message
+from server.latency import LatencyHistogram
+
+
+# Hazır mesaj karışımları: eylem -> ağırlık
+#   public  - herkese mesaj
+#   private - aynı process'teki rastgele bir client'a özel mesaj
+#   rejoin  - bağlantıyı kapatıp yeniden katıl (JOIN/LEAVE/USER_LIST trafiği)
+#   burst   - art arda --burst-size mesaj (rate limit'i tetikler)
+MIXES = {
+    'chat': {'public': 0.8, 'private': 0.2},
+    'churn': {'public': 0.6, 'private': 0.2, 'rejoin': 0.2},
+    'burst': {'public': 0.7, 'private': 0.1, 'burst': 0.2},
+    'mixed': {'public': 0.6, 'private': 0.2, 'rejoin': 0.1, 'burst': 0.1},
+}
+
+ACTIONS = ('public', 'private', 'rejoin', 'burst')
+
+# Ölçüm mesajlarının içeriği: "lg <process> <gönderim ns> <dolgu>"
+TAG = 'lg'
+
+READ_LIMIT = 1 << 22    # binlerce kullanıcılı USER_LIST satırları için
+
+
+def parse_mix(text):
+    """Hazır karışım adı veya 'public=0.7,private=0.3' biçimi -> {eylem: ağırlık}"""
+    if text in MIXES:
+        return dict(MIXES[text])
+    
+    mix = {}
+    for part in text.split(','):
+        action, _, weight = part.partition('=')
+        action = action.strip()
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown action '{action}' (expected one of {', '.join(ACTIONS)})")
+        mix[action] = float(weight)
+    if sum(mix.values()) <= 0:
+        raise ValueError("Mix weights must add up to a positive number")
+    return mix
+
+
+def raise_fd_limit():
+    """Açık dosya limitini hard limite çek (binlerce socket için)"""
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if hard == resource.RLIM_INFINITY or hard > soft:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    except (ImportError, ValueError, OSError):
+        pass
+
+
+def histogram_state(histogram):
+    """Process'ler arası taşımak için histogram içeriği"""
+    return {'buckets': histogram.values.totals(), 'max': histogram.max}
+
+
+def merge_histogram(histogram, state):
+    """histogram_state() çıktısını histograma ekle"""
+    for key, count in state['buckets'].items():
+        histogram.values.add(key, count)
+    histogram.max = max(histogram.max, state['max'])
+
+
+def latency_summary(histogram):
+    """Histogramı rapor için milisaniyeye çevir"""
+    summary = histogram.summary((0.5, 0.9, 0.99, 0.999))
+    return {
+        'count': summary['count'],
+        'mean_ms': round(summary['mean'] / 1e6, 3),
+        'p50_ms': round(summary[0.5] / 1e6, 3),
+        'p90_ms': round(summary[0.9] / 1e6, 3),
+        'p99_ms': round(summary[0.99] / 1e6, 3),
+        'p999_ms': round(summary[0.999] / 1e6, 3),
+        'max_ms': round(summary['max'] / 1e6, 3)
+    }
+
+
+class WorkerStats:
+    """Bir process'in sayaçları ve histogramları"""
+    
+    def __init__(self):
+        self.sent = dict.fromkeys(ACTIONS, 0)
+        self.messages_sent = {'public': 0, 'private': 0}
+        self.received = {'public': 0, 'private': 0}
+        self.received_total = 0
+        self.public_expected = 0        # sadece bu process'in mesajları, bu process'te
+        self.public_delivered = 0
+        self.server_events = {'warning': 0, 'mute': 0, 'kick': 0}
+        self.errors = {'connect': 0, 'join': 0, 'disconnect': 0, 'send': 0}
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.joins = 0
+        self.join_overrun = 0
+        self.latency = {
+            'public': LatencyHistogram(),
+            'private': LatencyHistogram(),
+            'join': LatencyHistogram(),
+            'impaired': LatencyHistogram()     # proxy arkasındaki alıcılar (public+private)
+        }
+    
+    def export(self):
+        """Parent process'e gönderilecek düz dict"""
+        data = {key: value for key, value in vars(self).items() if key != 'latency'}
+        data['latency'] = {name: histogram_state(h) for name, h in self.latency.items()}
+        return data
+
+
+class SimClient:
+    """Tek bir simüle client: bağlan, katıl, karışıma göre gönder, gelenleri ölç"""
+    
+    def __init__(self, worker, index):
+        self.worker = worker
+        self.stats = worker.stats
+        self.requested = f"{worker.prefix}{index}"
+        self.nickname = None
+        self.reader = None
+        self.writer = None
+        self.read_task = None
+        self.muted_until = 0.0
+        self.kicked = False
+        self.impaired = worker.is_impaired(index)
+        self.rng = random.Random(f"{worker.worker_id}:{index}:{worker.seed}")
+    
+    async def connect(self):
+        """Bağlan ve 'Connected as' cevabını bekle"""
+        started = time.monotonic_ns()
+        try:
+            port = self.worker.proxy_port if self.impaired else self.worker.port
+            self.reader, self.writer = await asyncio.open_connection(
+                self.worker.host, port, limit=READ_LIMIT)
+        except OSError:
+            self.stats.errors['connect'] += 1
+            return False
+        
+        self._write({'type': MESSAGE_TYPE_SYSTEM, 'content': self.requested})
+        try:
+            while True:
+                line = await asyncio.wait_for(self.reader.readline(), timeout=30)
+                if not line:
+                    raise ConnectionError("closed during join")
+                self.stats.bytes_received += len(line)
+                message = json.loads(line)
+                content = message.get('content') or ''
+                if message.get('type') == MESSAGE_TYPE_SYSTEM and content.startswith('Connected as '):
+                    self.nickname = content[len('Connected as '):]
+                    break
+        except (asyncio.TimeoutError, ConnectionError, OSError, ValueError):
+            self.stats.errors['join'] += 1
+            self._close()
+            return False
+        
+        self.kicked = False
+        self.stats.latency['join'].record(time.monotonic_ns() - started)
+        self.stats.joins += 1
+        self.worker.online[self.nickname] = self
+        self.read_task = asyncio.ensure_future(self._read_loop())
+        return True
+    
+    def _write(self, message):
+        """Mesajı encode edip yaz (await edilmez, drain ayrı yapılır)"""
+        payload = encode_message(message)
+        self.writer.write(payload)
+        self.stats.bytes_sent += len(payload)
+    
+    def _close(self):
+        """Bağlantıyı kapat"""
+        self.worker.online.pop(self.nickname, None)
+        if self.writer:
+            self.writer.close()
+        self.writer = None
+    
+    async def _read_loop(self):
+        """Gelen mesajları say, ölçüm mesajlarının gecikmesini kaydet"""
+        stats = self.stats
+        reader = self.reader
+        writer = self.writer
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                stats.bytes_received += len(line)
+                stats.received_total += 1
+                message = json.loads(line)
+                msg_type = message.get('type')
+                
+                if msg_type in (MESSAGE_TYPE_PUBLIC, MESSAGE_TYPE_PRIVATE):
+                    fields = (message.get('content') or '').split(' ', 3)
+                    if len(fields) < 3 or fields[0] != TAG:
+                        continue
+                    kind = 'public' if msg_type == MESSAGE_TYPE_PUBLIC else 'private'
+                    stats.received[kind] += 1
+                    # Yavaş alıcıların gecikmesi sağlıklı client'ların ölçümünü bozmasın
+                    histogram = stats.latency['impaired' if self.impaired else kind]
+                    histogram.record(time.monotonic_ns() - int(fields[2]))
+                    if kind == 'public' and fields[1] == self.worker.worker_id:
+                        stats.public_delivered += 1
+                elif msg_type == MESSAGE_TYPE_WARNING:
+                    stats.server_events['warning'] += 1
+                elif msg_type == MESSAGE_TYPE_MUTE:
+                    stats.server_events['mute'] += 1
+                    # Gerçek bir client gibi mute süresince sus
+                    self.muted_until = time.monotonic() + MUTE_DURATION
+                elif msg_type == MESSAGE_TYPE_KICK:
+                    stats.server_events['kick'] += 1
+                    self.kicked = True
+        except (ConnectionError, OSError, ValueError):
+            pass
+        
+        # rejoin sırasında yeni bağlantı açılmış olabilir, sadece kendi bağlantısını kapat
+        if self.writer is writer:
+            if self.worker.running and not self.kicked:
+                stats.errors['disconnect'] += 1
+            self._close()
+    
+    def _chat(self, kind, recipient=None):
+        """Zaman damgalı bir ölçüm mesajı yaz"""
+        content = f"{TAG} {self.worker.worker_id} {time.monotonic_ns()} {self.worker.padding}"
+        message = {'type': MESSAGE_TYPE_PUBLIC if kind == 'public' else MESSAGE_TYPE_PRIVATE,
+                   'content': content}
+        if recipient:
+            message['recipient'] = recipient
+        self._write(message)
+        self.stats.messages_sent[kind] += 1
+        if kind == 'public':
+            self.stats.public_expected += len(self.worker.online)
+    
+    async def run(self, send_at, deadline):
+        """Ölçüm penceresi boyunca karışıma göre eylem üret"""
+        worker = self.worker
+        await asyncio.sleep(max(0, send_at - time.monotonic()))
+        
+        while True:
+            wait = self.rng.expovariate(worker.rate) if worker.rate > 0 else deadline
+            now = time.monotonic()
+            if now + wait >= deadline:
+                break
+            await asyncio.sleep(wait)
+            
+            # Kick veya kopma sonrası tekrar bağlan
+            if self.writer is None:
+                if not await self.connect():
+                    await asyncio.sleep(1)
+                continue
+            if time.monotonic() < self.muted_until:
+                continue
+            
+            action = self.rng.choices(worker.actions, worker.weights)[0]
+            try:
+                await self._act(action)
+            except (ConnectionError, OSError):
+                self.stats.errors['send'] += 1
+                self._close()
+    
+    async def _act(self, action):
+        """Tek bir eylemi uygula"""
+        stats = self.stats
+        stats.sent[action] += 1
+        
+        if action == 'public':
+            self._chat('public')
+        elif action == 'private':
+            peers = self.worker.online
+            recipient = self.rng.choice(list(peers)) if peers else self.nickname
+            self._chat('private', recipient)
+        elif action == 'burst':
+            for _ in range(self.worker.burst_size):
+                self._chat('public')
+        elif action == 'rejoin':
+            self._write({'type': MESSAGE_TYPE_SYSTEM, 'content': 'EXIT'})
+            await self.writer.drain()
+            self._close()
+            if self.read_task:
+                await asyncio.wait([self.read_task], timeout=5)
+            await self.connect()
+            return
+        
+        await self.writer.drain()
+    
+    async def shutdown(self):
+        """Ölçüm bitince bağlantıyı kapat"""
+        if self.writer is not None:
+            self._close()
+        if self.read_task:
+            self.read_task.cancel()
+
+
+class Worker:
+    """Bir process'teki client'ların tamamı"""
+    
+    def __init__(self, worker_id, config):
+        self.worker_id = str(worker_id)
+        self.host = config['host']
+        self.port = config['port']
+        self.proxy_port = config['proxy_port']
+        self.impaired = config['impaired']
+        self.prefix = f"{config['prefix']}{worker_id}_"
+        self.rate = config['rate']
+        self.burst_size = config['burst_size']
+        self.padding = 'x' * config['message_size']
+        self.seed = config['seed']
+        self.actions = list(config['mix'])
+        self.weights = [config['mix'][a] for a in self.actions]
+        self.online = {}        # nickname -> SimClient (private hedefleri için)
+        self.running = True
+        self.stats = WorkerStats()
+    
+    def is_impaired(self, index):
+        """Client'ların impaired oranı kadarı proxy'den geçer, eşit aralıklarla dağılır"""
+        return int((index + 1) * self.impaired) > int(index * self.impaired)
+    
+    async def run(self, clients, start_at, ramp, duration, drain):
+        """Rampa boyunca bağlan, ölçüm penceresinde gönder, teslimleri bekle"""
+        sims = [SimClient(self, i) for i in range(clients)]
+        
+        async def join(i, sim):
+            await asyncio.sleep(max(0, start_at + ramp * i / max(clients, 1) - time.monotonic()))
+            await sim.connect()
+        
+        await asyncio.gather(*(join(i, sim) for i, sim in enumerate(sims)))
+        
+        # Katılımlar rampayı aşarsa ölçüm penceresi kısalmasın diye kaydır
+        send_at = start_at + ramp
+        self.stats.join_overrun = round(max(0, time.monotonic() - send_at), 3)
+        send_at += self.stats.join_overrun
+        deadline = send_at + duration
+        await asyncio.gather(*(sim.run(send_at, deadline) for sim in sims))
+        
+        # Yoldaki teslimleri bekle
+        await asyncio.sleep(max(0, deadline + drain - time.monotonic()))
+        self.running = False
+        self.stats.connected_at_end = len(self.online)
+        for sim in sims:
+            await sim.shutdown()
+        return self.stats
+
+
+def worker_main(worker_id, clients, config, start_at, results):
+    """Alt process giriş noktası"""
+    raise_fd_limit()
+    worker = Worker(worker_id, config)
+    stats = asyncio.run(worker.run(clients, start_at, config['ramp'],
+                                   config['duration'], config['drain']))
+    results.put(stats.export())
+
+
+def wait_for_port(host, port, timeout=15):
+    """Server portu bağlantı kabul edene kadar bekle"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+
+def free_port():
+    """Kullanılmayan bir loopback portu"""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def spawn_server(port, http_port, ws_port):
+    """run_server.py'yi ayrı bir process'te başlat (client'larla aynı GIL'i paylaşmasın)"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.Popen(
+        [sys.executable, 'run_server.py', '--host', '127.0.0.1', '--port', str(port),
+         '--http-port', str(http_port), '--ws-port', str(ws_port)],
+        cwd=root, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if not wait_for_port('127.0.0.1', port):
+        process.kill()
+        raise RuntimeError("Spawned server did not start listening")
+    return process
+
+
+def spawn_proxy(host, port, proxy_port, proxy_args):
+    """bench.impair_proxy'yi server'ın önünde başlat; proxy_args olduğu gibi geçilir"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'bench.impair_proxy', '--listen', f"127.0.0.1:{proxy_port}",
+         '--target', f"{host}:{port}", '--report-interval', '0', *shlex.split(proxy_args)],
+        cwd=root, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if not wait_for_port('127.0.0.1', proxy_port):
+        process.kill()
+        raise RuntimeError("Spawned proxy did not start listening")
+    return process
+
+
+def fetch_server_latency(host, http_port):
+    """Server'ın kendi aşama gecikmeleri (/api/latency) - ulaşılamazsa None"""
+    try:
+        with urllib.request.urlopen(f"http://{host}:{http_port}/api/latency", timeout=5) as r:
+            return json.loads(r.read())
+    except (OSError, ValueError):
+        return None
+
+
+def build_report(config, parts, elapsed):
+    """Process sonuçlarını birleştir"""
+    latency = {name: LatencyHistogram() for name in ('public', 'private', 'join', 'impaired')}
+    totals = WorkerStats().export()
+    connected = 0
+    overrun = 0
+    
+    for part in parts:
+        connected += part['connected_at_end']
+        overrun = max(overrun, part['join_overrun'])
+        for name, state in part['latency'].items():
+            merge_histogram(latency[name], state)
+        for key, value in part.items():
+            if isinstance(value, dict) and key != 'latency':
+                for sub, count in value.items():
+                    totals[key][sub] += count
+            elif isinstance(value, int) and key in totals and key != 'join_overrun':
+                totals[key] += value
+    
+    duration = config['duration']
+    messages = sum(totals['messages_sent'].values())
+    delivered = sum(totals['received'].values())
+    expected = totals['public_expected']
+    
+    return {
+        'config': {k: v for k, v in config.items() if k != 'prefix'},
+        'clients': {
+            'requested': config['clients'],
+            'joins': totals['joins'],
+            'connected_at_end': connected,
+            'join_overrun_seconds': overrun,
+            'join_latency': latency_summary(latency['join'])
+        },
+        'throughput': {
+            'messages_sent': messages,
+            'messages_sent_per_sec': round(messages / duration, 1),
+            'deliveries': delivered,
+            'deliveries_per_sec': round(delivered / duration, 1),
+            'frames_received_per_sec': round(totals['received_total'] / elapsed, 1),
+            'bytes_sent': totals['bytes_sent'],
+            'bytes_received': totals['bytes_received']
+        },
+        'delivery': {
+            'public_expected_same_process': expected,
+            'public_delivered_same_process': totals['public_delivered'],
+            'public_ratio': round(totals['public_delivered'] / expected, 4) if expected else None,
+            'private_sent': totals['messages_sent']['private'],
+            'private_delivered': totals['received']['private']
+        },
+        'latency': {
+            'public': latency_summary(latency['public']),
+            'private': latency_summary(latency['private']),
+            **({'impaired': latency_summary(latency['impaired'])} if config['impaired'] else {})
+        },
+        'actions': totals['sent'],
+        'server_events': totals['server_events'],
+        'errors': totals['errors'],
+        'elapsed_seconds': round(elapsed, 3)
+    }
+
+
+def print_report(report):
+    """İnsan okunur kısa özet"""
+    clients = report['clients']
+    throughput = report['throughput']
+    delivery = report['delivery']
+    print(f"👥 Clients: {clients['connected_at_end']}/{clients['requested']} connected, "
+          f"join p99 {clients['join_latency']['p99_ms']} ms")
+    if clients['join_overrun_seconds']:
+        print(f"⚠️  Joins took {clients['join_overrun_seconds']}s longer than --ramp; "
+              f"sending started late")
+    print(f"📤 Sent: {throughput['messages_sent']} msgs "
+          f"({throughput['messages_sent_per_sec']}/s)  "
+          f"📥 Delivered: {throughput['deliveries']} ({throughput['deliveries_per_sec']}/s)")
+    if delivery['public_ratio'] is not None:
+        print(f"📬 Public delivery ratio: {delivery['public_ratio']:.2%}  "
+              f"private: {delivery['private_delivered']}/{delivery['private_sent']}")
+    for kind, summary in report['latency'].items():
+        print(f"⏱️  {kind:<8} p50={summary['p50_ms']}ms p90={summary['p90_ms']}ms "
+              f"p99={summary['p99_ms']}ms p99.9={summary['p999_ms']}ms max={summary['max_ms']}ms")
+    events = report['server_events']
+    print(f"🚦 Rate limit: {events['warning']} warnings, {events['mute']} mutes, "
+          f"{events['kick']} kicks")
+    errors = {k: v for k, v in report['errors'].items() if v}
+    if errors:
+        print(f"❌ Errors: {errors}")
+
+
+def main(argv=None):
+    """Ana fonksiyon"""
+    parser = argparse.ArgumentParser(description='Chat server load generator')
+    parser.add_argument('--host', type=str, default=SERVER_HOST,
+                       help=f'Server host (default: {SERVER_HOST})')
+    parser.add_argument('--port', type=int, default=SERVER_PORT,
+                       help=f'Server port (default: {SERVER_PORT})')
+    parser.add_argument('--http-port', type=int, default=None,
+                       help='Dashboard port; if set, /api/latency is added to the report')
+    parser.add_argument('--spawn', action='store_true',
+                       help='Start a server on free loopback ports for this run')
+    parser.add_argument('--clients', type=int, default=200,
+                       help='Simulated clients (default: 200)')
+    parser.add_argument('--processes', type=int, default=1,
+                       help='Client processes (default: 1)')
+    parser.add_argument('--duration', type=float, default=10.0,
+                       help='Measured sending window in seconds (default: 10)')
+    parser.add_argument('--ramp', type=float, default=5.0,
+                       help='Seconds over which clients join before sending (default: 5)')
+    parser.add_argument('--drain', type=float, default=2.0,
+                       help='Seconds to wait for in-flight deliveries (default: 2)')
+    parser.add_argument('--rate', type=float, default=0.5,
+                       help='Actions per second per client (default: 0.5, under the rate limit)')
+    parser.add_argument('--mix', type=str, default='chat',
+                       help=f"Preset ({', '.join(MIXES)}) or e.g. public=0.7,private=0.3")
+    parser.add_argument('--burst-size', type=int, default=15,
+                       help='Messages per burst action (default: 15)')
+    parser.add_argument('--message-size', type=int, default=32,
+                       help='Padding bytes per chat message (default: 32)')
+    parser.add_argument('--seed', type=int, default=1,
+                       help='Random seed (default: 1)')
+    parser.add_argument('--impaired', type=float, default=0.0,
+                       help='Share of clients that connect through the impairment proxy')
+    parser.add_argument('--proxy-port', type=int, default=None,
+                       help='Port of a running bench.impair_proxy; spawned if omitted')
+    parser.add_argument('--proxy-args', type=str, default='--stall-after 3 --stall-for 0',
+                       help='Impairment flags for the spawned proxy '
+                            '(default: "--stall-after 3 --stall-for 0")')
+    parser.add_argument('--output', type=str, default=None,
+                       help='Write the JSON report to this file')
+    
+    args = parser.parse_args(argv)
+    
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    server = None
+    if args.spawn:
+        args.port, args.http_port, ws_port = free_port(), free_port(), free_port()
+        server = spawn_server(args.port, args.http_port, ws_port)
+        print(f"🚀 Spawned server on {args.host}:{args.port} (pid {server.pid})")
+    
+    proxy = None
+    if args.impaired and args.proxy_port is None:
+        args.proxy_port = free_port()
+        proxy = spawn_proxy(args.host, args.port, args.proxy_port, args.proxy_args)
+        print(f"🐢 Spawned impairment proxy on {args.host}:{args.proxy_port} "
+              f"({args.proxy_args}) for {args.impaired:.0%} of clients")
+    
+    config = {
+        'host': args.host, 'port': args.port, 'clients': args.clients,
+        'processes': args.processes, 'duration': args.duration, 'ramp': args.ramp,
+        'drain': args.drain, 'rate': args.rate, 'mix': mix, 'burst_size': args.burst_size,
+        'message_size': args.message_size, 'seed': args.seed,
+        'impaired': args.impaired, 'proxy_port': args.proxy_port,
+        'prefix': f"lg{os.getpid() % 10000}_"
+    }
+    
+    processes = max(1, min(args.processes, args.clients))
+    shares = [args.clients // processes + (1 if i < args.clients % processes else 0)
+              for i in range(processes)]
+    
+    print(f"🔥 {args.clients} clients in {processes} process(es), mix {mix}, "
+          f"{args.rate}/s per client for {args.duration}s")
+    
+    # Tüm process'ler aynı monotonic başlangıç anına göre rampa yapar
+    results = multiprocessing.Queue()
+    start_at = time.monotonic() + 1.0
+    workers = [
+        multiprocessing.Process(target=worker_main,
+                                args=(i, share, config, start_at, results), daemon=True)
+        for i, share in enumerate(shares)
+    ]
+    try:
+        for process in workers:
+            process.start()
+        
+        parts = []
+        timeout = 1.0 + args.ramp + args.duration + args.drain + 60
+        for _ in workers:
+            parts.append(results.get(timeout=timeout))
+        for process in workers:
+            process.join(10)
+        elapsed = time.monotonic() - start_at
+        
+        report = build_report(config, parts, elapsed)
+        if args.http_port:
+            report['server_latency'] = fetch_server_latency(args.host, args.http_port)
+    finally:
+        for process in workers:
+            if process.is_alive():
+                process.terminate()
+        for process in (proxy, server):
+            if process:
+                process.terminate()
+                process.wait(10)
+    
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Microbenchmarks
+Sıcak yoldaki fonksiyonların op başına maliyetini ölçer, sonuçları JSON
+baseline'la karşılaştırır ve eşiği aşan gerilemeleri işaretler
+
+Kullanım:
+    python -m bench.micro                         # çalıştır, baseline varsa farkı göster
+    python -m bench.micro --check                 # eşiği aşan gerileme varsa exit 1
+    python -m bench.micro --save                  # baseline'ı güncelle
+    python -m bench.micro --filter broadcast --repeat 9
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import socket
+import statistics
+import sys
+import tempfile
+import time
+from common.config import MESSAGE_TYPE_PUBLIC
+from common.protocol import Message, encode_message, send_message, receive_message
+from common.utils import validate_nickname
+from server.chat_server import ChatServer
+from server.client_handler import ClientHandler
+from server.logger import ChatLogger
+from server.rate_limiter import RateLimiter
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'micro_baseline.json')
+DEFAULT_THRESHOLD = 0.20        # %20'den fazla yavaşlama gerileme sayılır
+
+# {ad: (fonksiyon, op sayısı)} - fonksiyon(number) ölçülen süreyi (saniye) döndürür
+BENCHMARKS = {}
+
+
+def benchmark(name, number):
+    """Benchmark kaydı için decorator"""
+    def decorator(func):
+        BENCHMARKS[name] = (func, number)
+        return func
+    return decorator
+
+
+class NullSocket:
+    """Gönderileni atan, her recv'de aynı veriyi döndüren sahte socket"""
+    
+    def __init__(self, incoming=b''):
+        self.incoming = incoming
+        self.sent = 0
+    
+    def sendall(self, data):
+        self.sent += len(data)
+    
+    def send(self, data):
+        self.sent += len(data)
+        return len(data)
+    
+    def recv(self, size):
+        return self.incoming
+    
+    def close(self):
+        pass
+
+
+def sample_message():
+    """Tipik bir public chat mesajı"""
+    return Message(MESSAGE_TYPE_PUBLIC, sender='alice', content='Merhaba, nasılsınız? ' * 3)
+
+
+@benchmark('protocol.send_message', 100000)
+def bench_send_message(number):
+    sock = NullSocket()
+    message = sample_message()
+    started = time.perf_counter()
+    for _ in range(number):
+        send_message(sock, message)
+    return time.perf_counter() - started
+
+
+@benchmark('protocol.receive_message', 100000)
+def bench_receive_message(number):
+    sock = NullSocket(encode_message(sample_message()))
+    started = time.perf_counter()
+    for _ in range(number):
+        receive_message(sock)
+    return time.perf_counter() - started
+
+
+@benchmark('Message.to_dict', 200000)
+def bench_to_dict(number):
+    message = sample_message()
+    started = time.perf_counter()
+    for _ in range(number):
+        message.to_dict()
+    return time.perf_counter() - started
+
+
+@benchmark('Message.from_dict', 200000)
+def bench_from_dict(number):
+    data = sample_message().to_dict()
+    started = time.perf_counter()
+    for _ in range(number):
+        Message.from_dict(data)
+    return time.perf_counter() - started
+
+
+@benchmark('RateLimiter.check_rate_limit', 100000)
+def bench_check_rate_limit(number):
+    # Her nickname ölçüm boyunca limitin altında kalsın: 'OK' yolu
+    limiter = RateLimiter()
+    nicknames = [f"user{i}" for i in range(max(number // 4, 1))]
+    for nickname in nicknames:
+        limiter.add_client(nickname)
+    started = time.perf_counter()
+    for i in range(number):
+        limiter.check_rate_limit(nicknames[i % len(nicknames)])
+    return time.perf_counter() - started
+
+
+def _bench_write_log(number, log_format):
+    with tempfile.TemporaryDirectory() as tmp:
+        logger = ChatLogger(log_file=os.path.join(tmp, 'chat.log'), log_format=log_format)
+        started = time.perf_counter()
+        for _ in range(number):
+            logger._write_log('PUBLIC', 'alice: Merhaba, nasılsınız?', sender='alice',
+                              ip='127.0.0.1')
+        return time.perf_counter() - started
+
+
+@benchmark('ChatLogger._write_log[text]', 20000)
+def bench_write_log_text(number):
+    return _bench_write_log(number, 'text')
+
+
+@benchmark('ChatLogger._write_log[json]', 20000)
+def bench_write_log_json(number):
+    return _bench_write_log(number, 'json')
+
+
+@benchmark('validate_nickname', 200000)
+def bench_validate_nickname(number):
+    started = time.perf_counter()
+    for _ in range(number):
+        validate_nickname('alice_1987')
+    return time.perf_counter() - started
+
+
+def _drain(peers):
+    """Karşı uçlarda biriken byte'ları oku (socket buffer'ı dolup sendall bloklanmasın)"""
+    for peer in peers:
+        try:
+            while peer.recv(65536):
+                pass
+        except BlockingIOError:
+            pass
+
+
+def _tcp_pairs(count):
+    """Loopback üzerinde count adet bağlı (server ucu, client ucu) TCP çifti"""
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(count)
+    pairs = []
+    for _ in range(count):
+        peer = socket.create_connection(listener.getsockname())
+        sock, _ = listener.accept()
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        peer.setblocking(False)
+        pairs.append((sock, peer))
+    listener.close()
+    return pairs
+
+
+def _server_with_clients(clients, sockets=None):
+    """Kayıtlı clients adet handler'ı olan ChatServer (cwd geçici dizin olmalı)"""
+    server = ChatServer(port=0, http_port=0, ws_port=0)
+    for i in range(clients):
+        sock = sockets[i] if sockets else NullSocket()
+        handler = ClientHandler(sock, ('127.0.0.1', 40000 + i), server)
+        handler.nickname = f"user{i}"
+        server.clients[handler.nickname] = handler
+    return server
+
+
+def _bench_broadcast(number, clients, real_sockets=False):
+    # ChatServer kendi log/index dosyalarını cwd'ye yazar, geçici dizinde kur
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            # Gerçek send çağrıları: yazma birleştirmenin kazancı burada görünür
+            pairs = _tcp_pairs(clients) if real_sockets else None
+            sockets = [sock for sock, _ in pairs] if pairs else None
+            peers = [peer for _, peer in pairs] if pairs else []
+            server = _server_with_clients(clients, sockets)
+            
+            message = sample_message()
+            started = time.perf_counter()
+            for n in range(number):
+                server.broadcast_message(message)
+                if peers and n % 16 == 15:
+                    _drain(peers)
+            # Birleştirme kuyruğunda bekleyenler de ölçüme dahil
+            server.write_flusher.stop()
+            elapsed = time.perf_counter() - started
+            
+            for handler in server.clients.values():
+                handler.socket.close()
+            for peer in peers:
+                peer.close()
+            return elapsed
+        finally:
+            os.chdir(cwd)
+
+
+@benchmark('broadcast_message[10]', 20000)
+def bench_broadcast_10(number):
+    return _bench_broadcast(number, 10)
+
+
+@benchmark('broadcast_message[100]', 2000)
+def bench_broadcast_100(number):
+    return _bench_broadcast(number, 100)
+
+
+@benchmark('broadcast_message[1000]', 200)
+def bench_broadcast_1000(number):
+    return _bench_broadcast(number, 1000)
+
+
+@benchmark('broadcast_message[100,tcp]', 2000)
+def bench_broadcast_100_tcp(number):
+    return _bench_broadcast(number, 100, real_sockets=True)
+
+
+BURST_SIZE = 8      # RATE_LIMIT_MAX altında: uyarı/mute olmadan işleme maliyeti
+
+
+def _bench_burst(number, batched):
+    """Bir client'ın tek okumada gelen BURST_SIZE mesajı, 10 alıcı; op = mesaj"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            server = _server_with_clients(10)
+            sender = server.clients['user0']
+            messages = [Message(MESSAGE_TYPE_PUBLIC, content=f'burst {i}')
+                        for i in range(BURST_SIZE)]
+            
+            started = time.perf_counter()
+            for _ in range(max(number // BURST_SIZE, 1)):
+                # Her burst boş pencereyle başlasın
+                server.rate_limiter.remove_client(sender.nickname)
+                if batched:
+                    sender._process_batch(messages)
+                else:
+                    for message in messages:
+                        sender._process_message(message)
+            server.write_flusher.stop()
+            return time.perf_counter() - started
+        finally:
+            os.chdir(cwd)
+
+
+@benchmark('ClientHandler.burst[8,single]', 8000)
+def bench_burst_single(number):
+    return _bench_burst(number, batched=False)
+
+
+@benchmark('ClientHandler.burst[8,batch]', 8000)
+def bench_burst_batch(number):
+    return _bench_burst(number, batched=True)
+
+
+def run_benchmark(func, number, repeat):
+    """repeat kez çalıştır, op başına ns (medyan ve minimum)"""
+    timings = []
+    for _ in range(repeat):
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            timings.append(func(number) / number * 1e9)
+        finally:
+            if gc_enabled:
+                gc.enable()
+    return {
+        'ns_per_op': round(statistics.median(timings), 1),
+        'min_ns': round(min(timings), 1),
+        'number': number,
+        'repeat': repeat
+    }
+
+
+def run_all(names, repeat, scale=1.0):
+    """Seçilen benchmark'ları çalıştır"""
+    results = {}
+    for name in names:
+        func, number = BENCHMARKS[name]
+        results[name] = run_benchmark(func, max(int(number * scale), 1), repeat)
+        print(f"  {name:<32}{results[name]['ns_per_op']:>14,.1f} ns/op", flush=True)
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'results': results
+    }
+
+
+def compare(report, baseline, threshold):
+    """
+    Baseline'a göre değişimler
+    Returns:
+        list: [(ad, baseline ns, güncel ns, oran, gerileme_mi)]
+    """
+    rows = []
+    for name, result in report['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous:
+            continue
+        ratio = result['ns_per_op'] / previous['ns_per_op'] - 1
+        rows.append((name, previous['ns_per_op'], result['ns_per_op'], ratio, ratio > threshold))
+    return rows
+
+
+def main(argv=None):
+    """Ana fonksiyon"""
+    parser = argparse.ArgumentParser(description='Chat server microbenchmarks')
+    parser.add_argument('--baseline', type=str, default=DEFAULT_BASELINE,
+                       help='Baseline JSON file (default: bench/micro_baseline.json)')
+    parser.add_argument('--save', action='store_true',
+                       help='Write results as the new baseline')
+    parser.add_argument('--check', action='store_true',
+                       help='Exit with status 1 if any benchmark regressed past the threshold')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                       help=f'Allowed slowdown ratio (default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--filter', type=str, default=None,
+                       help='Only run benchmarks whose name contains this text')
+    parser.add_argument('--repeat', type=int, default=5,
+                       help='Runs per benchmark, median is reported (default: 5)')
+    parser.add_argument('--quick', action='store_true',
+                       help='Run a tenth of the operations (noisier)')
+    parser.add_argument('--output', type=str, default=None,
+                       help='Also write the results to this file')
+    
+    args = parser.parse_args(argv)
+    
+    names = [name for name in BENCHMARKS if not args.filter or args.filter in name]
+    if not names:
+        parser.error(f"No benchmark matches '{args.filter}'")
+    
+    print(f"🏁 Running {len(names)} benchmark(s), repeat={args.repeat}")
+    report = run_all(names, args.repeat, 0.1 if args.quick else 1.0)
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('python') != report['python']:
+            print(f"⚠️  Baseline was recorded on Python {baseline.get('python')}")
+        
+        print(f"\n{'BENCHMARK':<32}{'BASELINE':>14}{'CURRENT':>14}{'CHANGE':>10}")
+        for name, before, after, ratio, regressed in compare(report, baseline, args.threshold):
+            flag = '  ❌ regression' if regressed else ''
+            print(f"{name:<32}{before:>14,.1f}{after:>14,.1f}{ratio:>+10.1%}{flag}")
+            if regressed:
+                regressions.append(name)
+    elif args.check:
+        print(f"❌ No baseline at {args.baseline}, run with --save first")
+        return 1
+    
+    if args.save:
+        # Kısmi çalıştırmada diğer baseline kayıtları korunur
+        baseline = {'results': {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        baseline.update({k: v for k, v in report.items() if k != 'results'})
+        baseline['results'].update(report['results'])
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2)
+            f.write('\n')
+        print(f"💾 Baseline written to {args.baseline}")
+    
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) past {args.threshold:.0%}: "
+              f"{', '.join(regressions)}")
+        return 1 if args.check else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Traffic Replay
+Capture dosyasındaki (run_server.py --capture) veya chat_server.log'daki trafiği
+yerel bir server'a aynı zamanlamayla, hızlandırılmış veya sınırsız hızda oynatır
+
+Log satırları yaklaşık bir kaynaktır: sadece PUBLIC/PRIVATE mesajlar ve
+connected/disconnected olayları vardır, text formatında çözünürlük 1 saniyedir.
+
+Kullanım:
+    python run_server.py --capture incident.cap          # kayıt
+    python -m bench.replay incident.cap --speed 1        # gerçek zamanlı
+    python -m bench.replay incident.cap --speed 10 --port 6000
+    python -m bench.replay logs/chat_server.log --speed 0    # sınırsız hız
+"""
+
+import argparse
+import gzip
+import json
+import re
+import selectors
+import socket
+import sys
+import threading
+import time
+from common.config import (
+    SERVER_HOST, SERVER_PORT,
+    MESSAGE_TYPE_PUBLIC, MESSAGE_TYPE_PRIVATE, MESSAGE_TYPE_SYSTEM
+)
+from common.protocol import encode_message
+from server.capture import OPEN, FRAME, CLOSE, MAGIC, read_capture
+from server.logger import parse_log_line
+
+
+PRESENCE_PATTERN = re.compile(r'^(\S+)@(\S+) (connected|disconnected)$')
+
+JOIN_TIMEOUT = 5.0      # saniye - 'Connected as' cevabı beklenirken
+
+
+def is_capture_file(path):
+    """Dosya capture formatında mı?"""
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def capture_events(path):
+    """Capture kayıtları -> [(saniye, bağlantı, tür, payload)]"""
+    return list(read_capture(path))
+
+
+def log_events(paths):
+    """
+    Log satırlarından yaklaşık olay listesi
+    Her kullanıcı oturumu ayrı bir bağlantıdır; connected satırı yoksa
+    bağlantı kullanıcının ilk mesajında açılır
+    """
+    events = []
+    sessions = {}       # nickname -> bağlantı anahtarı
+    counter = 0
+    first_ts = None
+    
+    def open_session(t, nickname):
+        nonlocal counter
+        counter += 1
+        sessions[nickname] = counter
+        events.append((t, counter, OPEN, b''))
+        events.append((t, counter, FRAME, encode_message(
+            {'type': MESSAGE_TYPE_SYSTEM, 'content': nickname}).rstrip(b'\n')))
+        return counter
+    
+    for path in paths:
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                record = parse_log_line(line)
+                if not record or record['ts'] is None:
+                    continue
+                if first_ts is None:
+                    first_ts = record['ts']
+                t = max(0.0, (record['ts'] - first_ts) / 1000)
+                
+                log_type = record['type']
+                if log_type == 'SYSTEM':
+                    match = PRESENCE_PATTERN.match(record['message'])
+                    if not match:
+                        continue
+                    nickname, _, action = match.groups()
+                    if action == 'connected':
+                        if nickname in sessions:
+                            events.append((t, sessions.pop(nickname), CLOSE, b''))
+                        open_session(t, nickname)
+                    elif nickname in sessions:
+                        events.append((t, sessions.pop(nickname), CLOSE, b''))
+                
+                elif log_type in (MESSAGE_TYPE_PUBLIC, MESSAGE_TYPE_PRIVATE) and record['sender']:
+                    sender = record['sender']
+                    content = record['message'].split(': ', 1)[-1]
+                    conn = sessions.get(sender) or open_session(t, sender)
+                    message = {'type': log_type, 'content': content}
+                    if log_type == MESSAGE_TYPE_PRIVATE:
+                        message['recipient'] = record['recipient']
+                    events.append((t, conn, FRAME, encode_message(message).rstrip(b'\n')))
+    
+    end = events[-1][0] if events else 0.0
+    for conn in sessions.values():
+        events.append((end, conn, CLOSE, b''))
+    return events
+
+
+class ReplayConnection:
+    """Oynatılan bir client bağlantısı"""
+    
+    def __init__(self, sock):
+        self.sock = sock
+        self.buffer = b''
+        self.requested = None
+        self.joined = threading.Event()
+        self.closed = False
+
+
+class Replayer:
+    """
+    Olayları zamanlamaya göre gönderir; ayrı bir thread server'dan gelenleri
+    okuyup sayar (okunmazsa server'ın sendall'ı bloklanır)
+    """
+    
+    def __init__(self, host, port, speed):
+        self.host = host
+        self.port = port
+        self.speed = speed          # 0 = sınırsız
+        self.connections = {}       # kayıttaki bağlantı -> ReplayConnection
+        self.nicknames = {}         # istenen nickname -> server'ın atadığı
+        self.selector = selectors.DefaultSelector()
+        self.lock = threading.Lock()
+        self.running = False
+        self.received = {}          # mesaj tipi -> sayı
+        self.stats = dict.fromkeys(('connections', 'frames_sent', 'send_errors',
+                                    'connect_errors', 'join_timeouts'), 0)
+        self.max_lag = 0.0
+    
+    def _reader(self):
+        """Tüm bağlantılardan gelenleri oku"""
+        while self.running:
+            with self.lock:
+                empty = not self.selector.get_map()
+            if empty:
+                time.sleep(0.01)
+                continue
+            for key, _ in self.selector.select(timeout=0.05):
+                conn = key.data
+                try:
+                    data = conn.sock.recv(65536)
+                except OSError:
+                    data = b''
+                if not data:
+                    self._close(conn)
+                    continue
+                self._consume(conn, data)
+    
+    def _consume(self, conn, data):
+        """Gelen satırların tiplerini say, 'Connected as' ile nickname eşle"""
+        conn.buffer += data
+        *lines, conn.buffer = conn.buffer.split(b'\n')
+        for line in lines:
+            match = re.search(rb'"type": "([A-Z_]+)"', line)
+            msg_type = match.group(1).decode() if match else '?'
+            self.received[msg_type] = self.received.get(msg_type, 0) + 1
+            if not conn.joined.is_set() and b'Connected as ' in line:
+                assigned = json.loads(line)['content'][len('Connected as '):]
+                if conn.requested:
+                    self.nicknames[conn.requested] = assigned
+                conn.joined.set()
+    
+    def _open(self, key):
+        """Kayıttaki bağlantı için yeni TCP bağlantısı"""
+        try:
+            sock = socket.create_connection((self.host, self.port), timeout=10)
+        except OSError:
+            self.stats['connect_errors'] += 1
+            return None
+        # Art arda küçük frame'ler Nagle + delayed ACK yüzünden 40ms beklemesin
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn = ReplayConnection(sock)
+        self.connections[key] = conn
+        self.stats['connections'] += 1
+        with self.lock:
+            self.selector.register(sock, selectors.EVENT_READ, conn)
+        return conn
+    
+    def _close(self, conn):
+        if conn.closed:
+            return
+        conn.closed = True
+        conn.joined.set()
+        with self.lock:
+            try:
+                self.selector.unregister(conn.sock)
+            except (KeyError, ValueError):
+                pass
+        try:
+            conn.sock.close()
+        except OSError:
+            pass
+    
+    def _send(self, key, payload):
+        """Frame'i gönder; ilk frame nickname'dir, sonrakiler katılımı bekler"""
+        conn = self.connections.get(key) or self._open(key)
+        if conn is None or conn.closed:
+            self.stats['send_errors'] += 1
+            return
+        
+        if conn.requested is None:
+            conn.requested = json.loads(payload).get('content')
+        else:
+            if not conn.joined.wait(JOIN_TIMEOUT):
+                self.stats['join_timeouts'] += 1
+                conn.joined.set()
+            # Alıcı orijinal oturumda başka nickname almış olabilir
+            if b'"PRIVATE"' in payload:
+                message = json.loads(payload)
+                recipient = message.get('recipient')
+                if recipient in self.nicknames:
+                    message['recipient'] = self.nicknames[recipient]
+                    payload = encode_message(message).rstrip(b'\n')
+        
+        try:
+            conn.sock.sendall(payload + b'\n')
+            self.stats['frames_sent'] += 1
+        except OSError:
+            # Kick edilmiş olabilir
+            self.stats['send_errors'] += 1
+            self._close(conn)
+    
+    def run(self, events, drain=2.0):
+        """Olayları oynat"""
+        events.sort(key=lambda event: event[0])
+        self.running = True
+        reader = threading.Thread(target=self._reader, daemon=True)
+        reader.start()
+        
+        started = time.perf_counter()
+        for t, key, kind, payload in events:
+            if self.speed:
+                target = started + t / self.speed
+                delay = target - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    self.max_lag = max(self.max_lag, -delay)
+            
+            if kind == OPEN:
+                if key not in self.connections:
+                    self._open(key)
+            elif kind == FRAME:
+                self._send(key, payload)
+            elif kind == CLOSE:
+                conn = self.connections.pop(key, None)
+                if conn:
+                    self._close(conn)
+        elapsed = time.perf_counter() - started
+        
+        # Son cevapları topla
+        time.sleep(drain)
+        for conn in list(self.connections.values()):
+            self._close(conn)
+        self.running = False
+        reader.join(2)
+        
+        span = events[-1][0] if events else 0.0
+        return {
+            'speed': self.speed or 'unbounded',
+            'recorded_seconds': round(span, 3),
+            'replay_seconds': round(elapsed, 3),
+            'effective_speed': round(span / elapsed, 2) if elapsed else None,
+            'max_lag_seconds': round(self.max_lag, 3),
+            **self.stats,
+            'received': dict(sorted(self.received.items()))
+        }
+
+
+def main(argv=None):
+    """Ana fonksiyon"""
+    parser = argparse.ArgumentParser(description='Replay captured chat traffic')
+    parser.add_argument('source', nargs='+',
+                       help='Capture file, or one or more chat_server.log files (.gz ok)')
+    parser.add_argument('--host', type=str, default=SERVER_HOST,
+                       help=f'Server host (default: {SERVER_HOST})')
+    parser.add_argument('--port', type=int, default=SERVER_PORT,
+                       help=f'Server port (default: {SERVER_PORT})')
+    parser.add_argument('--speed', type=float, default=1.0,
+                       help='Replay speed factor, 0 = as fast as possible (default: 1)')
+    parser.add_argument('--drain', type=float, default=2.0,
+                       help='Seconds to keep reading responses after the last event')
+    parser.add_argument('--output', type=str, default=None,
+                       help='Write the JSON report to this file')
+    
+    args = parser.parse_args(argv)
+    
+    if len(args.source) == 1 and is_capture_file(args.source[0]):
+        events = capture_events(args.source[0])
+        kind = 'capture'
+    else:
+        events = log_events(args.source)
+        kind = 'log'
+    
+    frames = sum(1 for event in events if event[2] == FRAME)
+    print(f"🎞️  Replaying {frames} frames from {kind} "
+          f"({events[-1][0] if events else 0:.1f}s recorded) at "
+          f"{'unbounded' if not args.speed else f'{args.speed:g}x'} speed "
+          f"to {args.host}:{args.port}")
+    
+    report = Replayer(args.host, args.port, args.speed).run(events, args.drain)
+    report['source'] = kind
+    
+    print(f"✅ Sent {report['frames_sent']} frames on {report['connections']} connections "
+          f"in {report['replay_seconds']}s (effective {report['effective_speed']}x, "
+          f"max lag {report['max_lag_seconds']}s)")
+    print(f"📥 Received: {report['received']}")
+    errors = {k: report[k] for k in ('send_errors', 'connect_errors', 'join_timeouts')
+              if report[k]}
+    if errors:
+        print(f"❌ Errors: {errors}")
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
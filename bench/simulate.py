@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Virtual-Time Simulator
+Gerçek ChatServer/ClientHandler/RateLimiter kodunu socket ve thread olmadan,
+bellek içi transport ve sanal saatle sürer
+
+Tüm olaylar tek thread'de zaman sırasıyla işlenir: saatler süren trafik
+gerçek zamanı beklemeden oynatılır ve aynı seed aynı sonucu verir
+(rapordaki 'fingerprint' deterministik sayaçların özetidir).
+
+Kullanım:
+    python -m bench.simulate --clients 1000 --duration 3600
+    python -m bench.simulate --clients 10000 --duration 600 --rate 0.001 --spammers 0.01
+    python -m bench.simulate --seed 7 --output sim.json
+"""
+
+import argparse
+import contextlib
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from common.config import (
+    MUTE_DURATION, MESSAGE_TYPE_PUBLIC, MESSAGE_TYPE_PRIVATE, MESSAGE_TYPE_SYSTEM
+)
+from common.protocol import Message, encode_message
+from server.chat_server import ChatServer
+from server.client_handler import ClientHandler
+from server.clock import VirtualClock
+from server.transport import memory_socketpair
+
+
+class SimHandler(ClientHandler):
+    """
+    Thread'siz ClientHandler: karşı taraftan gelen byte'lar feed() ile aynı
+    thread'de işlenir, kalan her şey (join, rate limit, routing) aynı koddur
+    """
+    
+    def __init__(self, client_socket, address, server):
+        super().__init__(client_socket, address, server)
+        self.buffer = b''
+        self.joined = False
+        self.finished = False
+        client_socket.on_data = self.feed
+    
+    def start(self):
+        """Thread başlatılmaz"""
+        self.running = True
+    
+    def feed(self, data):
+        """Gelen byte'ları satırlara böl ve işle; b'' bağlantının kapandığını bildirir"""
+        if not data:
+            self._finish()
+            return
+        
+        self.server.bytes_received.inc(len(data))
+        self.buffer += data
+        if b'\n' not in data:
+            return
+        
+        # Thread'li handler'daki FrameReader gibi: bu parçadaki tüm frame'ler birlikte
+        started = time.perf_counter_ns()
+        *lines, self.buffer = self.buffer.split(b'\n')
+        messages = []
+        for line in lines:
+            try:
+                messages.append(Message.from_dict(json.loads(line)))
+            except ValueError:
+                continue
+        if not messages:
+            return
+        self._record_decode(time.perf_counter_ns() - started)
+        for message in messages:
+            self.server.frames_received.labels(str(message.type)).inc()
+        
+        if not self.joined and self.running:
+            self.joined = self._join(messages.pop(0))
+            if not self.joined:
+                self.running = False
+        if messages and self.running:
+            self._process_messages(messages)
+        
+        # EXIT veya kick: thread'li handler'daki döngü sonu
+        if not self.running:
+            self._finish()
+    
+    def _finish(self):
+        """Bir kez temizlik yap"""
+        if self.finished:
+            return
+        self.finished = True
+        self.running = False
+        self._cleanup()
+
+
+class SimClient:
+    """
+    Simüle kullanıcı
+    Normal kullanıcılar rate limit altında konuşur, arada ayrılıp geri gelir;
+    spammer'lar art arda mesaj atar, mute'u dinlemez ve kick sonrası geri bağlanır
+    """
+    
+    def __init__(self, sim, index, spammer):
+        self.sim = sim
+        self.index = index
+        self.spammer = spammer
+        self.requested = f"{'spam' if spammer else 'user'}{index}"
+        self.nickname = None
+        self.sock = None
+        self.frames = 0
+        self.bytes = 0
+        self.mutes = 0
+        self.kicks = 0
+        self.muted_until = 0.0
+        self.rng = random.Random(f"{sim.seed}:{index}")
+    
+    def connect(self):
+        """Bellek içi bağlantı aç ve nickname gönder"""
+        server_end, client_end = memory_socketpair()
+        client_end.on_data = self._on_data
+        self.sock = client_end
+        address = (f"10.{self.index >> 16 & 255}.{self.index >> 8 & 255}.{self.index & 255}",
+                   40000 + self.sim.stats['connects'] % 20000)
+        self.sim.stats['connects'] += 1
+        self.sim.server.attach_client(server_end, address, SimHandler)
+        self._send({'type': MESSAGE_TYPE_SYSTEM, 'content': self.requested})
+        
+        if self.nickname:
+            self.sim.schedule(self._next_delay(), self.act)
+        else:
+            self.sim.stats['rejected'] += 1
+    
+    def _send(self, message):
+        if self.sock is not None:
+            self.sock.sendall(encode_message(message))
+    
+    def _on_data(self, data):
+        """Server'dan gelen frame'ler (her sendall bir frame)"""
+        if not data:
+            # Server bağlantıyı kapattı (kick, EXIT sonrası)
+            self.sim.set_offline(self)
+            self.sock = None
+            self.nickname = None
+            return
+        
+        self.frames += 1
+        self.bytes += len(data)
+        # Sadece tepki verilecek frame'ler parse edilir
+        if self.nickname is None and b'Connected as ' in data:
+            self.nickname = json.loads(data)['content'][len('Connected as '):]
+            self.sim.set_online(self)
+        elif b'"type": "MUTE"' in data:
+            self.mutes += 1
+            self.muted_until = self.sim.clock.time() + MUTE_DURATION
+        elif b'"type": "KICK"' in data:
+            self.kicks += 1
+    
+    def _next_delay(self):
+        sim = self.sim
+        rate = sim.spam_rate if self.spammer else sim.rate
+        return self.rng.expovariate(rate)
+    
+    def act(self):
+        """Sıradaki eylem"""
+        sim = self.sim
+        if self.sock is None:
+            return
+        
+        if self.spammer:
+            self._burst(sim.burst_size)
+            return
+        
+        if sim.clock.time() < self.muted_until:
+            sim.schedule(self.muted_until - sim.clock.time(), self.act)
+            return
+        
+        roll = self.rng.random()
+        if roll < sim.leave_probability:
+            self._send({'type': MESSAGE_TYPE_SYSTEM, 'content': 'EXIT'})
+            sim.stats['leaves'] += 1
+            sim.schedule(self.rng.expovariate(1.0 / sim.rejoin_delay), self.connect)
+            return
+        
+        if roll < sim.leave_probability + sim.private_ratio and len(sim.online) > 1:
+            recipient = sim.online[self.rng.randrange(len(sim.online))].nickname
+            self._send({'type': MESSAGE_TYPE_PRIVATE, 'recipient': recipient,
+                        'content': sim.content})
+            sim.stats['private_sent'] += 1
+        else:
+            self._send({'type': MESSAGE_TYPE_PUBLIC, 'content': sim.content})
+            sim.stats['public_sent'] += 1
+        
+        sim.schedule(self._next_delay(), self.act)
+    
+    def _burst(self, remaining):
+        """Spam: burst_interval aralıklarla mesaj, mute'u yok say"""
+        sim = self.sim
+        if self.sock is None:
+            # Kick edildi, bir süre sonra geri gel
+            sim.schedule(sim.reconnect_delay, self.connect)
+            return
+        
+        self._send({'type': MESSAGE_TYPE_PUBLIC, 'content': sim.content})
+        sim.stats['spam_sent'] += 1
+        if remaining > 1:
+            sim.schedule(sim.burst_interval, lambda: self._burst(remaining - 1))
+        elif self.sock is not None:
+            sim.schedule(self._next_delay(), self.act)
+        else:
+            sim.schedule(sim.reconnect_delay, self.connect)
+
+
+class Simulator:
+    """Olay kuyruğu + sanal saat + bellek içi transport üzerinde gerçek ChatServer"""
+    
+    def __init__(self, clients=1000, duration=3600.0, seed=1, rate=1 / 300.0,
+                 private_ratio=0.2, leave_probability=0.02, rejoin_delay=120.0,
+                 spammers=0.0, spam_rate=1 / 600.0, burst_size=20, burst_interval=0.2,
+                 reconnect_delay=60.0, ramp=60.0, message_size=48, sample_interval=1.0):
+        self.clients = clients
+        self.duration = duration
+        self.seed = seed
+        self.rate = rate
+        self.private_ratio = private_ratio
+        self.leave_probability = leave_probability
+        self.rejoin_delay = rejoin_delay
+        self.spammers = spammers
+        self.spam_rate = spam_rate
+        self.burst_size = burst_size
+        self.burst_interval = burst_interval
+        self.reconnect_delay = reconnect_delay
+        self.ramp = ramp
+        self.content = 'x' * message_size
+        self.sample_interval = sample_interval
+        
+        self.clock = VirtualClock()
+        self.queue = []
+        self.sequence = itertools.count()
+        self.online = []            # private hedefleri için, deterministik sıra
+        self.online_index = {}      # SimClient -> online'daki konumu
+        self.server = None
+        self.sims = []
+        self.stats = dict.fromkeys(('connects', 'rejected', 'leaves', 'public_sent',
+                                    'private_sent', 'spam_sent'), 0)
+    
+    def schedule(self, delay, func):
+        """func'ı delay saniye sonra (sanal) çalıştır"""
+        heapq.heappush(self.queue, (self.clock.time() + delay, next(self.sequence), func))
+    
+    def set_online(self, client):
+        self.online_index[client] = len(self.online)
+        self.online.append(client)
+    
+    def set_offline(self, client):
+        """O(1) çıkarma: son elemanı boşalan yere taşı"""
+        position = self.online_index.pop(client, None)
+        if position is None:
+            return
+        last = self.online.pop()
+        if last is not client:
+            self.online[position] = last
+            self.online_index[last] = position
+    
+    def _sample(self):
+        self.server.sample_timeseries()
+        self.schedule(self.sample_interval, self._sample)
+    
+    def run(self):
+        """Simülasyonu çalıştır ve raporu döndür"""
+        # Aynı nickname çakışmalarında server'ın rastgele suffix'i de tekrarlanabilir olsun
+        random.seed(self.seed)
+        
+        # Flusher ve fan-out thread'leri gerçek zamanla çalışır; simülasyonda
+        # frame'ler beklemeden, olay sırasıyla gider
+        self.server = ChatServer(port=0, http_port=0, ws_port=0, clock=self.clock,
+                                 write_coalesce_delay=0, fanout_workers=0)
+        # Arama index thread'i çalışmıyor, kuyruğu boşuna büyümesin
+        self.server.logger.listeners.remove(self.server.search_index.submit)
+        self.server.logger.segment_listeners.remove(self.server.search_index.on_segment)
+        
+        rng = random.Random(self.seed)
+        spammer_count = int(self.clients * self.spammers)
+        spammer_ids = set(rng.sample(range(self.clients), spammer_count))
+        self.sims = [SimClient(self, i, i in spammer_ids) for i in range(self.clients)]
+        for i, client in enumerate(self.sims):
+            self.schedule(self.ramp * i / max(self.clients, 1), client.connect)
+        self.schedule(self.sample_interval, self._sample)
+        
+        end = self.clock.time() + self.duration
+        events = 0
+        started = time.perf_counter()
+        while self.queue and self.queue[0][0] <= end:
+            at, _, func = heapq.heappop(self.queue)
+            self.clock.set(at)
+            func()
+            events += 1
+        self.clock.set(end)
+        wall = time.perf_counter() - started
+        
+        return self._report(events, wall)
+    
+    def _report(self, events, wall):
+        server = self.server
+        decisions = {key[0]: value for key, value in
+                     server.rate_limit_decisions.values.totals().items()}
+        
+        deterministic = {
+            'events': events,
+            'connections': server.total_connections,
+            'connected_at_end': len(server.clients),
+            'messages_routed': server.message_count,
+            'frames_received': server.frames_received.total(),
+            'frames_sent': server.frames_sent.total(),
+            'bytes_sent': server.bytes_sent.total(),
+            'rate_limit': {name: decisions.get(name, 0)
+                           for name in ('ok', 'warning', 'mute', 'kick')},
+            'client_side': {
+                'frames_received': sum(c.frames for c in self.sims),
+                'mutes_seen': sum(c.mutes for c in self.sims),
+                'kicks_seen': sum(c.kicks for c in self.sims)
+            },
+            'actions': dict(self.stats)
+        }
+        fingerprint = hashlib.sha256(
+            json.dumps(deterministic, sort_keys=True).encode()).hexdigest()[:16]
+        
+        return {
+            'config': {
+                'clients': self.clients, 'duration': self.duration, 'seed': self.seed,
+                'rate': self.rate, 'private_ratio': self.private_ratio,
+                'leave_probability': self.leave_probability, 'spammers': self.spammers,
+                'burst_size': self.burst_size
+            },
+            'virtual_seconds': self.duration,
+            'wall_seconds': round(wall, 3),
+            'speedup': round(self.duration / wall, 1) if wall else None,
+            'fingerprint': fingerprint,
+            'results': deterministic,
+            # Gerçek CPU maliyeti: deterministik değil, fingerprint'e girmez
+            'server_latency': server.latency.summary()
+        }
+
+
+def main(argv=None):
+    """Ana fonksiyon"""
+    parser = argparse.ArgumentParser(description='Virtual-time chat server simulation')
+    parser.add_argument('--clients', type=int, default=1000,
+                       help='Simulated users (default: 1000)')
+    parser.add_argument('--duration', type=float, default=3600.0,
+                       help='Virtual seconds to simulate (default: 3600)')
+    parser.add_argument('--seed', type=int, default=1,
+                       help='Random seed; same seed gives the same fingerprint (default: 1)')
+    parser.add_argument('--rate', type=float, default=1 / 300.0,
+                       help='Messages per second per normal user (default: 1/300)')
+    parser.add_argument('--private-ratio', type=float, default=0.2,
+                       help='Share of private messages (default: 0.2)')
+    parser.add_argument('--leave', type=float, default=0.02,
+                       help='Probability an action is leaving and rejoining later (default: 0.02)')
+    parser.add_argument('--spammers', type=float, default=0.01,
+                       help='Share of users that spam and ignore mutes (default: 0.01)')
+    parser.add_argument('--burst-size', type=int, default=20,
+                       help='Messages per spam burst (default: 20)')
+    parser.add_argument('--ramp', type=float, default=60.0,
+                       help='Virtual seconds over which users join (default: 60)')
+    parser.add_argument('--workdir', type=str, default=None,
+                       help='Directory for the server log files (default: temporary)')
+    parser.add_argument('--verbose', action='store_true',
+                       help='Show server console output')
+    parser.add_argument('--output', type=str, default=None,
+                       help='Write the JSON report to this file')
+    
+    args = parser.parse_args(argv)
+    
+    simulator = Simulator(clients=args.clients, duration=args.duration, seed=args.seed,
+                          rate=args.rate, private_ratio=args.private_ratio,
+                          leave_probability=args.leave, spammers=args.spammers,
+                          burst_size=args.burst_size, ramp=args.ramp)
+    
+    print(f"🧪 Simulating {args.clients} clients for {args.duration:.0f} virtual seconds "
+          f"(seed {args.seed})")
+    
+    cwd = os.getcwd()
+    with contextlib.ExitStack() as stack:
+        workdir = args.workdir or stack.enter_context(tempfile.TemporaryDirectory())
+        os.makedirs(workdir, exist_ok=True)
+        os.chdir(workdir)
+        stack.callback(os.chdir, cwd)
+        if not args.verbose:
+            devnull = stack.enter_context(open(os.devnull, 'w'))
+            stack.enter_context(contextlib.redirect_stdout(devnull))
+        report = simulator.run()
+    
+    results = report['results']
+    print(f"⏱️  {report['virtual_seconds']:.0f}s simulated in {report['wall_seconds']}s "
+          f"({report['speedup']}x), {results['events']} events")
+    print(f"📨 Routed {results['messages_routed']} messages, "
+          f"{results['frames_sent']} frames sent, {results['connected_at_end']} online at end")
+    print(f"🚦 Rate limit: {results['rate_limit']}")
+    print(f"🔑 Fingerprint: {report['fingerprint']}")
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
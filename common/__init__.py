@@ -6,11 +6,12 @@ Ortak kullanılan modüller: config, protocol, utils
 """
 
 from .config import *
-from .protocol import Message, send_message, receive_message, create_message
+from .protocol import Message, FrameReader, send_message, receive_message, create_message
 from .utils import *
 
 __all__ = [
     'Message',
+    'FrameReader',
     'send_message',
     'receive_message',
     'create_message',
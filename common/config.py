@@ -10,6 +10,17 @@ SERVER_HOST = '127.0.0.1'
 SERVER_PORT = 5000
 HTTP_PORT = 8080
 WEBSOCKET_PORT = 8765
+KEEP_ALIVE_TIMEOUT = 30  # saniye - boşta kalan dashboard HTTP bağlantıları kapatılır
+STATS_SNAPSHOT_INTERVAL = 1  # saniye - dashboard stats snapshot üretim aralığı
+SSE_HEARTBEAT_INTERVAL = 15  # saniye - boşta SSE bağlantılarına ping
+
+# WebSocket Gateway Ayarları
+WS_MAX_MESSAGE_SIZE = 64 * 1024   # byte - bundan büyük mesajlar bağlantıyı kapatır (1009)
+WS_MAX_BUFFERED = 1024 * 1024     # byte - gönderilemeyen veri bu sınırı aşarsa yavaş client düşürülür
+WS_PING_INTERVAL = 30             # saniye - boşta bağlantılara ping, 2 katı sürede cevap yoksa kapat
+WS_HANDSHAKE_TIMEOUT = 10         # saniye
+WS_WORKERS = 4                    # gelen mesajları işleyen thread sayısı (selector thread'i sadece I/O yapar)
+WS_MAX_PENDING_MESSAGES = 256     # işlenmeyi bekleyen mesaj bu sınırı aşarsa bağlantı kapatılır (1013)
 
 # Rate Limiting Ayarları
 RATE_LIMIT_WINDOW = 5  # saniye
@@ -21,6 +32,45 @@ MUTE_DURATION = 30        # saniye
 # Log Ayarları
 LOG_FILE = "logs/chat_server.log"
 LOG_TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+LOG_FORMAT = 'text'               # 'text' veya 'json' (satır başına bir JSON kaydı)
+LOG_INDEX_INTERVAL = 100          # JSON modunda her N kayıtta bir zaman -> offset index noktası
+LOG_MAX_BYTES = 5 * 1024 * 1024   # aktif log dosyası bu boyutu geçince döndürülür (0 = kapalı)
+LOG_ROTATE_INTERVAL = 24 * 3600   # saniye - zaman bazlı döndürme (0 = kapalı)
+LOG_BACKUP_COUNT = 10             # saklanacak sıkıştırılmış arşiv sayısı
+LOG_MAX_AGE_DAYS = 30             # bundan eski arşivler silinir (0 = kapalı)
+LOG_BUFFER_SIZE = 500             # bellekte tutulan son log kaydı sayısı (dashboard için)
+
+# Time Series Ayarları (dashboard grafikleri)
+TIMESERIES_FINE_STEP = 1          # saniye
+TIMESERIES_FINE_SLOTS = 600       # 1s x 600 = 10 dakika
+TIMESERIES_COARSE_STEP = 60       # saniye
+TIMESERIES_COARSE_SLOTS = 1440    # 1dk x 1440 = 24 saat
+
+# Giden Frame Birleştirme (write coalescing)
+WRITE_COALESCE_DELAY = 0.002      # saniye - frame'ler bu kadar bekleyip tek sendmsg ile gider (0 = beklemeden)
+WRITE_COALESCE_MAX_BYTES = 64 * 1024  # tek sendmsg'deki en fazla byte
+WRITE_COALESCE_MAX_FRAMES = 512   # tek sendmsg'deki en fazla frame (IOV_MAX altında)
+WRITE_MAX_BUFFERED = 1024 * 1024  # byte - gönderilemeyen veri bu sınırı aşarsa yavaş client düşürülür
+SHUTDOWN_FLUSH_TIMEOUT = 1.0      # saniye - kapanışta tüm client kuyruklarının boşalması için ortak süre
+
+# Paralel Fan-out (çok büyük odalar)
+FANOUT_WORKERS = 0                # broadcast'i alıcı shard'larına bölen sender thread sayısı (0 = broadcast eden thread dağıtır)
+
+# Arama Index Ayarları
+SEARCH_DOCS_FILE = "logs/search_docs.jsonl"
+SEARCH_INDEX_FILE = "logs/search.idx"
+SEARCH_FLUSH_INTERVAL = 30        # saniye - index'in diske yazılma aralığı
+
+# Shared Memory İstatistikleri (python -m server.chatstat)
+STATS_SHM_ENABLED = True
+STATS_SHM_PREFIX = "chatstat"     # segment adı: chatstat_<port>
+STATS_SHM_INTERVAL = 0.2          # saniye - segmentin güncellenme aralığı (sayaçlar)
+STATS_SHM_SLOW_INTERVAL = 1.0     # saniye - gecikme özeti, mute ve thread sayısı bu aralıkla hesaplanır
+
+# Debug Endpoint Ayarları (/debug/*)
+DEBUG_ENDPOINTS_ENABLED = True    # production'da dışarı açık bir portta kapatılmalı
+PROFILE_SAMPLE_HZ = 100           # /debug/profile varsayılan örnekleme hızı
+PROFILE_MAX_SECONDS = 60          # tek bir profil en fazla bu kadar sürebilir
 
 # GUI Ayarları
 GUI_WIDTH = 700
@@ -7,6 +7,7 @@ Mesaj gönderme/alma ve protokol fonksiyonları
 
 import json
 import socket
+import time
 from datetime import datetime
 
 
@@ -45,32 +46,41 @@ class Message:
         return f"Message({self.type}, {self.sender} -> {self.recipient}: {self.content})"
 
 
-def send_message(sock, message):
+def encode_message(message):
+    """
+    Mesajı kablo formatına çevir (JSON + '\n')
+    Broadcast'te bir kez encode edilip tüm alıcılara aynı byte'lar gönderilir
+    """
+    data = message.to_dict() if isinstance(message, Message) else message
+    return json.dumps(data, ensure_ascii=False).encode('utf-8') + b'\n'
+
+
+def send_message(sock, message, on_bytes=None):
     """
     Socket üzerinden mesaj gönder
     Args:
         sock: Socket nesnesi
         message: Message nesnesi veya dict
+        on_bytes: Gönderilen byte sayısıyla çağrılır (opsiyonel, metrikler için)
     """
     try:
-        if isinstance(message, Message):
-            data = message.to_dict()
-        else:
-            data = message
-        
-        json_data = json.dumps(data, ensure_ascii=False)
-        sock.sendall(json_data.encode('utf-8') + b'\n')
+        payload = encode_message(message)
+        sock.sendall(payload)
+        if on_bytes:
+            on_bytes(len(payload))
         return True
     except Exception as e:
         print(f"❌ Error sending message: {e}")
         return False
 
 
-def receive_message(sock):
+def receive_message(sock, on_bytes=None, on_decode=None):
     """
     Socket'ten mesaj al
     Args:
         sock: Socket nesnesi
+        on_bytes: Okunan byte sayısıyla çağrılır (opsiyonel, metrikler için)
+        on_decode: Decode süresiyle (nanosaniye) çağrılır (opsiyonel)
     Returns:
         Message nesnesi veya None
     """
@@ -80,10 +90,14 @@ def receive_message(sock):
             chunk = sock.recv(4096)
             if not chunk:
                 return None
+            if on_bytes:
+                on_bytes(len(chunk))
             data += chunk
             if b'\n' in data:
                 break
         
+        decode_started = time.perf_counter_ns()
+        
         # Sadece ilk satırı al (ilk \n'e kadar)
         first_line = data.split(b'\n')[0]
         json_str = first_line.decode('utf-8').strip()
@@ -92,7 +106,10 @@ def receive_message(sock):
             return None
         
         message_dict = json.loads(json_str)
-        return Message.from_dict(message_dict)
+        message = Message.from_dict(message_dict)
+        if on_decode:
+            on_decode(time.perf_counter_ns() - decode_started)
+        return message
     except json.JSONDecodeError as e:
         print(f"❌ JSON decode error: {e}")
         print(f"❌ Received data: {data[:200]}")  # İlk 200 byte'ı göster
@@ -102,6 +119,60 @@ def receive_message(sock):
         return None
 
 
+class FrameReader:
+    """
+    Satır bazlı (JSON + '\n') frame okuyucu
+    Bir recv'de gelen tüm frame'leri birlikte döndürür, yarım kalan satırı
+    bir sonraki okumaya saklar (receive_message ilk satırdan sonrasını atar)
+    """
+    
+    def __init__(self, sock, on_bytes=None, on_decode=None, bufsize=65536):
+        self.sock = sock
+        self.on_bytes = on_bytes        # okunan byte sayısıyla çağrılır
+        self.on_decode = on_decode      # grubun decode süresiyle (ns) çağrılır
+        self.bufsize = bufsize
+        self.buffer = b''
+    
+    def read_frames(self):
+        """
+        En az bir frame gelene kadar oku
+        Returns:
+            list: Message listesi (boş değil) veya bağlantı kapandıysa None
+        """
+        while True:
+            try:
+                chunk = self.sock.recv(self.bufsize)
+            except Exception as e:
+                print(f"❌ Error receiving message: {e}")
+                return None
+            if not chunk:
+                return None
+            if self.on_bytes:
+                self.on_bytes(len(chunk))
+            
+            self.buffer += chunk
+            if b'\n' not in chunk:
+                continue
+            
+            decode_started = time.perf_counter_ns()
+            *lines, self.buffer = self.buffer.split(b'\n')
+            messages = []
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    messages.append(Message.from_dict(json.loads(line)))
+                except (ValueError, AttributeError) as e:
+                    # Bozuk frame sadece kendisini düşürür, bağlantı devam eder
+                    print(f"❌ JSON decode error: {e}")
+                    print(f"❌ Received data: {line[:200]}")
+            
+            if messages:
+                if self.on_decode:
+                    self.on_decode(time.perf_counter_ns() - decode_started)
+                return messages
+
+
 def create_message(msg_type, sender=None, recipient=None, content=None):
     """
     Hızlı mesaj oluşturma helper fonksiyonu
@@ -9,6 +9,7 @@ import argparse
 import signal
 import sys
 from server import ChatServer
+from common.config import FANOUT_WORKERS
 
 
 def signal_handler(sig, frame):
@@ -29,6 +30,12 @@ def main():
                        help='HTTP server port (default: 8080)')
     parser.add_argument('--ws-port', type=int, default=8765,
                        help='WebSocket server port (default: 8765)')
+    parser.add_argument('--log-format', choices=['text', 'json'], default='text',
+                       help='Log file format (default: text)')
+    parser.add_argument('--capture', type=str, default=None,
+                       help='Record inbound frames to this file for bench.replay')
+    parser.add_argument('--fanout-workers', type=int, default=FANOUT_WORKERS,
+                       help=f'Broadcast fan-out worker threads, 0 = inline (default: {FANOUT_WORKERS})')
     
     args = parser.parse_args()
     
@@ -41,7 +48,10 @@ def main():
             host=args.host,
             port=args.port,
             http_port=args.http_port,
-            ws_port=args.ws_port
+            ws_port=args.ws_port,
+            log_format=args.log_format,
+            capture_file=args.capture,
+            fanout_workers=args.fanout_workers
         )
         server.start()
     except Exception as e:
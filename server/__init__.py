@@ -8,7 +8,9 @@ Chat server modülleri
 from .chat_server import ChatServer
 from .client_handler import ClientHandler
 from .logger import ChatLogger
+from .metrics import MetricsRegistry
 from .rate_limiter import RateLimiter
+from .search_index import SearchIndex
 from .web_server import WebServer
 
-__all__ = ['ChatServer', 'ClientHandler', 'ChatLogger', 'RateLimiter', 'WebServer']
\ No newline at end of file
+__all__ = ['ChatServer', 'ClientHandler', 'ChatLogger', 'MetricsRegistry', 'RateLimiter', 'SearchIndex', 'WebServer']
\ No newline at end of file
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Analytics Module
+chat_server.log (ve döndürülmüş .gz segmentleri) üzerinde tek geçişte
+çalışan rapor aracı
+
+Satırlar generator'larla akar, dosyalar belleğe alınmaz. Toplamlar ise
+bellekte tutulur: bellek log satırı sayısıyla değil, (dakika, kullanıcı)
+çifti ve dakika sayısıyla büyür; aylarca süren ve çok kullanıcılı bir log
+için bu da yüzlerce MB'a çıkabilir. Hız Python satır parser'ıyla sınırlıdır
+(tek çekirdekte ~12 MB/s), disk hızına yaklaşmaz.
+
+Kullanım:
+    python -m server.analytics                       # özet (JSON)
+    python -m server.analytics --report user-minute --format csv
+    python -m server.analytics logs/chat_server.log.20251120-000000.gz
+"""
+
+import argparse
+import csv
+import gzip
+import json
+import sys
+from collections import defaultdict
+from common.config import LOG_FILE
+from server.logger import parse_log_line, rotated_log_files
+
+
+SESSION_MARKERS = ('Server Started:',)
+
+REPORTS = ('summary', 'user-minute', 'moderation', 'concurrency')
+
+
+def iter_lines(paths):
+    """Dosyaları sırayla satır satır oku (.gz dosyaları şeffaf olarak açılır)"""
+    for path in paths:
+        opener = gzip.open if path.endswith('.gz') else open
+        try:
+            with opener(path, 'rt', encoding='utf-8', errors='replace') as f:
+                yield from f
+        except FileNotFoundError:
+            print(f"❌ Log file not found: {path}", file=sys.stderr)
+
+
+def iter_records(lines):
+    """
+    Satırları logger'ın grammar'ı ile parse et
+    Server yeniden başlangıçları {'type': 'SESSION'} kaydı olarak verilir
+    """
+    for line in lines:
+        if line.startswith(SESSION_MARKERS):
+            yield {'type': 'SESSION'}
+            continue
+        
+        record = parse_log_line(line)
+        if record is None:
+            continue
+        
+        # JSON modunda oturum başlığı SYSTEM kaydı olarak yazılır
+        if record['type'] == 'SYSTEM' and record['message'].startswith(SESSION_MARKERS):
+            yield {'type': 'SESSION'}
+            continue
+        
+        yield record
+
+
+def default_log_files(log_file=LOG_FILE):
+    """Eskiden yeniye: döndürülmüş arşivler, sonra aktif dosya"""
+    return rotated_log_files(log_file) + [log_file]
+
+
+class LogAnalyzer:
+    """Kayıtları tek geçişte toplayan sınıf - bellek (dakika, kullanıcı) çifti sayısıyla büyür"""
+    
+    def __init__(self):
+        self.user_minute = defaultdict(int)      # {(dakika, kullanıcı): mesaj}
+        self.moderation = defaultdict(lambda: [0, 0, 0])   # {dakika: [warning, mute, kick]}
+        self.concurrency = {}                    # {dakika: o dakikadaki en yüksek eşzamanlılık}
+        
+        self.online = set()
+        self.peak_concurrency = 0
+        self.peak_time = None
+        
+        self.type_counts = defaultdict(int)
+        self.total_records = 0
+        self.sessions = 0
+        self.first_timestamp = None
+        self.last_timestamp = None
+    
+    def feed(self, record):
+        """Bir kaydı işle"""
+        log_type = record['type']
+        
+        if log_type == 'SESSION':
+            # Server yeniden başladı, bağlı kullanıcılar düştü
+            self.sessions += 1
+            self.online.clear()
+            return
+        
+        self.total_records += 1
+        self.type_counts[log_type] += 1
+        
+        timestamp = record['timestamp']
+        minute = timestamp[:16]
+        if self.first_timestamp is None:
+            self.first_timestamp = timestamp
+        self.last_timestamp = timestamp
+        
+        if log_type in ('PUBLIC', 'PRIVATE'):
+            if record['sender']:
+                self.user_minute[(minute, record['sender'])] += 1
+            return
+        
+        if log_type != 'SYSTEM':
+            return
+        
+        message = record['message']
+        if message.endswith(' connected') and '@' in message:
+            self.online.add(message.split('@', 1)[0])
+            self._update_concurrency(minute, timestamp)
+        elif message.endswith(' disconnected') and '@' in message:
+            self.online.discard(message.split('@', 1)[0])
+        elif ' received rate limit warning ' in message:
+            self.moderation[minute][0] += 1
+        elif ' muted for ' in message:
+            self.moderation[minute][1] += 1
+        elif message.endswith(' kicked for spamming'):
+            self.moderation[minute][2] += 1
+    
+    def _update_concurrency(self, minute, timestamp):
+        """Eşzamanlı kullanıcı zirvesini güncelle"""
+        current = len(self.online)
+        if current > self.concurrency.get(minute, 0):
+            self.concurrency[minute] = current
+        if current > self.peak_concurrency:
+            self.peak_concurrency = current
+            self.peak_time = timestamp
+    
+    def consume(self, records):
+        """Generator'ı sonuna kadar tüket"""
+        for record in records:
+            self.feed(record)
+        return self
+    
+    def report(self, name):
+        """
+        Raporu satır listesi olarak döndür
+        Returns:
+            (list, list): (kolon_isimleri, satırlar)
+        """
+        if name == 'user-minute':
+            rows = [[minute, user, count]
+                    for (minute, user), count in sorted(self.user_minute.items())]
+            return ['minute', 'user', 'messages'], rows
+        
+        if name == 'moderation':
+            rows = [[minute] + counts for minute, counts in sorted(self.moderation.items())]
+            return ['minute', 'warnings', 'mutes', 'kicks'], rows
+        
+        if name == 'concurrency':
+            rows = [[minute, peak] for minute, peak in sorted(self.concurrency.items())]
+            return ['minute', 'peak_users'], rows
+        
+        # summary
+        warnings = sum(c[0] for c in self.moderation.values())
+        mutes = sum(c[1] for c in self.moderation.values())
+        kicks = sum(c[2] for c in self.moderation.values())
+        minutes = max(len({m for m, _ in self.user_minute} | set(self.moderation)), 1)
+        rows = [
+            ['records', self.total_records],
+            ['sessions', self.sessions],
+            ['first_timestamp', self.first_timestamp],
+            ['last_timestamp', self.last_timestamp],
+            ['public_messages', self.type_counts['PUBLIC']],
+            ['private_messages', self.type_counts['PRIVATE']],
+            ['active_users', len({u for _, u in self.user_minute})],
+            ['warnings', warnings],
+            ['mutes', mutes],
+            ['kicks', kicks],
+            ['warnings_per_active_minute', round(warnings / minutes, 3)],
+            ['mutes_per_active_minute', round(mutes / minutes, 3)],
+            ['kicks_per_active_minute', round(kicks / minutes, 3)],
+            ['peak_concurrency', self.peak_concurrency],
+            ['peak_time', self.peak_time],
+        ]
+        return ['metric', 'value'], rows
+
+
+def write_report(columns, rows, output_format, out):
+    """Raporu CSV ya da JSON olarak yaz"""
+    if output_format == 'csv':
+        writer = csv.writer(out)
+        writer.writerow(columns)
+        writer.writerows(rows)
+    else:
+        json.dump([dict(zip(columns, row)) for row in rows], out, ensure_ascii=False, indent=2)
+        out.write('\n')
+
+
+def main(argv=None):
+    """Ana fonksiyon"""
+    parser = argparse.ArgumentParser(description='Chat Server - Log Analytics')
+    parser.add_argument('files', nargs='*',
+                       help='Log files to read in order (default: rotated archives + active log)')
+    parser.add_argument('--report', choices=REPORTS, default='summary',
+                       help='Report to produce (default: summary)')
+    parser.add_argument('--format', choices=['json', 'csv'], default='json',
+                       help='Output format (default: json)')
+    parser.add_argument('--output', type=str, default=None,
+                       help='Output file (default: stdout)')
+    
+    args = parser.parse_args(argv)
+    
+    files = args.files or default_log_files()
+    analyzer = LogAnalyzer().consume(iter_records(iter_lines(files)))
+    columns, rows = analyzer.report(args.report)
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8', newline='') as out:
+            write_report(columns, rows, args.format, out)
+    else:
+        write_report(columns, rows, args.format, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
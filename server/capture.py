@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Capture Module
+Gelen frame'lerin zaman damgalı kompakt binary kaydı (python -m bench.replay ile oynatılır)
+
+Dosya formatı (little-endian):
+    8   MAGIC b'CHATCAP1'
+    8   d    capture başlangıcı (unix zamanı)
+    sonra kayıtlar:
+        8  Q  başlangıçtan beri mikrosaniye
+        4  I  bağlantı id'si
+        1  B  tür (OPEN / FRAME / CLOSE)
+        4  I  payload uzunluğu
+        N     payload: OPEN'da "ip:port", FRAME'de JSON frame (satır sonu hariç)
+"""
+
+import atexit
+import json
+import struct
+import threading
+import time
+
+
+MAGIC = b'CHATCAP1'
+FILE_HEADER = struct.Struct('<8sd')
+RECORD = struct.Struct('<QIBI')
+
+OPEN = 0
+FRAME = 1
+CLOSE = 2
+
+FLUSH_INTERVAL = 1.0    # saniye - çökme durumunda kaybedilecek en fazla kayıt süresi
+
+
+class TrafficCapture:
+    """
+    Client'lardan gelen frame'leri dosyaya ekler
+    Birden çok client thread'i ve WebSocket gateway'i aynı anda yazabilir
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = open(path, 'wb', buffering=1 << 20)
+        self.started = time.time()
+        self.started_perf = time.perf_counter()
+        self.last_flush = self.started_perf
+        self.open_connections = set()
+        self.records = 0
+        self.bytes = FILE_HEADER.size
+        self.file.write(FILE_HEADER.pack(MAGIC, self.started))
+        # Ctrl+C ile çıkışta stop() çağrılmasa da buffer diske yazılsın
+        atexit.register(self.close)
+    
+    def _write(self, conn_id, kind, payload):
+        """Tek kayıt (lock altında çağrılır)"""
+        now = time.perf_counter()
+        offset = int((now - self.started_perf) * 1e6)
+        self.file.write(RECORD.pack(offset, conn_id, kind, len(payload)))
+        self.file.write(payload)
+        self.records += 1
+        self.bytes += RECORD.size + len(payload)
+        if now - self.last_flush >= FLUSH_INTERVAL:
+            self.file.flush()
+            self.last_flush = now
+    
+    def record_frame(self, handler, message):
+        """Handler'ın aldığı frame'i kaydet; bağlantının ilk frame'inde OPEN da yazılır"""
+        payload = json.dumps(message.to_dict(), ensure_ascii=False).encode('utf-8')
+        with self.lock:
+            if self.file is None:
+                return
+            if handler.conn_id not in self.open_connections:
+                self.open_connections.add(handler.conn_id)
+                address = f"{handler.address[0]}:{handler.address[1]}".encode('utf-8')
+                self._write(handler.conn_id, OPEN, address)
+            self._write(handler.conn_id, FRAME, payload)
+    
+    def record_close(self, handler):
+        """Bağlantı kapandı (sadece frame kaydedilmiş bağlantılar için)"""
+        with self.lock:
+            if self.file is None or handler.conn_id not in self.open_connections:
+                return
+            self.open_connections.discard(handler.conn_id)
+            self._write(handler.conn_id, CLOSE, b'')
+    
+    def close(self):
+        """Dosyayı kapat"""
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+
+
+def read_capture(path):
+    """
+    Capture dosyasını oku
+    Yields:
+        (saniye, conn_id, tür, payload) - saniye capture başlangıcından itibaren
+    Raises:
+        ValueError: dosya capture formatında değilse
+    """
+    with open(path, 'rb') as f:
+        header = f.read(FILE_HEADER.size)
+        if len(header) < FILE_HEADER.size or FILE_HEADER.unpack(header)[0] != MAGIC:
+            raise ValueError(f"{path} is not a chat capture file")
+        
+        while True:
+            head = f.read(RECORD.size)
+            if len(head) < RECORD.size:
+                return      # son kayıt yarım kalmış olabilir (çökme)
+            offset, conn_id, kind, length = RECORD.unpack(head)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            yield offset / 1e6, conn_id, kind, payload
+
+
+def capture_start_time(path):
+    """Capture'ın başladığı unix zamanı"""
+    with open(path, 'rb') as f:
+        return FILE_HEADER.unpack(f.read(FILE_HEADER.size))[1]
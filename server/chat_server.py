@@ -9,29 +9,59 @@ import socket
 import threading
 import time
 from datetime import datetime
-from common.protocol import Message
+from common.protocol import Message, encode_message
 from common.config import (
     SERVER_HOST, SERVER_PORT, HTTP_PORT, WEBSOCKET_PORT,
     MESSAGE_TYPE_JOIN, MESSAGE_TYPE_LEAVE, MESSAGE_TYPE_USER_LIST,
-    MESSAGE_TYPE_SYSTEM
+    MESSAGE_TYPE_SYSTEM, LOG_FORMAT, STATS_SHM_ENABLED, STATS_SHM_SLOW_INTERVAL,
+    WRITE_COALESCE_DELAY, FANOUT_WORKERS, SHUTDOWN_FLUSH_TIMEOUT
 )
 from common.utils import generate_random_suffix
 from server.logger import ChatLogger
 from server.rate_limiter import RateLimiter
-from server.client_handler import ClientHandler
+from server.search_index import SearchIndex
+from server.metrics import MetricsRegistry
+from server.latency import LatencyTracker
+from server.clock import SYSTEM_CLOCK
+from server.capture import TrafficCapture
+from server.output_buffer import WriteFlusher
+from server.fanout import FanOutPool
+from server.timeseries import TimeSeriesStore
+from server.shm_stats import SharedStatsWriter, segment_name
+from server.client_handler import ClientHandler, output_lane
 from server.web_server import WebServer
+from server.websocket_gateway import WebSocketGateway
 
 
 class ChatServer:
     """Ana chat server sınıfı"""
     
     def __init__(self, host=SERVER_HOST, port=SERVER_PORT, 
-                 http_port=HTTP_PORT, ws_port=WEBSOCKET_PORT):
+                 http_port=HTTP_PORT, ws_port=WEBSOCKET_PORT, log_format=LOG_FORMAT,
+                 clock=None, capture_file=None, write_coalesce_delay=WRITE_COALESCE_DELAY,
+                 fanout_workers=FANOUT_WORKERS):
         self.host = host
         self.port = port
         self.http_port = http_port
         self.ws_port = ws_port
         
+        # Rate limit, log zamanları ve heartbeat'ler bu saate göre (simülasyonda sanal)
+        self.clock = clock or SYSTEM_CLOCK
+        
+        # Gelen frame kaydı (python -m bench.replay ile oynatılır), start()'ta açılır
+        self.capture_file = capture_file
+        self.capture = None
+        
+        # Giden frame'ler bu kadar bekletilip birleştirilir (0 = beklemeden gönder);
+        # socket'i dolan bağlantıların kalanını da flusher yazılabilir olunca gönderir
+        self.write_flusher = WriteFlusher(write_coalesce_delay, on_flush=self.record_flush)
+        
+        # Broadcast'ler alıcı shard'larına bölünüp bu kadar worker'da dağıtılır (0 = inline)
+        self.fanout = None
+        if fanout_workers:
+            self.fanout = FanOutPool(fanout_workers, self.deliver_frames,
+                                     on_complete=self._record_fan_out)
+        
         # Server socket
         self.server_socket = None
         self.running = False
@@ -40,15 +70,92 @@ class ChatServer:
         self.clients = {}  # {nickname: ClientHandler}
         self.clients_lock = threading.Lock()
         
+        # Metrikler (/metrics) - web server kendi gauge'larını buraya ekler
+        self.metrics = MetricsRegistry()
+        self.latency = LatencyTracker()
+        self._setup_metrics()
+        
         # Modüller
-        self.logger = ChatLogger()
-        self.rate_limiter = RateLimiter()
+        self.logger = ChatLogger(log_format=log_format, clock=self.clock)
+        self.rate_limiter = RateLimiter(clock=self.clock)
+        self.search_index = SearchIndex()
+        self.logger.add_listener(self.search_index.submit)
+        self.logger.add_segment_listener(self.search_index.on_segment)
+        # Server kapalıyken retention'la silinmiş arşivlerin index segmentleri
+        self.search_index.retain(self.logger.segment_name(path)
+                                 for path in self.logger.get_rotated_files())
+        self.timeseries = TimeSeriesStore()
         self.web_server = WebServer(host=host, port=http_port, chat_server=self)
+        self.ws_gateway = WebSocketGateway(host, ws_port, self)
+        
+        # python -m server.chatstat için shared memory yayını
+        self.shared_stats = SharedStatsWriter(segment_name(port), self.collect_shared_stats)
+        self._slow_shared_stats = {}
+        self._slow_shared_at = None
         
         # İstatistikler
-        self.total_connections = 0
-        self.message_count = 0
-        self.start_time = datetime.now()
+        self.start_time = datetime.fromtimestamp(self.clock.time())
+    
+    def _setup_metrics(self):
+        """Hot path'te kullanılan counter'ları oluştur"""
+        metrics = self.metrics
+        self.connections_counter = metrics.counter(
+            'chat_connections_total', 'Accepted TCP connections')
+        self.messages_counter = metrics.counter(
+            'chat_messages_routed_total', 'Messages routed by broadcast or private delivery')
+        self.bytes_received = metrics.counter(
+            'chat_bytes_received_total', 'Bytes read from client sockets')
+        self.bytes_sent = metrics.counter(
+            'chat_bytes_sent_total', 'Bytes written to client sockets')
+        self.frames_received = metrics.counter(
+            'chat_frames_received_total', 'Frames received from clients', ('type',))
+        self.frames_sent = metrics.counter(
+            'chat_frames_sent_total', 'Frames sent to clients', ('type',))
+        self.socket_writes = metrics.counter(
+            'chat_socket_writes_total', 'send/sendmsg calls on client sockets')
+        self.socket_writes_saved = metrics.counter(
+            'chat_socket_writes_saved_total', 'Frames that shared a send call with another frame')
+        self.frames_superseded = metrics.counter(
+            'chat_frames_superseded_total', 'Queued frames replaced by a newer one before sending')
+        self.rate_limit_decisions = metrics.counter(
+            'chat_rate_limit_decisions_total', 'Rate limiter decisions', ('decision',))
+        self.frame_size = metrics.histogram(
+            'chat_frame_size_bytes', 'Size of frames sent to clients',
+            (64, 128, 256, 512, 1024, 2048, 4096))
+        
+        metrics.gauge('chat_connected_clients', 'Currently registered clients',
+                      function=lambda: len(self.clients))
+        metrics.gauge('chat_muted_clients', 'Currently muted clients',
+                      function=lambda: self.rate_limiter.get_statistics()['currently_muted'])
+        metrics.gauge('chat_search_index_queue_depth', 'Records waiting to be indexed',
+                      function=lambda: self.search_index.queue.qsize())
+        if self.fanout:
+            metrics.gauge('chat_fanout_queue_depth', 'Jobs waiting in fan-out worker queues',
+                          function=self.fanout.pending)
+        metrics.gauge('chat_latency_seconds', 'Message path latency quantiles per stage',
+                      ('stage', 'quantile'), function=self.latency.quantile_samples)
+    
+    def record_flush(self, frames, calls):
+        """OutputBuffer bir parti gönderdi"""
+        self.socket_writes.inc(calls)
+        if frames > calls:
+            self.socket_writes_saved.inc(frames - calls)
+    
+    def _record_fan_out(self, elapsed, count):
+        """Fan-out worker'ları bir işi bitirdi (aşama gecikmesi mesaj başına)"""
+        elapsed //= count
+        for _ in range(count):
+            self.latency['fan_out'].record(elapsed)
+    
+    @property
+    def message_count(self):
+        """Yönlendirilen toplam mesaj sayısı"""
+        return self.messages_counter.total()
+    
+    @property
+    def total_connections(self):
+        """Kabul edilen toplam bağlantı sayısı"""
+        return self.connections_counter.total()
     
     def start(self):
         """Server'ı başlat"""
@@ -60,15 +167,35 @@ class ChatServer:
             self.server_socket.listen(5)
             self.running = True
             
+            if self.fanout:
+                self.fanout.start()
+            
+            if self.capture_file:
+                self.capture = TrafficCapture(self.capture_file)
+            
             self._print_welcome_banner()
             
             # Web server'ı başlat
             self.web_server.start()
             
+            # Tarayıcı client'ları için WebSocket gateway
+            self.ws_gateway.start()
+            
+            # Sayaçları shared memory'ye yayınla (HTTP'siz izleme)
+            if STATS_SHM_ENABLED:
+                self.shared_stats.start()
+            
+            # Arama index'ini arka planda güncelle
+            self.search_index.start()
+            
             # İstatistik thread'ini başlat
             stats_thread = threading.Thread(target=self._stats_printer, daemon=True)
             stats_thread.start()
             
+            # Dashboard grafikleri için saniyelik örnekleme
+            sampler_thread = threading.Thread(target=self._timeseries_sampler, daemon=True)
+            sampler_thread.start()
+            
             # Client'ları kabul et
             self._accept_clients()
         
@@ -84,10 +211,35 @@ class ChatServer:
         # Web server'ı durdur
         self.web_server.stop()
         
-        # Tüm client'ları kapat
+        # Arama index'ini diske yaz
+        self.search_index.stop()
+        
+        # Shared memory segmentini kaldır
+        self.shared_stats.stop()
+        
+        # Kuyruktaki broadcast'leri dağıt
+        if self.fanout:
+            self.fanout.stop()
+        
+        # Tüm client'ları kapat: liste lock altında alınır, kapatma lock dışında yapılır.
+        # Kuyruk boşaltmaları tek bir ortak süreyi paylaşır; süre dolduktan sonra her
+        # client'a bir bloklamayan gönderim denemesi kalır, yavaş client'lar kapanışı uzatmaz
         with self.clients_lock:
-            for handler in list(self.clients.values()):
-                handler.stop()
+            handlers = list(self.clients.values())
+        deadline = time.monotonic() + SHUTDOWN_FLUSH_TIMEOUT
+        for handler in handlers:
+            handler.stop(timeout=max(deadline - time.monotonic(), 0))
+        
+        # Gecikmeli kuyruklarda kalanları gönder
+        self.write_flusher.stop()
+        
+        # WebSocket bağlantılarını kapat
+        self.ws_gateway.stop()
+        
+        # Capture dosyasını kapat (yarım buffer diske yazılır)
+        if self.capture:
+            self.capture.close()
+            print(f"🎞️  Captured {self.capture.records} records to {self.capture_file}")
         
         # Server socket'i kapat
         if self.server_socket:
@@ -105,13 +257,10 @@ class ChatServer:
         while self.running:
             try:
                 client_socket, address = self.server_socket.accept()
-                self.total_connections += 1
-                
+                # Birleştirme zaten yapılıyor; Nagle ek 40ms gecikme eklemesin
+                client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
                 print(f"📥 New connection from {address}")
-                
-                # ClientHandler oluştur ve başlat
-                handler = ClientHandler(client_socket, address, self)
-                handler.start()
+                self.attach_client(client_socket, address)
             
             except OSError:
                 if not self.running:
@@ -119,6 +268,16 @@ class ChatServer:
             except Exception as e:
                 print(f"❌ Error accepting client: {e}")
     
+    def attach_client(self, client_socket, address, handler_class=ClientHandler):
+        """
+        Kabul edilmiş bir bağlantı için handler oluştur ve başlat
+        client_socket socket benzeri herhangi bir transport olabilir (ör. MemorySocket)
+        """
+        self.connections_counter.inc()
+        handler = handler_class(client_socket, address, self)
+        handler.start()
+        return handler
+    
     def register_client(self, handler, requested_nickname):
         """
         Client'ı kaydet ve benzersiz nickname ata
@@ -141,6 +300,8 @@ class ChatServer:
             handler.nickname = nickname
             self.clients[nickname] = handler
             self.rate_limiter.add_client(nickname)
+            if self.fanout:
+                self.fanout.add(handler)
             
             print(f"✅ Client registered: {nickname} from {handler.address}")
             self.logger.log_user_join(nickname, handler.address[0])
@@ -157,31 +318,103 @@ class ChatServer:
             if nickname in self.clients:
                 del self.clients[nickname]
                 self.rate_limiter.remove_client(nickname)
+                if self.fanout:
+                    self.fanout.remove(handler)
                 
                 print(f"👋 Client disconnected: {nickname}")
                 self.logger.log_user_leave(nickname, handler.address[0])
     
     def broadcast_message(self, message, exclude_sender=False, exclude_client=None):
         """Tüm client'lara mesaj gönder"""
+        started = time.perf_counter_ns()
+        # Tüm alıcılar aynı byte'ları alır, JSON bir kez üretilir
+        payload = encode_message(message)
+        if self.fanout:
+            # Gecikme, worker'lar işi bitirince kaydedilir
+            with self.clients_lock:
+                self.fanout.broadcast(((payload, message.type),),
+                                      message.sender if exclude_sender else None,
+                                      exclude_client)
+            self.messages_counter.inc()
+            return
+        
         with self.clients_lock:
-            for nickname, handler in list(self.clients.items()):
-                # Exclude kontrolü
-                if exclude_sender and message.sender == nickname:
-                    continue
-                if exclude_client and handler == exclude_client:
-                    continue
-                
-                handler.send_message(message)
+            if exclude_sender or exclude_client:
+                recipients = [handler for nickname, handler in self.clients.items()
+                              if not (exclude_sender and message.sender == nickname)
+                              and handler is not exclude_client]
+            else:
+                recipients = list(self.clients.values())
+            self.deliver_frames(recipients, ((payload, message.type),))
         
-        self.message_count += 1
+        self.latency['fan_out'].record(time.perf_counter_ns() - started)
+        self.messages_counter.inc()
+    
+    def broadcast_messages(self, messages):
+        """
+        Aynı client'tan art arda gelen public mesajları tek geçişte dağıt
+        clients_lock bir kez alınır; her alıcının frame'leri sırayla kuyruğuna eklenir
+        """
+        started = time.perf_counter_ns()
+        frames = [(encode_message(message), message.type) for message in messages]
+        if self.fanout:
+            with self.clients_lock:
+                self.fanout.broadcast(frames)
+            self.messages_counter.inc(len(messages))
+            return
+        
+        with self.clients_lock:
+            self.deliver_frames(list(self.clients.values()), frames)
+        
+        # Aşama gecikmesi mesaj başına
+        elapsed = (time.perf_counter_ns() - started) // len(messages)
+        for _ in messages:
+            self.latency['fan_out'].record(elapsed)
+        self.messages_counter.inc(len(messages))
+    
+    def deliver_frames(self, handlers, frames):
+        """
+        Frame'leri alıcıların gönderim kuyruklarına ekle
+        Sayaç ve histogramlar alıcı başına değil frame başına bir kez güncellenir;
+        yazma gecikmesi alıcı başına ortalama olarak kaydedilir
+        Args:
+            handlers: alıcı handler'lar
+            frames: [(payload, msg_type)] - her alıcıya bu sırayla gider
+        """
+        for payload, msg_type in frames:
+            lane, key = output_lane(msg_type)
+            count = size = 0
+            started = time.perf_counter_ns()
+            for handler in handlers:
+                try:
+                    queued = handler.queue_encoded(payload, lane, key)
+                except Exception as e:
+                    print(f"❌ Error sending message: {e}")
+                    continue
+                if queued:
+                    count += 1
+                    size += queued
+            
+            if count:
+                self.latency['write'].record((time.perf_counter_ns() - started) // count, count)
+                self.bytes_sent.inc(size)
+                self.frame_size.observe(size // count, count)
+                self.frames_sent.labels(str(msg_type)).inc(count)
     
     def send_private_message(self, message):
         """Özel mesaj gönder"""
+        started = time.perf_counter_ns()
         with self.clients_lock:
             if message.recipient in self.clients:
                 handler = self.clients[message.recipient]
+                if self.fanout:
+                    # Alıcının shard'ından: ona giden broadcast'lerle sırası korunur
+                    self.fanout.send(handler, ((encode_message(message), message.type),))
+                    self.messages_counter.inc()
+                    return True
                 handler.send_message(message)
-                self.message_count += 1
+                self.latency['fan_out'].record(time.perf_counter_ns() - started)
+                self.messages_counter.inc()
                 return True
             return False
     
@@ -219,23 +452,95 @@ class ChatServer:
         with self.clients_lock:
             users = list(self.clients.keys())
         
+        # Dashboard'lara presence değişikliğini push et
+        self.web_server.publish_users()
+        
         user_list_msg = Message(MESSAGE_TYPE_USER_LIST,
                                content=','.join(users))
         self.broadcast_message(user_list_msg)
     
+    def thread_labels(self):
+        """Profiler için ClientHandler thread'lerini nickname ile etiketle"""
+        with self.clients_lock:
+            return {handler.thread.ident: f"client:{nickname}"
+                    for nickname, handler in self.clients.items() if handler.thread}
+    
     def _stats_printer(self):
         """Periyodik istatistik yazdır"""
         while self.running:
             time.sleep(30)  # Her 30 saniyede bir
             self._print_statistics()
     
+    def collect_shared_stats(self):
+        """
+        Shared memory segmentine yazılacak değerler
+        Her tick'te sayaçlar okunur; okuma sadece son tick'ten beri yazan thread'lerin
+        shard'larını katlar (ShardedValues), bağlı client sayısıyla büyümez. Client'ları
+        veya histogram bucket'larını dolaşan değerler STATS_SHM_SLOW_INTERVAL'da bir hesaplanır
+        """
+        now = time.monotonic()
+        if self._slow_shared_at is None or now - self._slow_shared_at >= STATS_SHM_SLOW_INTERVAL:
+            self._slow_shared_stats = {
+                'muted_clients': self.rate_limiter.get_statistics()['currently_muted'],
+                'threads': threading.active_count(),
+                'latency_p99_ns': self.latency['end_to_end'].summary()[0.99],
+            }
+            self._slow_shared_at = now
+        
+        decisions = self.rate_limit_decisions.values.totals()
+        events = self.web_server.events
+        values = {
+            'updated_ms': int(self.clock.time() * 1000),
+            'start_ms': int(self.start_time.timestamp() * 1000),
+            'connected_clients': len(self.clients),
+            'total_connections': self.total_connections,
+            'messages_routed': self.message_count,
+            'bytes_received': self.bytes_received.total(),
+            'bytes_sent': self.bytes_sent.total(),
+            'frames_received': self.frames_received.total(),
+            'frames_sent': self.frames_sent.total(),
+            'rate_ok': decisions.get(('ok',), 0),
+            'rate_warning': decisions.get(('warning',), 0),
+            'rate_mute': decisions.get(('mute',), 0),
+            'rate_kick': decisions.get(('kick',), 0),
+            'search_queue': self.search_index.queue.qsize(),
+            'sse_subscribers': len(events.subscribers),
+            'sse_queue': events.pending(),
+            'socket_writes': self.socket_writes.total(),
+            'socket_writes_saved': self.socket_writes_saved.total(),
+            'frames_superseded': self.frames_superseded.total()
+        }
+        values.update(self._slow_shared_stats)
+        return values
+    
+    def _timeseries_sampler(self):
+        """Her saniye sayaçları time-series deposuna örnekle"""
+        while self.running:
+            time.sleep(1)
+            self.sample_timeseries()
+    
+    def sample_timeseries(self):
+        """Sayaçların anlık değerini time-series deposuna yaz"""
+        with self.clients_lock:
+            client_count = len(self.clients)
+        
+        rate_stats = self.rate_limiter.get_statistics()
+        self.timeseries.sample(self.clock.time(), {
+            'messages': self.message_count,
+            'clients': client_count,
+            'warnings': rate_stats['total_warnings'],
+            'mutes': rate_stats['total_mutes'],
+            'kicks': rate_stats['total_kicks'],
+            'syscalls_saved': self.socket_writes_saved.total()
+        })
+    
     def _print_statistics(self):
         """İstatistikleri yazdır"""
         with self.clients_lock:
             client_count = len(self.clients)
         
         rate_stats = self.rate_limiter.get_statistics()
-        uptime = datetime.now() - self.start_time
+        uptime = datetime.fromtimestamp(self.clock.time()) - self.start_time
         
         print("\n" + "="*60)
         print("📊 SERVER STATISTICS")
@@ -256,7 +561,10 @@ class ChatServer:
         print("="*60)
         print(f"✅ Server listening on {self.host}:{self.port}")
         print(f"🌐 HTTP Server listening on http://{self.host}:{self.http_port}")
+        print(f"🔌 WebSocket gateway on ws://{self.host}:{self.ws_port}")
         print(f"📝 Log file: {self.logger.log_file}")
+        if self.capture:
+            print(f"🎞️  Capturing inbound frames to {self.capture_file}")
         print(f"⏰ Started at: {datetime.now().strftime('%H:%M:%S')}")
         print("="*60)
         print(f"📊 Open web dashboard: http://localhost:{self.http_port}")
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Chatstat Module
+Çalışan server'ın shared memory segmentini okuyan top benzeri izleme aracı
+
+Kullanım:
+    python -m server.chatstat                  # port 5000, saniyede bir yenile
+    python -m server.chatstat --port 6000 --interval 0.2
+    python -m server.chatstat --once --json
+"""
+
+import argparse
+import json
+import sys
+import time
+from common.config import SERVER_PORT
+from server.shm_stats import SharedStatsReader, segment_name
+
+
+# (alan, etiket) - toplam ve saniye başına artış gösterilir
+RATE_ROWS = (
+    ('messages_routed', 'Messages'),
+    ('frames_received', 'Frames in'),
+    ('frames_sent', 'Frames out'),
+    ('socket_writes', 'Socket writes'),
+    ('socket_writes_saved', 'Writes saved'),
+    ('frames_superseded', 'Superseded'),
+    ('bytes_received', 'Bytes in'),
+    ('bytes_sent', 'Bytes out'),
+    ('total_connections', 'Connections'),
+    ('rate_warning', 'RL warnings'),
+    ('rate_mute', 'RL mutes'),
+    ('rate_kick', 'RL kicks'),
+)
+
+GAUGE_ROWS = (
+    ('connected_clients', 'Clients'),
+    ('muted_clients', 'Muted'),
+    ('threads', 'Threads'),
+    ('search_queue', 'Search queue'),
+    ('sse_subscribers', 'Dashboards'),
+    ('sse_queue', 'SSE queue'),
+)
+
+
+def format_uptime(seconds):
+    """Saniyeyi HH:MM:SS'e çevir"""
+    seconds = int(max(seconds, 0))
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def render(current, previous, elapsed):
+    """
+    Ekran içeriğini satır listesi olarak üret
+    Eski bir server'ın yayınlamadığı alanlar '-' olarak gösterilir
+    """
+    now_ms = int(time.time() * 1000)
+    updated_ms = current.get('updated_ms', 0)
+    stale = now_ms - updated_ms > 5000
+    p99 = current.get('latency_p99_ns')
+    
+    lines = [
+        f"chatstat - uptime {format_uptime((updated_ms - current.get('start_ms', updated_ms)) / 1000)}"
+        f"  clients {current.get('connected_clients', '-')}"
+        + (f"  p99 {p99 / 1e6:.3f} ms" if p99 is not None else "")
+        + ("  [STALE - server not updating]" if stale else ""),
+        "",
+        f"{'COUNTER':<14}{'TOTAL':>16}{'/SEC':>14}",
+    ]
+    
+    for field, label in RATE_ROWS:
+        if field not in current:
+            lines.append(f"{label:<14}{'-':>16}{'':>14}")
+            continue
+        rate = ''
+        if previous is not None and elapsed > 0 and field in previous:
+            rate = f"{(current[field] - previous[field]) / elapsed:,.1f}"
+        lines.append(f"{label:<14}{current[field]:>16,}{rate:>14}")
+    
+    lines.append("")
+    lines.append(f"{'GAUGE':<14}{'VALUE':>16}")
+    for field, label in GAUGE_ROWS:
+        value = current.get(field)
+        lines.append(f"{label:<14}{'-' if value is None else f'{value:,}':>16}")
+    return lines
+
+
+def main(argv=None):
+    """Ana fonksiyon"""
+    parser = argparse.ArgumentParser(description='Chat Server - Live Stats')
+    parser.add_argument('--port', type=int, default=SERVER_PORT,
+                       help=f'Chat server port (default: {SERVER_PORT})')
+    parser.add_argument('--interval', type=float, default=1.0,
+                       help='Refresh interval in seconds (default: 1.0)')
+    parser.add_argument('--once', action='store_true',
+                       help='Print a single sample and exit')
+    parser.add_argument('--json', action='store_true',
+                       help='Print raw values as JSON lines')
+    
+    args = parser.parse_args(argv)
+    
+    name = segment_name(args.port)
+    try:
+        reader = SharedStatsReader(name)
+    except FileNotFoundError:
+        print(f"❌ No stats segment '{name}' - is the server running on port {args.port}?",
+              file=sys.stderr)
+        return 1
+    
+    previous = None
+    previous_time = None
+    try:
+        while True:
+            current = reader.read()
+            now = time.monotonic()
+            
+            if args.json:
+                print(json.dumps(current), flush=True)
+            else:
+                elapsed = now - previous_time if previous_time else 0
+                screen = '\n'.join(render(current, previous, elapsed))
+                if not args.once:
+                    # İmleci başa al ve ekranı temizle
+                    screen = '\x1b[H\x1b[2J' + screen
+                print(screen, flush=True)
+            
+            if args.once:
+                break
+            previous, previous_time = current, now
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
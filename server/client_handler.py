@@ -5,26 +5,68 @@ Client Handler Module
 Her client bağlantısını thread içinde yönetir
 """
 
+import itertools
 import socket
 import threading
-from common.protocol import Message, send_message, receive_message
+import time
+from common.protocol import Message, FrameReader, encode_message
+from server.output_buffer import OutputBuffer, LANE_CONTROL, LANE_BULK
 from common.config import (
     MESSAGE_TYPE_PUBLIC, MESSAGE_TYPE_PRIVATE, MESSAGE_TYPE_SYSTEM,
     MESSAGE_TYPE_JOIN, MESSAGE_TYPE_LEAVE, MESSAGE_TYPE_USER_LIST,
-    MESSAGE_TYPE_WARNING, MESSAGE_TYPE_MUTE, MESSAGE_TYPE_KICK
+    MESSAGE_TYPE_WARNING, MESSAGE_TYPE_MUTE, MESSAGE_TYPE_KICK, MESSAGE_TYPE_UNMUTE
 )
 
 
+# Giden frame öncelikleri: moderasyon ve sistem cevapları kuyruktaki sohbetin
+# önüne geçer; kullanıcı listesinin kuyrukta sadece en yenisi tutulur (sırası
+# önündeki JOIN/LEAVE ile bozulmasın diye öne alınmaz)
+OUTPUT_LANES = {
+    MESSAGE_TYPE_KICK: LANE_CONTROL,
+    MESSAGE_TYPE_MUTE: LANE_CONTROL,
+    MESSAGE_TYPE_UNMUTE: LANE_CONTROL,
+    MESSAGE_TYPE_WARNING: LANE_CONTROL,
+    MESSAGE_TYPE_SYSTEM: LANE_CONTROL,
+}
+SUPERSEDED_TYPES = frozenset((MESSAGE_TYPE_USER_LIST,))
+
+
+def output_lane(msg_type):
+    """
+    Mesaj tipinin öncelik sınıfı ve yerine geçme anahtarı
+    Returns:
+        tuple: (lane, key) - key None değilse kuyruktaki aynı anahtarlı frame'in yerine geçer
+    """
+    return (OUTPUT_LANES.get(msg_type, LANE_BULK),
+            msg_type if msg_type in SUPERSEDED_TYPES else None)
+
+
 class ClientHandler:
     """Bir client bağlantısını yöneten sınıf"""
     
+    # Capture kayıtlarında bağlantıları ayırt etmek için
+    _ids = itertools.count(1)
+    
     def __init__(self, client_socket, address, server):
+        self.conn_id = next(ClientHandler._ids)
         self.socket = client_socket
         self.address = address
         self.server = server  # ChatServer referansı
         self.nickname = None
         self.running = False
         self.thread = None
+        self.last_decode_ns = 0
+        self._setup_transport()
+    
+    def _setup_transport(self):
+        """TCP taşıma katmanı (alt sınıflar kendi okuma/yazma yapısını kurar)"""
+        # Giden frame'ler birleştirilip tek sendmsg ile gönderilir
+        self.output = OutputBuffer(self.socket, flusher=self.server.write_flusher,
+                                   on_flush=self.server.record_flush,
+                                   on_overflow=self._on_output_overflow)
+        # Bir recv'deki tüm frame'ler birlikte okunur (art arda gönderimde grup olarak işlenir)
+        self.reader = FrameReader(self.socket, on_bytes=self.server.bytes_received.inc,
+                                  on_decode=self._record_decode)
     
     def start(self):
         """Client handler'ı başlat"""
@@ -32,51 +74,52 @@ class ClientHandler:
         self.thread = threading.Thread(target=self._handle_client, daemon=True)
         self.thread.start()
     
-    def stop(self):
-        """Client handler'ı durdur"""
+    def stop(self, timeout=1.0):
+        """Client handler'ı durdur (kuyruktakiler en fazla timeout saniye beklenir)"""
         self.running = False
+        self._close(timeout)
+    
+    def _close(self, timeout=1.0):
+        """Bağlantıyı kapat"""
+        # Kuyrukta kalan frame'ler (ör. kick mesajı) kapanmadan gitsin
+        try:
+            self.server.record_flush(*self.output.flush(timeout=timeout))
+        except OSError:
+            pass
         try:
             self.socket.close()
         except:
             pass
     
+    def _on_output_overflow(self):
+        """Gönderilemeyen veri WRITE_MAX_BUFFERED'ı aştı: yavaş client'ı düşür"""
+        print(f"🐢 Dropping slow client {self.nickname}: output buffer full")
+        self.running = False
+        try:
+            # Okuma thread'inin recv'i döner ve normal temizlik yapılır
+            self.socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+    
     def _handle_client(self):
         """Client ile iletişimi yönet"""
         try:
-            # İlk mesajı al (nickname)
-            initial_msg = receive_message(self.socket)
-            if not initial_msg or not initial_msg.content:
-                print(f"❌ No nickname received from {self.address}")
-                self.socket.close()
-                return
-            
-            # Nickname'i kaydet ve benzersiz yap
-            self.nickname = self.server.register_client(self, initial_msg.content)
-            if not self.nickname:
-                error_msg = Message(MESSAGE_TYPE_SYSTEM, 
-                                  content="Nickname rejected by server")
-                send_message(self.socket, error_msg)
-                self.socket.close()
+            # İlk mesajı al (nickname); aynı recv'de gelen diğerleri katılımdan sonra işlenir
+            messages = self._receive_messages()
+            if not self._join(messages[0] if messages else None):
                 return
-            
-            # Client'a kabul mesajı gönder
-            accept_msg = Message(MESSAGE_TYPE_SYSTEM, 
-                               content=f"Connected as {self.nickname}")
-            send_message(self.socket, accept_msg)
-            
-            # JOIN event gönder
-            self.server.broadcast_join(self.nickname)
-            
-            # Aktif kullanıcı listesini gönder
-            self.server.send_user_list(self)
+            messages = messages[1:]
             
             # Mesajları dinle
             while self.running:
-                message = receive_message(self.socket)
-                if not message:
-                    break
+                if messages:
+                    self._process_messages(messages)
+                    if not self.running:
+                        break
                 
-                self._process_message(message)
+                messages = self._receive_messages()
+                if not messages:
+                    break
         
         except Exception as e:
             print(f"❌ Error handling client {self.nickname}: {e}")
@@ -84,11 +127,131 @@ class ClientHandler:
         finally:
             self._cleanup()
     
+    def _join(self, initial_msg):
+        """
+        İlk mesajdaki nickname ile client'ı kaydet ve odaya kat
+        Returns:
+            bool: Kabul edildiyse True (değilse bağlantı kapatılır)
+        """
+        if not initial_msg or not initial_msg.content:
+            print(f"❌ No nickname received from {self.address}")
+            self._close()
+            return False
+        
+        # Nickname'i kaydet ve benzersiz yap
+        self.nickname = self.server.register_client(self, initial_msg.content)
+        if not self.nickname:
+            error_msg = Message(MESSAGE_TYPE_SYSTEM, 
+                              content="Nickname rejected by server")
+            self.send_message(error_msg)
+            self._close()
+            return False
+        
+        # Client'a kabul mesajı gönder
+        accept_msg = Message(MESSAGE_TYPE_SYSTEM, 
+                           content=f"Connected as {self.nickname}")
+        self.send_message(accept_msg)
+        
+        # JOIN event gönder
+        self.server.broadcast_join(self.nickname)
+        
+        # Aktif kullanıcı listesini gönder
+        self.server.send_user_list(self)
+        return True
+    
+    def _process_messages(self, messages):
+        """Bir okumada gelen frame'leri işle: tek frame normal yoldan, fazlası grup olarak"""
+        if len(messages) == 1:
+            self._process_message(messages[0])
+        else:
+            self._process_batch(messages)
+    
+    def _process_batch(self, messages):
+        """
+        Art arda gelen frame'leri grup olarak işle
+        Tek rate limit değerlendirmesi, public mesajlar için tek dağıtım geçişi ve
+        tek log yazımı; kararlar ve teslim sırası tek tek işlemeyle aynıdır
+        """
+        latency = self.server.latency
+        started = time.perf_counter_ns() - self.last_decode_ns
+        try:
+            checked = time.perf_counter_ns()
+            decisions = self.server.rate_limiter.check_rate_limit_batch(self.nickname,
+                                                                        len(messages))
+            latency['rate_limit'].record(time.perf_counter_ns() - checked)
+            
+            accepted = []
+            for message, (limit_status, limit_data) in zip(messages, decisions):
+                self.server.rate_limit_decisions.labels(limit_status.lower()).inc()
+                if limit_status != 'OK':
+                    # Uyarı/mute/kick bildirimi önceki mesajlardan sonra gitsin
+                    self._route_batch(accepted)
+                    accepted = []
+                
+                if limit_status == 'KICK':
+                    self._handle_kick()
+                    return
+                elif limit_status == 'MUTE':
+                    self._handle_mute(limit_data)
+                    continue
+                elif limit_status == 'WARNING':
+                    self._handle_warning(limit_data)
+                
+                if message.type == MESSAGE_TYPE_SYSTEM and message.content == "EXIT":
+                    self.running = False
+                    break
+                accepted.append(message)
+            
+            self._route_batch(accepted)
+        
+        except Exception as e:
+            print(f"❌ Error processing messages from {self.nickname}: {e}")
+        finally:
+            elapsed = time.perf_counter_ns() - started
+            for _ in messages:
+                latency['end_to_end'].record(elapsed)
+    
+    def _route_batch(self, messages):
+        """Kabul edilen mesajları sırayla yönlendir, hepsini tek seferde logla"""
+        if not messages:
+            return
+        
+        logger = self.server.logger
+        entries = []
+        run = []        # art arda public mesajlar tek broadcast geçişinde gider
+        for message in messages:
+            message.sender = self.nickname
+            if message.type == MESSAGE_TYPE_PUBLIC:
+                run.append(message)
+                entries.append(logger.public_entry(self.nickname, message.content,
+                                                   self.address[0]))
+                continue
+            
+            if run:
+                self.server.broadcast_messages(run)
+                run = []
+            if message.type == MESSAGE_TYPE_PRIVATE and self._deliver_private(message):
+                entries.append(logger.private_entry(self.nickname, message.recipient,
+                                                    message.content, self.address[0]))
+        if run:
+            self.server.broadcast_messages(run)
+        
+        if entries:
+            logged = time.perf_counter_ns()
+            logger.log_entries(entries)
+            self.server.latency['logger'].record(time.perf_counter_ns() - logged)
+    
     def _process_message(self, message):
         """Gelen mesajı işle"""
+        latency = self.server.latency
+        # Uçtan uca süre decode'un başladığı andan sayılır
+        started = time.perf_counter_ns() - self.last_decode_ns
         try:
             # Rate limit kontrolü
+            checked = time.perf_counter_ns()
             limit_status, limit_data = self.server.rate_limiter.check_rate_limit(self.nickname)
+            latency['rate_limit'].record(time.perf_counter_ns() - checked)
+            self.server.rate_limit_decisions.labels(limit_status.lower()).inc()
             
             if limit_status == 'KICK':
                 self._handle_kick()
@@ -112,43 +275,56 @@ class ClientHandler:
         
         except Exception as e:
             print(f"❌ Error processing message from {self.nickname}: {e}")
+        finally:
+            latency['end_to_end'].record(time.perf_counter_ns() - started)
     
     def _handle_public_message(self, message):
         """Public mesajı işle"""
         message.sender = self.nickname
         self.server.broadcast_message(message, exclude_sender=False)
-        self.server.logger.log_public_message(self.nickname, message.content)
+        
+        logged = time.perf_counter_ns()
+        self.server.logger.log_public_message(self.nickname, message.content,
+                                              ip=self.address[0])
+        self.server.latency['logger'].record(time.perf_counter_ns() - logged)
     
     def _handle_private_message(self, message):
         """Private mesajı işle"""
         message.sender = self.nickname
+        if self._deliver_private(message):
+            logged = time.perf_counter_ns()
+            self.server.logger.log_private_message(
+                self.nickname, message.recipient, message.content, ip=self.address[0])
+            self.server.latency['logger'].record(time.perf_counter_ns() - logged)
+    
+    def _deliver_private(self, message):
+        """Private mesajı alıcıya ilet, gönderene sonucu bildir"""
         success = self.server.send_private_message(message)
         
         if success:
             # Gönderene confirmation gönder
             confirm_msg = Message(MESSAGE_TYPE_SYSTEM,
                                 content=f"Private message sent to {message.recipient}")
-            send_message(self.socket, confirm_msg)
-            self.server.logger.log_private_message(
-                self.nickname, message.recipient, message.content)
+            self.send_message(confirm_msg)
         else:
             # Kullanıcı bulunamadı
             error_msg = Message(MESSAGE_TYPE_SYSTEM,
                               content=f"User '{message.recipient}' not found")
-            send_message(self.socket, error_msg)
+            self.send_message(error_msg)
+        return success
     
     def _handle_warning(self, warning_count):
         """Rate limit uyarısını işle"""
         warning_msg = Message(MESSAGE_TYPE_WARNING,
                             content=f"WARNING: Slow down! This is warning #{warning_count}")
-        send_message(self.socket, warning_msg)
+        self.send_message(warning_msg)
         self.server.logger.log_rate_limit_warning(self.nickname, warning_count)
     
     def _handle_mute(self, duration):
         """Mute durumunu işle"""
         mute_msg = Message(MESSAGE_TYPE_MUTE,
                          content=f"You have been muted for {duration} seconds")
-        send_message(self.socket, mute_msg)
+        self.send_message(mute_msg)
         self.server.logger.log_rate_limit_mute(self.nickname, duration)
         
         # Tüm client'lara bildir
@@ -160,7 +336,7 @@ class ClientHandler:
         """Kick durumunu işle"""
         kick_msg = Message(MESSAGE_TYPE_KICK,
                          content="You have been kicked for sending messages while muted")
-        send_message(self.socket, kick_msg)
+        self.send_message(kick_msg)
         self.server.logger.log_rate_limit_kick(self.nickname)
         
         # Tüm client'lara bildir
@@ -173,15 +349,64 @@ class ClientHandler:
     
     def _cleanup(self):
         """Temizlik işlemleri"""
+        if self.server.capture:
+            self.server.capture.record_close(self)
+        
         if self.nickname:
             self.server.unregister_client(self)
             self.server.broadcast_leave(self.nickname)
         
-        try:
-            self.socket.close()
-        except:
-            pass
+        self._close()
+    
+    def _receive_messages(self):
+        """Bir okumadaki frame'leri al, frame sayaçlarını güncelle (kapandıysa None)"""
+        messages = self.reader.read_frames()
+        if messages:
+            for message in messages:
+                self.server.frames_received.labels(str(message.type)).inc()
+                if self.server.capture:
+                    self.server.capture.record_frame(self, message)
+        return messages
+    
+    def _record_decode(self, ns):
+        """Decode süresini kaydet, uçtan uca ölçüm için sakla"""
+        self.last_decode_ns = ns
+        self.server.latency['decode'].record(ns)
+    
+    def _count_sent(self, size):
+        """Gönderilen frame'in byte sayısını kaydet"""
+        self.server.bytes_sent.inc(size)
+        self.server.frame_size.observe(size)
     
     def send_message(self, message):
         """Bu client'a mesaj gönder"""
-        return send_message(self.socket, message)
\ No newline at end of file
+        return self.send_encoded(encode_message(message), message.type)
+    
+    def send_encoded(self, payload, msg_type):
+        """Önceden encode edilmiş frame'i gönder (broadcast'te encode bir kez yapılır)"""
+        started = time.perf_counter_ns()
+        lane, key = output_lane(msg_type)
+        try:
+            size = self.queue_encoded(payload, lane, key)
+        except Exception as e:
+            print(f"❌ Error sending message: {e}")
+            size = 0
+        self.server.latency['write'].record(time.perf_counter_ns() - started)
+        
+        if size:
+            self._count_sent(size)
+            self.server.frames_sent.labels(str(msg_type)).inc()
+        return bool(size)
+    
+    def queue_encoded(self, payload, lane, key):
+        """
+        Frame'i metrik kaydetmeden gönderim kuyruğuna ekle
+        (ChatServer.deliver_frames metrikleri alıcılar için toplu kaydeder)
+        Returns:
+            int: kuyruğa eklenen byte
+        Raises:
+            OSError: bağlantı koptuysa
+        """
+        if self.output.write(payload, lane, key):
+            self.server.frames_superseded.inc()
+        return len(payload)
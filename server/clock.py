@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Clock Module
+Server bileşenlerine enjekte edilen saat: gerçek zaman veya simülasyon için sanal zaman
+"""
+
+import time
+
+
+class SystemClock:
+    """Gerçek saat (varsayılan)"""
+    
+    def time(self):
+        """Unix zamanı (saniye)"""
+        return time.time()
+    
+    def monotonic(self):
+        """Süre ölçümü için geri gitmeyen saat (saniye)"""
+        return time.monotonic()
+    
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class VirtualClock:
+    """
+    Sadece açıkça ilerletildiğinde ilerleyen saat
+    Simülatör olayları sırayla işlerken saati olay zamanına taşır; saatler
+    süren trafik gerçekte beklemeden, aynı seed ile aynı sonuçla oynatılır
+    """
+    
+    def __init__(self, start=1700000000.0):
+        self.now = float(start)
+        self.started = self.now
+    
+    def time(self):
+        return self.now
+    
+    def monotonic(self):
+        return self.now - self.started
+    
+    def sleep(self, seconds):
+        """Tek thread'li simülasyonda uyumak saati ilerletmek demektir"""
+        self.advance(seconds)
+    
+    def advance(self, seconds):
+        """Saati ileri al"""
+        if seconds > 0:
+            self.now += seconds
+    
+    def set(self, timestamp):
+        """Saati verilen zamana taşı (geri gitmez)"""
+        if timestamp > self.now:
+            self.now = timestamp
+
+
+SYSTEM_CLOCK = SystemClock()
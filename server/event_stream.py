@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Event Stream Module
+Dashboard'lar için Server-Sent Events yayın merkezi
+"""
+
+import json
+import queue
+import threading
+
+
+def encode_event(event, data, event_id=None):
+    """SSE formatında tek bir olayı byte'a çevir"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False)}")
+    return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+
+class EventHub:
+    """
+    Olayları bir kez encode edip bağlı tüm dashboard'lara dağıtan sınıf
+    Her abone için sınırlı bir kuyruk tutulur; yetişemeyen abone düşürülür
+    """
+    
+    def __init__(self, max_pending=256):
+        self.max_pending = max_pending
+        self.subscribers = set()
+        self.lock = threading.Lock()
+    
+    def subscribe(self):
+        """Yeni abone kuyruğu oluştur"""
+        subscriber = queue.Queue(maxsize=self.max_pending)
+        with self.lock:
+            self.subscribers.add(subscriber)
+        return subscriber
+    
+    def unsubscribe(self, subscriber):
+        """Aboneyi kaldır"""
+        with self.lock:
+            self.subscribers.discard(subscriber)
+    
+    def has_subscribers(self):
+        """En az bir bağlı dashboard var mı"""
+        return bool(self.subscribers)
+    
+    def pending(self):
+        """Abone kuyruklarında bekleyen toplam olay sayısı"""
+        with self.lock:
+            subscribers = list(self.subscribers)
+        return sum(subscriber.qsize() for subscriber in subscribers)
+    
+    def publish(self, event, data, event_id=None):
+        """Olayı bir kez encode et ve tüm abonelere gönder"""
+        if not self.subscribers:
+            return
+        
+        payload = encode_event(event, data, event_id)
+        with self.lock:
+            subscribers = list(self.subscribers)
+        
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(payload)
+            except queue.Full:
+                # Yavaş dashboard diğerlerini bekletmesin; None bağlantıyı kapatır
+                self.unsubscribe(subscriber)
+                try:
+                    subscriber.get_nowait()
+                    subscriber.put_nowait(None)
+                except (queue.Empty, queue.Full):
+                    pass
+    
+    def close_all(self):
+        """Tüm abonelerin bağlantılarını kapat"""
+        with self.lock:
+            subscribers = list(self.subscribers)
+            self.subscribers.clear()
+        
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(None)
+            except queue.Full:
+                pass
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fan-out Module
+Büyük odalarda broadcast dağıtımını paralel sender worker'larına böler
+
+Alıcılar conn_id'ye göre shard'lara ayrılır. Her worker kendi shard'ının
+kayıt dilimini (nickname -> handler) tutar ve bu dilimi sadece kendi
+kuyruğundan gelen kayıt/çıkış işleriyle değiştirir; dağıtım sırasında
+registry lock'u gerekmez. Broadcast frame'i bir kez encode edilip her shard
+kuyruğuna eklenir. Kuyruklar FIFO olduğu için bir göndericinin mesajları her
+alıcıya gönderim sırasıyla ulaşır; kayıt da aynı kuyruktan geçtiği için yeni
+client kaydından sonraki her broadcast'i alır.
+"""
+
+import queue
+import threading
+import time
+
+
+# Kuyruk işleri
+_ADD = 0
+_REMOVE = 1
+_DELIVER = 2
+_MARK = 3
+
+
+class FanOutJob:
+    """Bir veya daha fazla frame'in dağıtımı (tüm shard'larda veya tek alıcıya)"""
+    
+    __slots__ = ('frames', 'target', 'exclude_nickname', 'exclude_client',
+                 'started', 'remaining')
+    
+    def __init__(self, frames, remaining, target=None, exclude_nickname=None,
+                 exclude_client=None):
+        self.frames = frames                    # [(payload, msg_type), ...]
+        self.target = target                    # tek alıcı (private) veya None
+        self.exclude_nickname = exclude_nickname
+        self.exclude_client = exclude_client
+        self.started = time.perf_counter_ns()
+        self.remaining = remaining              # işi bitirmesi beklenen shard sayısı
+
+
+class FanOutPool:
+    """
+    Shard başına bir sender thread'i olan dağıtım havuzu
+    Broadcast yapan thread sadece shard sayısı kadar kuyruk ekler, alıcıların
+    kuyruklarına eklemeyi worker'lar paralel yapar
+    """
+    
+    def __init__(self, workers, deliver, on_complete=None):
+        self.workers = workers
+        self.deliver = deliver              # deliver(alıcılar, frame'ler) - ChatServer.deliver_frames
+        self.on_complete = on_complete      # iş tüm shard'larda bitince: on_complete(süre_ns, frame_sayısı)
+        self.queues = [queue.SimpleQueue() for _ in range(workers)]
+        self.members = [{} for _ in range(workers)]  # her dilimi sadece kendi worker'ı değiştirir
+        self.threads = []
+        self.done_lock = threading.Lock()
+    
+    def start(self):
+        """Worker thread'lerini başlat"""
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, args=(index,), daemon=True,
+                                      name=f'fanout-{index}')
+            thread.start()
+            self.threads.append(thread)
+    
+    def stop(self):
+        """Kuyruktaki işleri bitirip worker'ları durdur"""
+        for jobs in self.queues:
+            jobs.put(None)
+        for thread in self.threads:
+            if thread is not threading.current_thread():
+                thread.join(2)
+        self.threads = []
+    
+    def _queue_for(self, handler):
+        return self.queues[handler.conn_id % self.workers]
+    
+    def add(self, handler):
+        """Kayıtlı client'ı shard'ının dilimine ekle (handler.nickname atanmış olmalı)"""
+        self._queue_for(handler).put((_ADD, handler))
+    
+    def remove(self, handler):
+        """Client'ı shard'ının diliminden çıkar"""
+        self._queue_for(handler).put((_REMOVE, handler))
+    
+    def broadcast(self, frames, exclude_nickname=None, exclude_client=None):
+        """
+        Frame'leri tüm shard'lardaki alıcılara dağıt
+        Farklı göndericiler arasında da aynı sıra için çağıran registry lock'unu tutmalı
+        """
+        item = (_DELIVER, FanOutJob(frames, self.workers, exclude_nickname=exclude_nickname,
+                                    exclude_client=exclude_client))
+        for jobs in self.queues:
+            jobs.put(item)
+    
+    def send(self, handler, frames):
+        """Tek alıcıya gönder (o alıcıya giden broadcast'lerle aynı sırada)"""
+        self._queue_for(handler).put((_DELIVER, FanOutJob(frames, 1, target=handler)))
+    
+    def wait_idle(self, timeout=None):
+        """
+        Şu ana kadar kuyruğa eklenmiş işler bitene kadar bekle
+        Returns:
+            bool: timeout dolmadan bittiyse True
+        """
+        marks = [threading.Event() for _ in self.queues]
+        for jobs, mark in zip(self.queues, marks):
+            jobs.put((_MARK, mark))
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for mark in marks:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            if not mark.wait(remaining):
+                return False
+        return True
+    
+    def pending(self):
+        """Kuyruklarda bekleyen iş sayısı"""
+        return sum(jobs.qsize() for jobs in self.queues)
+    
+    def _run(self, index):
+        jobs = self.queues[index]
+        members = self.members[index]
+        while True:
+            item = jobs.get()
+            if item is None:
+                return
+            
+            op, arg = item
+            try:
+                if op == _DELIVER:
+                    self._deliver(arg, members)
+                elif op == _ADD:
+                    members[arg.nickname] = arg
+                elif op == _REMOVE:
+                    # Aynı nickname başka bir bağlantıya geçmiş olabilir
+                    if members.get(arg.nickname) is arg:
+                        del members[arg.nickname]
+                else:
+                    arg.set()
+            except Exception as e:
+                print(f"❌ Fan-out worker error: {e}")
+    
+    def _deliver(self, job, members):
+        """İşin bu shard'a düşen kısmını gönder"""
+        frames = job.frames
+        if job.target is not None:
+            recipients = (job.target,)
+        else:
+            exclude_nickname = job.exclude_nickname
+            exclude_client = job.exclude_client
+            recipients = [handler for nickname, handler in members.items()
+                          if nickname != exclude_nickname and handler is not exclude_client]
+        self.deliver(recipients, frames)
+        
+        with self.done_lock:
+            job.remaining -= 1
+            finished = not job.remaining
+        if finished and self.on_complete:
+            self.on_complete(time.perf_counter_ns() - job.started, len(frames))
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Latency Module
+Mesaj yolundaki aşamalar için log-bucket'lı (HDR tarzı) gecikme histogramları
+"""
+
+from server.metrics import ShardedValues
+
+
+# Bir frame'in server içindeki yolculuğu
+LATENCY_STAGES = ('decode', 'rate_limit', 'fan_out', 'logger', 'write', 'end_to_end')
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class LatencyHistogram:
+    """
+    Nanosaniye gecikmeleri için log-linear histogram
+    İlk 2^bits değer tam, sonrası her ikilik aralıkta 2^(bits-1) alt bucket'a
+    bölünür; göreli hata en fazla 1/2^(bits-1) (bits=6 için ~%3)
+    Kayıt lock almaz: bucket sayaçları thread başına shard'lanır
+    """
+    
+    def __init__(self, bits=6):
+        self.bits = bits
+        self.linear = 1 << bits
+        self.half = 1 << (bits - 1)
+        self.values = ShardedValues()
+        # Yarışta nadiren bir maksimum kaybolabilir; kilit almamaya değer
+        self.max = 0
+    
+    def bucket_index(self, ns):
+        """Değerin düştüğü bucket"""
+        if ns < self.linear:
+            return ns
+        shift = ns.bit_length() - self.bits
+        return shift * self.half + (ns >> shift)
+    
+    def bucket_upper(self, index):
+        """Bucket'taki en büyük değer"""
+        if index < self.linear:
+            return index
+        shift = index // self.half - 1
+        top = index - shift * self.half
+        return ((top + 1) << shift) - 1
+    
+    def record(self, ns, count=1):
+        """Gecikme ölçümü ekle (nanosaniye); count: aynı değerden kaç ölçüm"""
+        if ns < 0:
+            ns = 0
+        self.values.add(self.bucket_index(ns), count)
+        self.values.add('sum', ns * count)
+        if ns > self.max:
+            self.max = ns
+    
+    def summary(self, quantiles=QUANTILES):
+        """
+        Sayı, ortalama, yüzdelikler ve maksimum (nanosaniye)
+        Yüzdelikler bucket'ın üst sınırıyla raporlanır, maksimumu geçmez
+        """
+        totals = self.values.totals()
+        total_ns = totals.pop('sum', 0)
+        buckets = sorted(totals.items())
+        count = sum(c for _, c in buckets)
+        
+        result = {'count': count, 'mean': total_ns / count if count else 0, 'max': self.max}
+        for q in quantiles:
+            result[q] = 0
+        if not count:
+            return result
+        
+        targets = [(q, max(1, int(q * count + 0.5))) for q in quantiles]
+        seen = 0
+        position = 0
+        for index, bucket_count in buckets:
+            seen += bucket_count
+            while position < len(targets) and seen >= targets[position][1]:
+                q = targets[position][0]
+                result[q] = min(self.bucket_upper(index), self.max)
+                position += 1
+        return result
+
+
+class LatencyTracker:
+    """Aşama adı -> LatencyHistogram"""
+    
+    def __init__(self, stages=LATENCY_STAGES):
+        self.stages = tuple(stages)
+        self.histograms = {stage: LatencyHistogram() for stage in self.stages}
+    
+    def __getitem__(self, stage):
+        return self.histograms[stage]
+    
+    def summary(self):
+        """/api/latency için milisaniye cinsinden özet"""
+        stages = []
+        for stage in self.stages:
+            summary = self.histograms[stage].summary()
+            stages.append({
+                'stage': stage,
+                'count': summary['count'],
+                'mean': round(summary['mean'] / 1e6, 3),
+                'p50': round(summary[0.5] / 1e6, 3),
+                'p95': round(summary[0.95] / 1e6, 3),
+                'p99': round(summary[0.99] / 1e6, 3),
+                'max': round(summary['max'] / 1e6, 3)
+            })
+        return {'unit': 'ms', 'stages': stages}
+    
+    def quantile_samples(self):
+        """/metrics gauge'u için {(aşama, quantile): saniye}"""
+        samples = {}
+        for stage in self.stages:
+            summary = self.histograms[stage].summary()
+            if not summary['count']:
+                continue
+            for q in QUANTILES:
+                samples[(stage, str(q))] = summary[q] / 1e9
+            samples[(stage, '1')] = summary['max'] / 1e9
+        return samples
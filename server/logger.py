@@ -5,18 +5,225 @@ Logger Module
 Tüm server loglarını yöneten modül
 """
 
+import bisect
+import glob
+import gzip
+import json
 import os
+import re
+import shutil
+import threading
+from collections import deque
 from datetime import datetime
-from common.config import LOG_FILE, LOG_TIMESTAMP_FORMAT
+from common.config import (
+    LOG_FILE, LOG_TIMESTAMP_FORMAT, LOG_FORMAT, LOG_INDEX_INTERVAL,
+    LOG_MAX_BYTES, LOG_ROTATE_INTERVAL, LOG_BACKUP_COUNT, LOG_MAX_AGE_DAYS,
+    LOG_BUFFER_SIZE
+)
+from server.clock import SYSTEM_CLOCK
+
+
+# Döndürülmüş segment son eki: rotation anı (+ aynı saniyede çakışma sayacı)
+_SEGMENT_NAME = re.compile(r'(\d{8}-\d{6})(?:_\d{3})?')
+
+# Aynı saniyedeki satırlar için strptime'ı tekrar çağırmamak adına son değer
+_last_timestamp = (None, None)
+
+
+def _timestamp_to_ms(timestamp):
+    """'YYYY-mm-dd HH:MM:SS' formatındaki zamanı epoch milisaniyeye çevir"""
+    global _last_timestamp
+    cached_str, cached_ms = _last_timestamp
+    if timestamp == cached_str:
+        return cached_ms
+    
+    try:
+        ms = int(datetime.strptime(timestamp, LOG_TIMESTAMP_FORMAT).timestamp() * 1000)
+    except ValueError:
+        return None
+    _last_timestamp = (timestamp, ms)
+    return ms
+
+
+def _split_participants(log_type, message):
+    """Text formatındaki mesajdan gönderen ve alıcıyı çıkar"""
+    if log_type == 'PUBLIC' and ': ' in message:
+        return message.split(': ', 1)[0], None
+    if log_type == 'PRIVATE' and ' -> ' in message and ': ' in message:
+        sender, rest = message.split(' -> ', 1)
+        return sender, rest.split(': ', 1)[0]
+    return None, None
+
+
+def parse_log_line(line):
+    """
+    Log satırını parse et
+    Format: [2025-11-19 14:30:45] TYPE | message
+            veya JSON modunda {"ts": ..., "type": ..., ...}
+    Returns:
+        dict: {ts, timestamp, type, message, sender, recipient, ip} veya None
+    """
+    line = line.strip()
+    
+    if line.startswith('{'):
+        try:
+            data = json.loads(line)
+            ts = data['ts']
+            return {
+                'ts': ts,
+                'timestamp': datetime.fromtimestamp(ts / 1000).strftime(LOG_TIMESTAMP_FORMAT),
+                'type': data['type'],
+                'message': data.get('message', ''),
+                'sender': data.get('sender'),
+                'recipient': data.get('recipient'),
+                'ip': data.get('ip')
+            }
+        except (ValueError, KeyError, TypeError):
+            return None
+    
+    if not line.startswith('['):
+        return None
+    
+    timestamp_end = line.find(']')
+    if timestamp_end == -1:
+        return None
+    
+    rest = line[timestamp_end+1:]
+    if '|' not in rest:
+        return None
+    
+    log_type, message = rest.split('|', 1)
+    log_type = log_type.strip()
+    message = message.strip()
+    timestamp = line[1:timestamp_end]
+    sender, recipient = _split_participants(log_type, message)
+    
+    return {
+        'ts': _timestamp_to_ms(timestamp),
+        'timestamp': timestamp,
+        'type': log_type,
+        'message': message,
+        'sender': sender,
+        'recipient': recipient,
+        'ip': None
+    }
+
+
+def tail_lines(path, count, block_size=4096):
+    """
+    Dosyanın son N satırını sondan geriye doğru okuyarak döndür
+    Dosyanın tamamı okunmaz, sadece gereken son birkaç KB okunur
+    """
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            data = b''
+            
+            # count+1 satır sonu görene kadar (veya dosya başına kadar) geri git
+            while position > 0 and data.count(b'\n') <= count:
+                read_size = min(block_size, position)
+                position -= read_size
+                f.seek(position)
+                data = f.read(read_size) + data
+    except FileNotFoundError:
+        return []
+    
+    lines = data.decode('utf-8', errors='replace').splitlines(keepends=True)
+    return lines[-count:] if count else []
+
+
+def rotated_log_files(log_file):
+    """Log dosyasının sıkıştırılmış arşivlerini eskiden yeniye sıralı döndür"""
+    return sorted(glob.glob(glob.escape(log_file) + '.*.gz'))
+
+
+def _matches(record, log_type=None, user=None):
+    """Kayıt tip ve kullanıcı filtresine uyuyor mu"""
+    if log_type and record['type'] != log_type:
+        return False
+    if user and user not in (record.get('sender'), record.get('recipient')):
+        return False
+    return True
 
 
 class ChatLogger:
     """Chat server için loglama sınıfı"""
     
-    def __init__(self, log_file=LOG_FILE):
+    def __init__(self, log_file=LOG_FILE, max_bytes=LOG_MAX_BYTES,
+                 rotate_interval=LOG_ROTATE_INTERVAL, backup_count=LOG_BACKUP_COUNT,
+                 max_age_days=LOG_MAX_AGE_DAYS, buffer_size=LOG_BUFFER_SIZE,
+                 log_format=LOG_FORMAT, index_interval=LOG_INDEX_INTERVAL, clock=None):
         self.log_file = log_file
+        
+        # Kayıt zamanları ve zaman bazlı döndürme bu saate göre (simülasyonda sanal)
+        self.clock = clock or SYSTEM_CLOCK
+        
+        # 'text' -> [ts] TYPE | message, 'json' -> satır başına bir JSON kaydı
+        self.log_format = log_format
+        
+        # Rotation ayarları
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.backup_count = backup_count
+        self.max_age_days = max_age_days
+        
+        # Birden fazla client thread'i aynı anda yazabilir
+        self.lock = threading.Lock()
+        
+        # Dashboard için son kayıtların bellekteki halkası
+        self.recent_records = deque(maxlen=buffer_size)
+        self.next_record_id = 1
+        
+        # Her yeni kayıtta çağrılacak fonksiyonlar (arama index'i vb.)
+        self.listeners = []
+        # Segment döndürme/silme/temizleme olaylarını izleyenler (arama index'i)
+        self.segment_listeners = []
+        
+        # JSON modunda zaman -> byte offset seyrek index'i (sidecar dosya)
+        self.index_file = f"{log_file}.idx"
+        self.index_interval = index_interval
+        self.index_times = []
+        self.index_offsets = []
+        self.records_since_index = index_interval
+        
         self._ensure_log_directory()
-        self._init_log_file()
+        self._load_recent_records()
+        self._load_index()
+        
+        self.current_size = os.path.getsize(self.log_file) if os.path.exists(self.log_file) else 0
+        self.segment_started = self._segment_start()
+        
+        with self.lock:
+            self._write_banner("Server Started")
+    
+    def add_listener(self, callback):
+        """
+        Yeni kayıtlar için listener ekle
+        callback(record) her yazılan kayıtta lock dışında çağrılır, hızlı olmalı
+        """
+        self.listeners.append(callback)
+    
+    def add_segment_listener(self, callback):
+        """
+        Segment olayları için listener ekle
+        callback(event, name): 'rotate' (aktif segment name son ekiyle arşivlendi),
+        'remove' (name arşivi retention ile silindi) veya 'clear' (aktif segment
+        temizlendi, name None). Logger lock'u altında çağrılabilir, hızlı olmalı
+        """
+        self.segment_listeners.append(callback)
+    
+    def _notify_segment(self, event, name=None):
+        for callback in self.segment_listeners:
+            try:
+                callback(event, name)
+            except Exception as e:
+                print(f"❌ Segment listener error: {e}")
+    
+    def segment_name(self, path):
+        """Arşiv dosyasının segment adı (log dosyası adından sonraki son ek)"""
+        name = path[len(self.log_file) + 1:]
+        return name[:-3] if name.endswith('.gz') else name
     
     def _ensure_log_directory(self):
         """Log dizininin var olduğundan emin ol"""
@@ -24,20 +231,79 @@ class ChatLogger:
         if log_dir and not os.path.exists(log_dir):
             os.makedirs(log_dir)
     
-    def _init_log_file(self):
-        """Log dosyasını başlat"""
+    def _load_recent_records(self):
+        """Soğuk başlangıçta son kayıtları dosyanın sonundan yükle"""
+        for line in tail_lines(self.log_file, self.recent_records.maxlen):
+            record = parse_log_line(line)
+            if record:
+                self._append_record(record)
+    
+    def _load_index(self):
+        """Sidecar index dosyasını belleğe yükle"""
+        if self.log_format != 'json':
+            return
+        
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) == 2:
+                        self.index_times.append(int(parts[0]))
+                        self.index_offsets.append(int(parts[1]))
+        except FileNotFoundError:
+            pass
+        except ValueError as e:
+            print(f"❌ Corrupt log index {self.index_file}: {e}")
+            self._reset_index()
+    
+    def _reset_index(self):
+        """Index'i sıfırla (yeni segment başlarken)"""
+        self.index_times = []
+        self.index_offsets = []
+        self.records_since_index = self.index_interval
+        try:
+            os.remove(self.index_file)
+        except OSError:
+            pass
+    
+    def _append_record(self, record):
+        """Kaydı bellekteki halkaya ekle (lock altında çağrılır)"""
+        record = dict(record, id=self.next_record_id)
+        record['timestamp'] = record['timestamp'].split()[-1]  # Sadece saat kısmı
+        self.next_record_id += 1
+        self.recent_records.append(record)
+        return record
+    
+    def _write_banner(self, title):
+        """Oturum başlığını yaz (lock altında çağrılır)"""
+        now = datetime.fromtimestamp(self.clock.time()).strftime(LOG_TIMESTAMP_FORMAT)
+        if self.log_format == 'json':
+            # JSONL dosyası sadece kayıt satırlarından oluşmalı
+            self._append_line('SYSTEM', f"{title}: {now}", None, None, None)
+            return
+        
+        banner = f"\n{'='*60}\n{title}: {now}\n{'='*60}\n"
         with open(self.log_file, 'a', encoding='utf-8') as f:
-            f.write(f"\n{'='*60}\n")
-            f.write(f"Server Started: {datetime.now().strftime(LOG_TIMESTAMP_FORMAT)}\n")
-            f.write(f"{'='*60}\n")
+            f.write(banner)
+        self.current_size += len(banner.encode('utf-8'))
     
-    def log_public_message(self, sender, content):
+    @staticmethod
+    def public_entry(sender, content, ip=None):
+        """log_entries için public mesaj kaydı"""
+        return ('PUBLIC', f"{sender}: {content}", sender, None, ip)
+    
+    @staticmethod
+    def private_entry(sender, recipient, content, ip=None):
+        """log_entries için private mesaj kaydı"""
+        return ('PRIVATE', f"{sender} -> {recipient}: {content}", sender, recipient, ip)
+    
+    def log_public_message(self, sender, content, ip=None):
         """Public mesajı logla"""
-        self._write_log('PUBLIC', f"{sender}: {content}")
+        self.log_entries([self.public_entry(sender, content, ip)])
     
-    def log_private_message(self, sender, recipient, content):
+    def log_private_message(self, sender, recipient, content, ip=None):
         """Private mesajı logla"""
-        self._write_log('PRIVATE', f"{sender} -> {recipient}: {content}")
+        self.log_entries([self.private_entry(sender, recipient, content, ip)])
     
     def log_system_event(self, content):
         """Sistem olayını logla"""
@@ -45,46 +311,321 @@ class ChatLogger:
     
     def log_user_join(self, nickname, address):
         """Kullanıcı bağlantısını logla"""
-        self._write_log('SYSTEM', f"{nickname}@{address} connected")
+        self._write_log('SYSTEM', f"{nickname}@{address} connected", sender=nickname, ip=address)
     
     def log_user_leave(self, nickname, address):
         """Kullanıcı ayrılmasını logla"""
-        self._write_log('SYSTEM', f"{nickname}@{address} disconnected")
+        self._write_log('SYSTEM', f"{nickname}@{address} disconnected", sender=nickname, ip=address)
     
     def log_rate_limit_warning(self, nickname, warning_count):
         """Rate limit uyarısını logla"""
-        self._write_log('SYSTEM', f"{nickname} received rate limit warning #{warning_count}")
+        self._write_log('SYSTEM', f"{nickname} received rate limit warning #{warning_count}",
+                        sender=nickname)
     
     def log_rate_limit_mute(self, nickname, duration):
         """Mute olayını logla"""
-        self._write_log('SYSTEM', f"{nickname} muted for {duration}s (sent 16 msgs)")
+        self._write_log('SYSTEM', f"{nickname} muted for {duration}s (sent 16 msgs)",
+                        sender=nickname)
     
     def log_rate_limit_kick(self, nickname):
         """Kick olayını logla"""
-        self._write_log('SYSTEM', f"{nickname} kicked for spamming")
+        self._write_log('SYSTEM', f"{nickname} kicked for spamming", sender=nickname)
     
     def log_error(self, error_msg):
         """Hata logla"""
         self._write_log('ERROR', error_msg)
     
-    def _write_log(self, log_type, content):
+    def _write_log(self, log_type, content, sender=None, recipient=None, ip=None):
         """Log dosyasına yaz"""
-        timestamp = datetime.now().strftime(LOG_TIMESTAMP_FORMAT)
+        self.log_entries([(log_type, content, sender, recipient, ip)])
+    
+    def log_entries(self, entries):
+        """
+        Bir grup kaydı tek lock ve tek dosya yazımıyla logla
+        Args:
+            entries: [(tip, mesaj, gönderen, alıcı, ip)] - public_entry/private_entry
+        """
+        with self.lock:
+            if self._should_rotate():
+                self._rotate()
+            
+            records = [self._append_record(record) for record in self._append_lines(entries)]
+        
+        for record in records:
+            for callback in self.listeners:
+                try:
+                    callback(record)
+                except Exception as e:
+                    print(f"❌ Log listener error: {e}")
+    
+    def _append_line(self, log_type, content, sender, recipient, ip):
+        """Tek bir kaydı aktif segmente ekle (lock altında çağrılır)"""
+        return self._append_lines([(log_type, content, sender, recipient, ip)])[0]
+    
+    def _append_lines(self, entries):
+        """Kayıtları aktif segmente tek yazımla ekle (lock altında çağrılır)"""
+        # Zaman lock altında alınır, böylece dosyadaki sıra monoton kalır
+        ts = int(self.clock.time() * 1000)
+        timestamp = datetime.fromtimestamp(ts / 1000).strftime(LOG_TIMESTAMP_FORMAT)
+        
+        lines = []
+        records = []
+        for log_type, content, sender, recipient, ip in entries:
+            if self.log_format == 'json':
+                line = json.dumps({
+                    'ts': ts,
+                    'type': log_type,
+                    'sender': sender,
+                    'recipient': recipient,
+                    'ip': ip,
+                    'message': content
+                }, ensure_ascii=False) + '\n'
+                # Index offset'i bu satırın başı: önceki satırlar current_size'a eklendi
+                self._update_index(ts)
+            else:
+                line = f"[{timestamp}] {log_type} | {content}\n"
+            
+            lines.append(line)
+            self.current_size += len(line.encode('utf-8'))
+            records.append({
+                'ts': ts,
+                'timestamp': timestamp,
+                'type': log_type,
+                'message': content,
+                'sender': sender,
+                'recipient': recipient,
+                'ip': ip
+            })
+        
         with open(self.log_file, 'a', encoding='utf-8') as f:
-            f.write(f"[{timestamp}] {log_type} | {content}\n")
+            f.write(''.join(lines))
+        
+        return records
+    
+    def _update_index(self, ts):
+        """Her index_interval kayıtta bir index noktası ekle (lock altında çağrılır)"""
+        if self.records_since_index < self.index_interval:
+            self.records_since_index += 1
+            return
+        
+        self.records_since_index = 1
+        self.index_times.append(ts)
+        self.index_offsets.append(self.current_size)
+        with open(self.index_file, 'a', encoding='utf-8') as f:
+            f.write(f"{ts} {self.current_size}\n")
+    
+    def _segment_start(self):
+        """
+        Mevcut aktif segmentin başladığı an
+        Restart'ta süre sıfırlanmasın diye dosyadaki ilk kaydın zamanı, kayıt
+        yoksa dosyanın mtime'ı kullanılır
+        """
+        now = self.clock.time()
+        if not self.current_size:
+            return now
+        try:
+            with open(self.log_file, 'r', encoding='utf-8', errors='replace') as f:
+                for _, line in zip(range(100), f):
+                    record = parse_log_line(line)
+                    if record and record['ts'] is not None:
+                        return min(record['ts'] / 1000, now)
+            return min(os.path.getmtime(self.log_file), now)
+        except OSError:
+            return now
+    
+    def _should_rotate(self):
+        """Aktif segment döndürülmeli mi? (lock altında çağrılır)"""
+        if self.max_bytes and self.current_size >= self.max_bytes:
+            return True
+        if self.rotate_interval and self.clock.time() - self.segment_started >= self.rotate_interval:
+            return True
+        return False
+    
+    def _rotate(self):
+        """
+        Aktif log dosyasını arşive taşı ve yenisini aç (lock altında çağrılır)
+        Sıkıştırma ve eski arşivlerin silinmesi arka planda yapılır
+        """
+        suffix = datetime.fromtimestamp(self.clock.time()).strftime('%Y%m%d-%H%M%S')
+        rotated = f"{self.log_file}.{suffix}"
+        counter = 1
+        while os.path.exists(rotated) or os.path.exists(rotated + '.gz'):
+            rotated = f"{self.log_file}.{suffix}_{counter:03d}"
+            counter += 1
+        
+        try:
+            os.rename(self.log_file, rotated)
+        except OSError as e:
+            print(f"❌ Log rotation failed: {e}")
+            self.segment_started = self.clock.time()
+            return
+        
+        # Index sadece aktif segmenti kapsar
+        self._reset_index()
+        self.current_size = 0
+        self.segment_started = self.clock.time()
+        self._notify_segment('rotate', self.segment_name(rotated))
+        self._write_banner("Log Rotated")
+        
+        threading.Thread(target=self._compress_segment, args=(rotated,), daemon=True).start()
+    
+    def _compress_segment(self, path):
+        """Döndürülmüş segmenti gzip'le ve retention uygula"""
+        try:
+            with open(path, 'rb') as src, gzip.open(path + '.gz', 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            # Arşivin yaşı retention'la aynı saate göre (simülasyonda sanal zaman)
+            archived = self.clock.time()
+            os.utime(path + '.gz', (archived, archived))
+            os.remove(path)
+        except Exception as e:
+            print(f"❌ Error compressing log segment {path}: {e}")
+        
+        self._apply_retention()
+    
+    def _apply_retention(self):
+        """Sayı ve yaş limitini aşan arşivleri sil"""
+        archives = self.get_rotated_files()
+        
+        if self.max_age_days:
+            cutoff = self.clock.time() - self.max_age_days * 86400
+            for path in list(archives):
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        archives.remove(path)
+                        self._notify_segment('remove', self.segment_name(path))
+                except OSError:
+                    pass
+        
+        if self.backup_count and len(archives) > self.backup_count:
+            for path in archives[:len(archives) - self.backup_count]:
+                try:
+                    os.remove(path)
+                    self._notify_segment('remove', self.segment_name(path))
+                except OSError:
+                    pass
+    
+    def get_rotated_files(self):
+        """Sıkıştırılmış arşiv dosyalarını eskiden yeniye sıralı döndür"""
+        return rotated_log_files(self.log_file)
     
     def get_recent_logs(self, count=50):
         """Son N satır logu oku"""
+        return tail_lines(self.log_file, count)
+    
+    def get_recent_records(self, since=None, count=50):
+        """
+        Bellekteki son parse edilmiş kayıtları döndür
+        Cursor verilirse ondan sonraki en eski count kayıt döner; client son id'yi
+        cursor yapıp kalanları sonraki isteklerde alır. Cursor yoksa en yeni count kayıt
+        Args:
+            since: Sadece bu id'den sonraki kayıtlar (cursor)
+            count: En fazla döndürülecek kayıt sayısı (None = hepsi)
+        """
+        with self.lock:
+            records = list(self.recent_records)
+        
+        # Id'ler ardışık olduğu için cursor doğrudan index'e çevrilir.
+        # Cursor sunucudaki son id'den büyükse server yeniden başlamıştır
+        if since is not None and records and since <= records[-1]['id']:
+            records = records[max(since - records[0]['id'] + 1, 0):]
+            return records[:count] if count else records
+        
+        return records[-count:] if count else records
+    
+    def query_logs(self, start_ms=None, end_ms=None, log_type=None, user=None, limit=200):
+        """
+        Zaman aralığı, tip ve kullanıcıya göre kayıt sorgula
+        Aralığa giren döndürülmüş segmentler (gz dahil) eskiden yeniye okunur, sonra
+        aktif segment. JSON modunda aktif segmentte sparse index ile doğrudan aralığın
+        başına seek edilir, text modunda segment baştan taranır
+        """
+        with self.lock:
+            archives = self._archived_segments()
+            offset = 0
+            if self.log_format == 'json' and start_ms is not None:
+                # start_ms'den küçük son index noktasından okumaya başla
+                position = bisect.bisect_left(self.index_times, start_ms) - 1
+                offset = self.index_offsets[position] if position >= 0 else 0
+            end_offset = self.current_size
+        
+        results = []
+        for segment_end_ms, path in archives:
+            # Segment rotation anında kapanır, daha eski kayıtlar içerir
+            if start_ms is not None and segment_end_ms < start_ms:
+                continue
+            if self._scan_segment(path, results, start_ms, end_ms, log_type, user, limit):
+                return results
+        
+        self._scan_segment(self.log_file, results, start_ms, end_ms, log_type, user, limit,
+                           offset, end_offset)
+        return results
+    
+    def _archived_segments(self):
+        """
+        Döndürülmüş segmentler eskiden yeniye: [(segment sonu epoch ms, path)]
+        Sıkıştırması süren segment yarım .gz yerine düz dosyasından okunur
+        """
+        segments = {}
+        for path in glob.glob(glob.escape(self.log_file) + '.*'):
+            name = self.segment_name(path)
+            match = _SEGMENT_NAME.fullmatch(name)
+            if not match or (path.endswith('.gz') and name in segments):
+                continue
+            rotated = datetime.strptime(match.group(1), '%Y%m%d-%H%M%S').timestamp()
+            # Son ek saniye hassasiyetinde, o saniyenin sonuna kadar kayıt olabilir
+            segments[name] = (int(rotated * 1000) + 999, path)
+        return [segments[name] for name in sorted(segments)]
+    
+    def _scan_segment(self, path, results, start_ms, end_ms, log_type, user, limit,
+                      offset=0, end_offset=None):
+        """
+        Segmentteki aralığa uyan kayıtları results'a ekle
+        Returns:
+            bool: limit doldu veya end_ms geçildi (sonraki segmentlere bakmaya gerek yok)
+        """
         try:
-            with open(self.log_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                return lines[-count:] if len(lines) > count else lines
+            f = gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')
         except FileNotFoundError:
-            return []
+            # Okumadan hemen önce sıkıştırılıp silinmiş olabilir
+            if path.endswith('.gz') or not os.path.exists(path + '.gz'):
+                return False
+            f = gzip.open(path + '.gz', 'rb')
+        
+        try:
+            with f:
+                if offset:
+                    f.seek(offset)
+                while len(results) < limit:
+                    if end_offset is not None and f.tell() >= end_offset:
+                        return False
+                    line = f.readline()
+                    if not line:
+                        return False
+                    
+                    record = parse_log_line(line.decode('utf-8', errors='replace'))
+                    if not record or record['ts'] is None:
+                        continue
+                    if start_ms is not None and record['ts'] < start_ms:
+                        continue
+                    if end_ms is not None and record['ts'] > end_ms:
+                        return True
+                    if _matches(record, log_type, user):
+                        record['timestamp'] = record['timestamp'].split()[-1]
+                        results.append(record)
+        except (OSError, EOFError) as e:
+            print(f"❌ Error reading log segment {path}: {e}")
+            return False
+        return True
     
     def clear_logs(self):
-        """Log dosyasını temizle"""
-        with open(self.log_file, 'w', encoding='utf-8') as f:
-            f.write(f"{'='*60}\n")
-            f.write(f"Logs Cleared: {datetime.now().strftime(LOG_TIMESTAMP_FORMAT)}\n")
-            f.write(f"{'='*60}\n")
\ No newline at end of file
+        """Aktif log dosyasını temizle (arama index'inin bu segmenti de silinir)"""
+        with self.lock:
+            open(self.log_file, 'w', encoding='utf-8').close()
+            self._reset_index()
+            self.current_size = 0
+            self.segment_started = self.clock.time()
+            self.recent_records.clear()
+            self._notify_segment('clear')
+            self._write_banner("Logs Cleared")
\ No newline at end of file
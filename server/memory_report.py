@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Memory Report Module
+/debug/memory için tracemalloc snapshot diff'leri ve alt sistem bazında bellek hesabı
+"""
+
+import gc
+import sys
+import threading
+import tracemalloc
+from collections import deque
+from server.client_handler import ClientHandler
+
+
+CONTAINERS = (dict, list, tuple, set, frozenset, deque)
+
+
+def deep_sizeof(*roots):
+    """
+    Kök nesnelerin ve içerdikleri container'ların toplam boyutu (byte)
+    Sadece standart container'ların içine inilir; diğer nesnelerin (socket,
+    server referansı vb.) sadece kendi boyutu sayılır, paylaşılan nesneler bir kez
+    """
+    seen = set()
+    total = 0
+    stack = list(roots)
+    
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        
+        # Başka thread'ler değiştirirken iterasyon hatası almamak için önce kopyala
+        if isinstance(obj, dict):
+            items = obj.copy()
+            stack.extend(items.keys())
+            stack.extend(items.values())
+        elif isinstance(obj, CONTAINERS):
+            stack.extend(tuple(obj))
+    
+    return total
+
+
+def read_rss():
+    """Process'in resident bellek kullanımı (byte) - /proc yoksa None"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+class MemoryReporter:
+    """
+    Bellek büyümesini soak testlerinde yakalamak için rapor üretir
+    tracemalloc açıldığında bir baseline snapshot alınır, sonraki raporlar
+    baseline'a göre en çok büyüyen allocation noktalarını gösterir
+    """
+    
+    def __init__(self, chat_server=None, web_server=None):
+        self.chat_server = chat_server
+        self.web_server = web_server
+        self.baseline = None
+        self.lock = threading.Lock()
+    
+    def start_tracing(self, frames=1):
+        """tracemalloc'u başlat ve baseline al"""
+        with self.lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+            self.baseline = self._take_snapshot()
+    
+    def stop_tracing(self):
+        """tracemalloc'u durdur (izleme maliyeti biter)"""
+        with self.lock:
+            tracemalloc.stop()
+            self.baseline = None
+    
+    def reset_baseline(self):
+        """Diff'in karşılaştırılacağı snapshot'ı yenile"""
+        with self.lock:
+            if tracemalloc.is_tracing():
+                self.baseline = self._take_snapshot()
+    
+    def _take_snapshot(self):
+        """tracemalloc'un kendi allocation'larını dışarıda bırakan snapshot"""
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<unknown>'),
+        ))
+    
+    def report(self, top=20):
+        """Tam rapor"""
+        return {
+            'rss_bytes': read_rss(),
+            'gc_objects': len(gc.get_objects()),
+            'threads': threading.active_count(),
+            'tracemalloc': self._tracemalloc_report(top),
+            'subsystems': self.subsystems()
+        }
+    
+    def _tracemalloc_report(self, top):
+        """En çok büyüyen (veya en büyük) allocation noktaları"""
+        with self.lock:
+            if not tracemalloc.is_tracing():
+                return {'tracing': False}
+            
+            snapshot = self._take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            result = {'tracing': True, 'traced_bytes': current, 'peak_bytes': peak}
+            
+            if self.baseline is not None:
+                stats = snapshot.compare_to(self.baseline, 'lineno')[:top]
+                result['top'] = [{
+                    'site': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                    'size': stat.size,
+                    'size_diff': stat.size_diff,
+                    'count': stat.count,
+                    'count_diff': stat.count_diff
+                } for stat in stats]
+            else:
+                result['top'] = [{
+                    'site': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                    'size': stat.size,
+                    'count': stat.count
+                } for stat in snapshot.statistics('lineno')[:top]]
+            return result
+    
+    def subsystems(self):
+        """Alt sistem bazında tahmini bellek kullanımı ve sızıntı göstergeleri"""
+        server = self.chat_server
+        if not server:
+            return {}
+        
+        with server.clients_lock:
+            clients = dict(server.clients)
+        registered = set(map(id, clients.values()))
+        
+        # Kayıtta olmayıp hâlâ yaşayan handler'lar sızıntı adayıdır
+        handlers = [obj for obj in gc.get_objects() if isinstance(obj, ClientHandler)]
+        leftover = [h for h in handlers if id(h) not in registered]
+        
+        handler_state = [{k: v for k, v in vars(h).items() if k != 'server'} for h in handlers]
+        
+        limiter = server.rate_limiter
+        limiter_keys = set(limiter.message_times) | set(limiter.muted_until) | set(limiter.warning_counts)
+        
+        logger = server.logger
+        search = server.search_index
+        
+        result = {
+            'client_registry': {
+                'clients': len(clients),
+                'handlers_alive': len(handlers),
+                'handlers_leftover': len(leftover),
+                'leftover_nicknames': [h.nickname for h in leftover][:20],
+                'bytes': deep_sizeof(server.clients, handler_state)
+            },
+            'rate_limiter': {
+                'tracked_nicknames': len(limiter_keys),
+                'stale_entries': len(limiter_keys - set(clients)),
+                'queued_timestamps': sum(len(times) for times in limiter.message_times.copy().values()),
+                'bytes': deep_sizeof(limiter.message_times, limiter.muted_until,
+                                     limiter.warning_counts)
+            },
+            'log_buffers': {
+                'records': len(logger.recent_records),
+                'index_points': len(logger.index_offsets),
+                'bytes': deep_sizeof(logger.recent_records, logger.index_times,
+                                     logger.index_offsets)
+            },
+            'history': {
+                'search_documents': search.doc_count,
+                'search_tokens': sum(len(segment.postings) for segment in search.segments),
+                'search_queue': search.queue.qsize(),
+                'search_bytes': deep_sizeof([segment.postings for segment in search.segments]),
+                'timeseries_bytes': deep_sizeof([
+                    (ring.times, ring.values)
+                    for rings in (server.timeseries.fine, server.timeseries.coarse)
+                    for ring in rings.values()
+                ])
+            }
+        }
+        
+        if self.web_server:
+            events = self.web_server.events
+            result['dashboard'] = {
+                'sse_subscribers': len(events.subscribers),
+                'sse_pending_events': events.pending()
+            }
+        
+        return result
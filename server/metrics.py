@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Metrics Module
+Thread-safe counter/gauge/histogram registry ve Prometheus text çıktısı
+"""
+
+import collections
+import threading
+from bisect import bisect_left
+
+
+def _format_value(value):
+    """Prometheus sayı formatı"""
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    """Label değerindeki özel karakterleri kaçır"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=None):
+    """{isim="değer",...} bloğunu üret"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class _Shard:
+    """Bir thread'in sayaçları ve okuyucunun en son gördüğü hali"""
+    
+    __slots__ = ('values', 'seen', 'dirty')
+    
+    def __init__(self):
+        self.values = {}        # sadece sahibi thread yazar
+        self.seen = {}          # son toplamada okunan kopya (sadece okuyucu, lock altında)
+        self.dirty = False      # son toplamadan beri yazıldı mı
+
+
+class ShardedValues:
+    """
+    Thread başına ayrı dict'te tutulan sayaçlar
+    Her thread sadece kendi shard'ına yazar, bu yüzden artırma lock almaz.
+    Okuma tüm shard'ları dolaşmaz: son okumadan beri yazılan shard'lar kuyruğa
+    girer ve sadece onların farkı toplam üzerine katlanır. Böylece okuma maliyeti
+    bağlı client (thread) sayısıyla değil, o arada yazan thread sayısıyla büyür;
+    ölmüş thread'lerin değerleri zaten toplamdadır
+    """
+    
+    def __init__(self):
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.dirty = collections.deque()    # son okumadan beri yazılan shard'lar
+        self.aggregate = {}                 # katlanmış toplamlar (lock altında)
+    
+    def _shard(self):
+        """Çağıran thread'in shard'ı (ilk kullanımda oluşturulur)"""
+        try:
+            return self.local.shard
+        except AttributeError:
+            shard = self.local.shard = _Shard()
+            return shard
+    
+    def add(self, key, amount):
+        """Çağıran thread'in shard'ında key'i artır"""
+        shard = self._shard()
+        values = shard.values
+        values[key] = values.get(key, 0) + amount
+        # Önce değer, sonra bayrak: okuyucu bayrağı kopyadan önce indirdiği için
+        # bu artış ya bu okumada görülür ya da shard tekrar kuyruğa girer
+        if not shard.dirty:
+            shard.dirty = True
+            self.dirty.append(shard)
+    
+    def totals(self):
+        """Tüm shard'ların toplamı {key: değer}"""
+        with self.lock:
+            aggregate = self.aggregate
+            dirty = self.dirty
+            while dirty:
+                shard = dirty.popleft()
+                shard.dirty = False
+                # dict.copy() GIL altında tek adımda yapılır
+                snapshot = shard.values.copy()
+                seen = shard.seen
+                for key, value in snapshot.items():
+                    delta = value - seen.get(key, 0)
+                    if delta:
+                        aggregate[key] = aggregate.get(key, 0) + delta
+                shard.seen = snapshot
+            return dict(aggregate)
+
+
+class Metric:
+    """Tüm metrik tiplerinin ortak tabanı"""
+    
+    kind = 'untyped'
+    
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.children = {}
+        self.children_lock = threading.Lock()
+    
+    def labels(self, *values):
+        """Label değerlerine bağlı alt metrik (önbelleğe alınır)"""
+        child = self.children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self.children_lock:
+                child = self.children.setdefault(values, self._make_child(values))
+        return child
+    
+    def _make_child(self, values):
+        raise NotImplementedError
+    
+    def samples(self):
+        """[(isim_soneki, label_değerleri, değer, ek_label)] listesi"""
+        raise NotImplementedError
+    
+    def render(self):
+        """Metriği Prometheus text formatında satırlara çevir"""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, values, value, extra in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(self.labelnames, values, extra)} "
+                         f"{_format_value(value)}")
+        return lines
+
+
+class _CounterChild:
+    """Label'lara bağlı counter"""
+    
+    __slots__ = ('values', 'key')
+    
+    def __init__(self, values, key):
+        self.values = values
+        self.key = key
+    
+    def inc(self, amount=1):
+        self.values.add(self.key, amount)
+
+
+class Counter(Metric):
+    """Sadece artan sayaç - artırma lock'suz, thread başına shard'lı"""
+    
+    kind = 'counter'
+    
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self.values = ShardedValues()
+    
+    def _make_child(self, values):
+        return _CounterChild(self.values, values)
+    
+    def inc(self, amount=1):
+        """Label'sız counter'ı artır"""
+        self.values.add((), amount)
+    
+    def value(self, *labels):
+        """Tek bir label kombinasyonunun toplamı"""
+        return self.values.totals().get(labels, 0)
+    
+    def total(self):
+        """Tüm label kombinasyonlarının toplamı"""
+        return sum(self.values.totals().values())
+    
+    def samples(self):
+        return [('', labels, value, None)
+                for labels, value in sorted(self.values.totals().items())]
+
+
+class _GaugeChild:
+    """Label'lara bağlı gauge"""
+    
+    __slots__ = ('gauge', 'key')
+    
+    def __init__(self, gauge, key):
+        self.gauge = gauge
+        self.key = key
+    
+    def set(self, value):
+        with self.gauge.lock:
+            self.gauge.current[self.key] = value
+    
+    def inc(self, amount=1):
+        with self.gauge.lock:
+            self.gauge.current[self.key] = self.gauge.current.get(self.key, 0) + amount
+    
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+
+class Gauge(Metric):
+    """
+    Anlık değer
+    function verilirse değer her okumada ondan alınır (kuyruk derinlikleri gibi);
+    function sayı ya da {label_tuple: sayı} döndürebilir
+    """
+    
+    kind = 'gauge'
+    
+    def __init__(self, name, help_text, labelnames=(), function=None):
+        super().__init__(name, help_text, labelnames)
+        self.function = function
+        self.current = {}
+        self.lock = threading.Lock()
+    
+    def _make_child(self, values):
+        return _GaugeChild(self, values)
+    
+    def set(self, value):
+        self.labels().set(value)
+    
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+    
+    def dec(self, amount=1):
+        self.labels().inc(-amount)
+    
+    def samples(self):
+        if self.function is not None:
+            try:
+                result = self.function()
+            except Exception as e:
+                print(f"❌ Error reading gauge {self.name}: {e}")
+                return []
+            items = result.items() if isinstance(result, dict) else [((), result)]
+        else:
+            with self.lock:
+                items = list(self.current.items())
+        return [('', labels, value, None) for labels, value in sorted(items)]
+
+
+class _HistogramChild:
+    """Label'lara bağlı histogram"""
+    
+    __slots__ = ('histogram', 'key')
+    
+    def __init__(self, histogram, key):
+        self.histogram = histogram
+        self.key = key
+    
+    def observe(self, value, count=1):
+        self.histogram._observe(self.key, value, count)
+
+
+class Histogram(Metric):
+    """
+    Sabit bucket'lı histogram
+    Bucket sayaçları ve toplam, counter'lar gibi thread başına shard'lanır
+    """
+    
+    kind = 'histogram'
+    
+    def __init__(self, name, help_text, buckets, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.values = ShardedValues()
+    
+    def _make_child(self, values):
+        return _HistogramChild(self, values)
+    
+    def observe(self, value, count=1):
+        """Label'sız histogram'a gözlem ekle (count: aynı değerden kaç gözlem)"""
+        self._observe((), value, count)
+    
+    def _observe(self, labels, value, count=1):
+        # Son index (len(buckets)) +Inf bucket'ıdır
+        self.values.add((labels, bisect_left(self.buckets, value)), count)
+        self.values.add((labels, 'sum'), value * count)
+    
+    def samples(self):
+        totals = self.values.totals()
+        label_sets = sorted({labels for labels, _ in totals})
+        
+        result = []
+        bounds = self.buckets + (float('inf'),)
+        for labels in label_sets:
+            cumulative = 0
+            for index, bound in enumerate(bounds):
+                cumulative += totals.get((labels, index), 0)
+                result.append(('_bucket', labels, cumulative, ('le', _format_value(bound))))
+            result.append(('_sum', labels, totals.get((labels, 'sum'), 0), None))
+            result.append(('_count', labels, cumulative, None))
+        return result
+
+
+class MetricsRegistry:
+    """Metrikleri isimleriyle tutan ve /metrics çıktısını üreten sınıf"""
+    
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+    
+    def register(self, metric):
+        """Metriği kaydet (aynı isim iki kez kaydedilemez)"""
+        with self.lock:
+            if metric.name in self.metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self.metrics[metric.name] = metric
+        return metric
+    
+    def counter(self, name, help_text, labelnames=()):
+        return self.register(Counter(name, help_text, labelnames))
+    
+    def gauge(self, name, help_text, labelnames=(), function=None):
+        return self.register(Gauge(name, help_text, labelnames, function))
+    
+    def histogram(self, name, help_text, buckets, labelnames=()):
+        return self.register(Histogram(name, help_text, buckets, labelnames))
+    
+    def render(self):
+        """Tüm metrikleri Prometheus text exposition formatında döndür"""
+        with self.lock:
+            metrics = list(self.metrics.values())
+        
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Output Buffer Module
+Client'a giden frame'lerin birleştirilmesi (write coalescing)
+
+Her bağlantının frame'leri bir kuyrukta toplanır ve tek bir sendmsg
+(scatter-gather) ile gönderilir. Yazan thread (broadcast dahil) sadece
+kuyruğa ekler; kuyruk WRITE_COALESCE_DELAY içinde WriteFlusher thread'i
+tarafından boşaltılır. Gecikme 0 ise yazan thread hemen bir gönderim dener.
+
+Gönderimler bloklamaz (MSG_DONTWAIT): socket'i dolan bağlantının kalan
+byte'ları flusher'ın selector'ünde yazılabilir olunca gönderilir, bu sırada
+diğer bağlantılar beklemez. Gönderilemeyen veri WRITE_MAX_BUFFERED'ı aşarsa
+yavaş client düşürülür.
+
+Kuyruk öncelik sıralıdır (LaneQueue): kontrol mesajları (kick, mute, uyarı,
+sistem cevapları) bekleyen sohbetin önüne geçer, kullanıcı listesi gibi
+anahtarlı frame'lerin kuyrukta sadece en yenisi (en yeni yerinde) tutulur.
+"""
+
+import collections
+import select
+import selectors
+import socket
+import threading
+import time
+from common.config import (
+    WRITE_COALESCE_MAX_BYTES, WRITE_COALESCE_MAX_FRAMES, WRITE_MAX_BUFFERED
+)
+
+
+# Öncelik sınıfları (küçük olan önce gider)
+LANE_CONTROL = 0    # moderasyon ve sistem cevapları
+LANE_BULK = 1       # sohbet, JOIN/LEAVE ve kullanıcı listesi
+
+# Windows'ta yok: orada gönderim bloklayan sendall'a düşer
+MSG_DONTWAIT = getattr(socket, 'MSG_DONTWAIT', 0)
+
+
+def send_frames(sock, frames):
+    """
+    Frame listesini tek çağrıyla, bloklamadan gönder
+    sendmsg/MSG_DONTWAIT olmayan transport'larda (Windows, bellek içi)
+    tek buffer sendall ile gider
+    Returns:
+        int: gönderilen byte (socket doluysa 0)
+    """
+    if MSG_DONTWAIT and hasattr(sock, 'sendmsg'):
+        try:
+            if len(frames) == 1:
+                return sock.send(frames[0], MSG_DONTWAIT)
+            return sock.sendmsg(frames, (), MSG_DONTWAIT)
+        except (BlockingIOError, InterruptedError):
+            return 0
+    
+    data = frames[0] if len(frames) == 1 else b''.join(frames)
+    sock.sendall(data)
+    return len(data)
+
+
+class LaneQueue:
+    """
+    Öncelik sıralı frame kuyruğu
+    Kontrol frame'leri sohbetin önüne geçer, her sınıf kendi içinde FIFO'dur.
+    Anahtarlı bir frame kuyruktaki aynı anahtarlı frame'i siler ve sona eklenir;
+    önündeki JOIN/LEAVE gibi frame'lerle sırası bozulmaz
+    """
+    
+    def __init__(self):
+        self.control = []
+        self.bulk = []
+        self.bulk_base = 0      # bulk'tan şimdiye kadar çıkan kayıt sayısı (mutlak sıra için)
+        self.keyed = {}         # anahtar -> (bulk'taki mutlak sıra, frame)
+        self.holes = 0          # yerine yenisi geçmiş (None) kayıtlar
+        self.size = 0
+        self.count = 0
+    
+    def __len__(self):
+        return self.count
+    
+    def push(self, payload, lane=LANE_BULK, key=None):
+        """
+        Frame'i sınıfına ekle
+        Returns:
+            bool: aynı anahtarlı, henüz gönderilmemiş bir frame'in yerine geçtiyse True
+        """
+        self.size += len(payload)
+        self.count += 1
+        if lane == LANE_CONTROL:
+            self.control.append(payload)
+            return False
+        
+        superseded = False
+        if key is not None:
+            previous = self.keyed.get(key)
+            if previous is not None:
+                index = previous[0] - self.bulk_base
+                # Eski frame hâlâ kuyruktaysa boşluk bırakıp sil
+                if index >= 0 and self.bulk[index] is previous[1]:
+                    self.bulk[index] = None
+                    self.holes += 1
+                    self.size -= len(previous[1])
+                    self.count -= 1
+                    superseded = True
+            self.keyed[key] = (self.bulk_base + len(self.bulk), payload)
+        self.bulk.append(payload)
+        return superseded
+    
+    def take(self, max_frames, max_bytes):
+        """Öncelik sırasıyla en fazla max_frames frame / yaklaşık max_bytes byte çıkar"""
+        if not self.control and not self.holes and (
+                len(self.bulk) <= max_frames and self.size <= max_bytes):
+            # Genel durum: sadece sohbet var ve tamamı tek partiye sığıyor
+            batch, self.bulk = self.bulk, []
+            self.bulk_base += len(batch)
+            self.size = self.count = 0
+            return batch
+        
+        batch = []
+        size = 0
+        for lane in (self.control, self.bulk):
+            taken = 0
+            for payload in lane:
+                if len(batch) >= max_frames or size >= max_bytes:
+                    break
+                taken += 1
+                if payload is None:
+                    self.holes -= 1
+                    continue
+                batch.append(payload)
+                size += len(payload)
+            del lane[:taken]
+            if lane is self.bulk:
+                self.bulk_base += taken
+        
+        self.size -= size
+        self.count -= len(batch)
+        return batch
+    
+    def clear(self):
+        self.control.clear()
+        self.bulk.clear()
+        self.keyed.clear()
+        self.holes = self.size = self.count = 0
+
+
+class WriteFlusher:
+    """
+    Bekleyen kuyrukları her delay'de bir boşaltan tek thread
+    Kayıt lock'suz bir deque append'idir (broadcast her alıcı için çağırır);
+    thread ilk kullanımda başlar, iş yokken selector'de uyur. Socket'i dolan
+    bağlantılar yazılabilir olunca selector'den devam ettirilir
+    """
+    
+    def __init__(self, delay, on_flush=None):
+        self.delay = delay
+        self.on_flush = on_flush        # tick başına bir kez: on_flush(frame_sayısı, send_çağrısı)
+        self.pending = collections.deque()
+        self.blocked = set()            # selector'de EVENT_WRITE bekleyen buffer'lar (sadece thread)
+        self.selector = None            # thread başlarken kurulur
+        self.wakeup_reader = self.wakeup_writer = None
+        self.active = False
+        self.running = True
+        self.thread = None
+        self.start_lock = threading.Lock()
+    
+    def schedule(self, buffer):
+        """Buffer'ı bir sonraki tick'te boşaltılmak üzere sıraya koy"""
+        self.pending.append(buffer)
+        if not self.active:
+            if self.thread is None:
+                self._start()
+            self._wakeup()
+    
+    def _wakeup(self):
+        writer = self.wakeup_writer
+        if writer is None:
+            return
+        try:
+            writer.send(b'\0')
+        except OSError:
+            pass  # buffer dolu: zaten uyanacak
+    
+    def _start(self):
+        with self.start_lock:
+            if self.thread is None and self.running:
+                self.selector = selectors.DefaultSelector()
+                self.wakeup_reader, self.wakeup_writer = socket.socketpair()
+                self.wakeup_reader.setblocking(False)
+                self.wakeup_writer.setblocking(False)
+                self.selector.register(self.wakeup_reader, selectors.EVENT_READ, None)
+                self.thread = threading.Thread(target=self._run, daemon=True,
+                                               name='write-flusher')
+                self.thread.start()
+    
+    def stop(self):
+        """Thread'i durdur ve bekleyenleri boşalt"""
+        self.running = False
+        self._wakeup()
+        thread = self.thread
+        if thread and thread is not threading.current_thread():
+            thread.join(2)
+        if thread is None or not thread.is_alive():
+            self._flush(list(self.blocked))
+            if self.selector is not None:
+                self.selector.close()
+                self.wakeup_reader.close()
+                self.wakeup_writer.close()
+    
+    def _run(self):
+        while self.running:
+            # active=False yazılıp sonra pending okunur; schedule ters sırada
+            # yapar, böylece ikisinden biri diğerini mutlaka görür
+            self.active = False
+            if self.pending:
+                timeout = 0
+            else:
+                # Düşürülmüş bağlantılar selector'de kalmasın diye ara ara bak
+                timeout = 1.0 if self.blocked else None
+            events = self.selector.select(timeout)
+            self.active = True
+            
+            writable = []
+            for key, _ in events:
+                if key.data is None:
+                    self._drain_wakeup()
+                else:
+                    writable.append(key.data)
+            if not events and self.blocked:
+                self._purge()
+            
+            if self.pending and self.delay:
+                time.sleep(self.delay)
+            self._flush(writable)
+    
+    def _drain_wakeup(self):
+        try:
+            while self.wakeup_reader.recv(4096):
+                pass
+        except OSError:
+            pass
+    
+    def _flush(self, writable):
+        """Yazılabilir olan ve sıradaki buffer'ları bloklamadan boşalt"""
+        pending = self.pending
+        frames = calls = 0
+        for buffer in writable:
+            frames, calls = self._flush_one(buffer, frames, calls)
+        while pending:
+            frames, calls = self._flush_one(pending.popleft(), frames, calls)
+        if calls and self.on_flush:
+            self.on_flush(frames, calls)
+    
+    def _flush_one(self, buffer, frames, calls):
+        try:
+            flushed, used, blocked = buffer.drain()
+        except OSError:
+            # Bağlantı koptu; handler'ın okuma thread'i temizliği yapar
+            flushed = used = 0
+            blocked = False
+        
+        if blocked:
+            self._watch(buffer)
+        elif buffer in self.blocked:
+            self._unwatch(buffer)
+        return frames + flushed, calls + used
+    
+    def _watch(self, buffer):
+        """Socket'i dolan buffer'ı yazılabilir olunca devam etmek üzere selector'e ekle"""
+        if buffer in self.blocked or not self.running:
+            return
+        try:
+            self.selector.register(buffer.sock, selectors.EVENT_WRITE, buffer)
+        except KeyError:
+            # Kapanmış bir bağlantının fd numarası yeniden kullanılmış
+            self.blocked.discard(self.selector.unregister(buffer.sock).data)
+            self.selector.register(buffer.sock, selectors.EVENT_WRITE, buffer)
+        except (ValueError, OSError):
+            return  # socket kapanmış
+        self.blocked.add(buffer)
+    
+    def _unwatch(self, buffer):
+        self.blocked.discard(buffer)
+        if not self.running:
+            return  # selector kapanıyor
+        try:
+            self.selector.unregister(buffer.sock)
+        except (KeyError, ValueError):
+            pass
+    
+    def _purge(self):
+        """Kapanmış veya düşürülmüş bağlantıları selector'den çıkar"""
+        for buffer in list(self.blocked):
+            if buffer.error is not None:
+                self._unwatch(buffer)
+
+
+class OutputBuffer:
+    """
+    Bir bağlantının giden frame kuyruğu
+    Aynı anda tek bir thread gönderir; o sırada gelen frame'ler onun bir
+    sonraki sendmsg'sine eklenir. Gönderim bloklamaz: socket'e sığmayan
+    parti (inflight) socket yazılabilir olunca kaldığı yerden devam eder
+    """
+    
+    def __init__(self, sock, flusher=None, on_flush=None, on_overflow=None,
+                 max_bytes=WRITE_COALESCE_MAX_BYTES, max_frames=WRITE_COALESCE_MAX_FRAMES,
+                 max_buffered=WRITE_MAX_BUFFERED):
+        self.sock = sock
+        self.flusher = flusher          # None: yazan thread gönderir
+        self.on_flush = on_flush        # yazan thread'de gönderimde: on_flush(frame_sayısı, send_çağrısı)
+        self.on_overflow = on_overflow  # max_buffered aşılınca bir kez çağrılır (bağlantıyı kapatmalı)
+        self.max_bytes = max_bytes
+        self.max_frames = max_frames
+        self.max_buffered = max_buffered
+        # Gecikme 0: yazan thread beklemeden bir gönderim dener
+        self.immediate = flusher is None or not flusher.delay
+        # Reentrant olmayan lock: her frame'de alınır, RLock'tan ucuz
+        self.lock = threading.Lock()
+        self.drained = threading.Condition(self.lock)
+        self.queue = LaneQueue()
+        self.inflight = []              # socket'e kısmen verilmiş partinin kalanı
+        self.inflight_size = 0
+        self.flushing = False
+        self.waiters = 0                # flush()'ta gönderimin bitmesini bekleyenler
+        self.scheduled = False          # flusher sırasında veya selector'ünde
+        self.error = None
+    
+    def write(self, payload, lane=LANE_BULK, key=None):
+        """
+        Frame'i sınıfının kuyruğuna ekle
+        Returns:
+            bool: kuyruktaki aynı anahtarlı frame'in yerine geçtiyse True
+        Raises:
+            OSError: bağlantı koptuysa veya gönderilemeyen veri max_buffered'ı aştıysa
+        """
+        with self.lock:
+            if self.error is not None:
+                raise self.error
+            superseded = self.queue.push(payload, lane, key)
+            if self.queue.size + self.inflight_size > self.max_buffered:
+                # Yetişemeyen client'ın kuyruğu sınırsız büyümesin
+                self.error = ConnectionError('output buffer overflow')
+                self.queue.clear()
+                overflow = True
+            else:
+                overflow = False
+                if self.scheduled or (self.flushing and not self.immediate):
+                    return superseded
+                if not self.immediate:
+                    self.scheduled = True
+        
+        if overflow:
+            if self.on_overflow:
+                self.on_overflow()
+            raise self.error
+        if not self.immediate:
+            self.flusher.schedule(self)
+            return superseded
+        
+        frames, calls, blocked = self.drain()
+        if calls and self.on_flush:
+            self.on_flush(frames, calls)
+        if blocked and self.flusher:
+            self.flusher.schedule(self)
+        return superseded
+    
+    def drain(self):
+        """
+        Kuyruğu socket dolana kadar bloklamadan gönder
+        Başka thread gönderiyorsa hemen döner (o thread kuyruğu da gönderir)
+        Returns:
+            tuple: (gönderilen frame, send çağrısı, socket dolu mu)
+        Raises:
+            OSError: bağlantı koptuysa
+        """
+        with self.lock:
+            if self.flushing or self.error is not None:
+                return 0, 0, False
+            self.scheduled = False
+            batch = self._take()
+            if batch is None:
+                return 0, 0, False
+            self.flushing = True
+        
+        frames = calls = 0
+        try:
+            while True:
+                sent = send_frames(self.sock, batch)
+                calls += 1
+                
+                with self.lock:
+                    if sent < self.inflight_size:
+                        frames += self._advance(sent)
+                        # Socket dolu: flusher yazılabilir olunca devam ettirir
+                        self.scheduled = self.flusher is not None
+                        self._release()
+                        return frames, calls, True
+                    frames += len(batch)
+                    self.inflight = []
+                    batch = self._take()
+                    if batch is None:
+                        self._release()
+                        return frames, calls, False
+        except OSError as e:
+            with self.lock:
+                self.error = e
+                self.queue.clear()
+                self.inflight = []
+                self.inflight_size = 0
+                self._release()
+            raise
+    
+    def _take(self):
+        """Gönderilecek partiyi döndür, yoksa None (lock altında)"""
+        if not self.inflight:
+            if not self.queue:
+                return None
+            # Kontrol mesajları, gönderim sürerken kuyruğa girmiş sohbetin önüne geçer
+            size = self.queue.size
+            self.inflight = self.queue.take(self.max_frames, self.max_bytes)
+            self.inflight_size = size - self.queue.size
+        return self.inflight
+    
+    def _release(self):
+        """Gönderim sahipliğini bırak (lock altında)"""
+        self.flushing = False
+        if self.waiters:
+            self.drained.notify_all()
+    
+    def _advance(self, sent):
+        """
+        Kısmi gönderim: gönderilen frame'leri at, yarım kalanı kes (lock altında)
+        Returns:
+            int: tamamı gönderilen frame sayısı
+        """
+        inflight = self.inflight
+        self.inflight_size -= sent
+        done = 0
+        while sent >= len(inflight[done]):
+            sent -= len(inflight[done])
+            done += 1
+        del inflight[:done]
+        if sent:
+            inflight[0] = memoryview(inflight[0])[sent:]
+        return done
+    
+    def flush(self, timeout=1.0):
+        """
+        Kuyruk boşalana kadar gönder, socket doluysa yazılabilir olmasını bekle
+        Kapanışta kuyruktaki frame'ler (ör. kick mesajı) gitsin diye kullanılır
+        Returns:
+            tuple: (gönderilen frame, send çağrısı)
+        """
+        deadline = time.monotonic() + timeout
+        frames = calls = 0
+        while True:
+            flushed, used, blocked = self.drain()
+            frames += flushed
+            calls += used
+            
+            remaining = deadline - time.monotonic()
+            with self.lock:
+                done = self.error is not None or not (self.queue or self.inflight)
+                if not done and remaining > 0 and self.flushing:
+                    # Başka thread gönderiyor, bitirmesini bekle
+                    self.waiters += 1
+                    self.drained.wait(remaining)
+                    self.waiters -= 1
+                    continue
+            if done or remaining <= 0:
+                if blocked and self.flusher:
+                    # Kalanı flusher yazılabilir olunca göndersin
+                    self.flusher.schedule(self)
+                return frames, calls
+            if blocked:
+                select.select([], [self.sock], [], remaining)
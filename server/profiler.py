@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Profiler Module
+Çalışan server için isteğe bağlı, sys._current_frames() tabanlı örnekleyici profiler
+"""
+
+import math
+import os
+import sys
+import threading
+import time
+from common.config import PROFILE_SAMPLE_HZ, PROFILE_MAX_SECONDS
+
+
+class ProfilerBusy(Exception):
+    """Başka bir profil zaten çalışıyor"""
+    pass
+
+
+def _thread_cpu_time(ident):
+    """Thread'in CPU süresi (saniye) - platform desteklemiyorsa None"""
+    try:
+        return time.clock_gettime(time.pthread_getcpuclockid(ident))
+    except (AttributeError, OSError):
+        return None
+
+
+def _frame_label(frame):
+    """Flamegraph'ta görünecek frame adı: fonksiyon (dosya:satır)"""
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+class SamplingProfiler:
+    """
+    Belirli aralıklarla tüm thread'lerin stack'lerini örnekler
+    Sadece istek süresince çalışır; boştayken hiçbir maliyeti yoktur
+    Aynı anda tek profil çalışabilir
+    """
+    
+    def __init__(self, thread_labels=None):
+        # thread_labels() -> {thread_ident: etiket}, ör. ClientHandler nickname'leri
+        self.thread_labels = thread_labels
+        self.lock = threading.Lock()
+    
+    def profile(self, seconds, hz=PROFILE_SAMPLE_HZ):
+        """
+        seconds boyunca hz sıklığında örnekle
+        Returns:
+            dict: collapsed stack'ler ve thread başına örnek/CPU dağılımı
+        Raises:
+            ProfilerBusy: başka profil çalışıyorsa
+            ValueError: seconds sonlu pozitif bir sayı değilse
+        """
+        # nan her karşılaştırmada False döner, deadline'a hiç ulaşılmaz
+        if not math.isfinite(seconds) or seconds <= 0:
+            raise ValueError(f"Invalid profile duration: {seconds}")
+        seconds = min(seconds, PROFILE_MAX_SECONDS)
+        hz = min(max(int(hz), 1), 1000)
+        if not self.lock.acquire(blocking=False):
+            raise ProfilerBusy()
+        try:
+            return self._run(seconds, hz)
+        finally:
+            self.lock.release()
+    
+    def _run(self, seconds, hz):
+        """Örnekleme döngüsü"""
+        own_ident = threading.get_ident()
+        interval = 1.0 / hz
+        labels = self._labels()
+        
+        stacks = {}         # {(etiket, frame1, frame2, ...): örnek}
+        samples = {}        # {ident: örnek}
+        cpu_first = {}      # {ident: ilk görüldüğündeki CPU süresi}
+        cpu_last = {}
+        overhead = 0.0
+        sample_count = 0
+        
+        started = time.perf_counter()
+        deadline = started + seconds
+        next_tick = started
+        
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            if now < next_tick:
+                time.sleep(next_tick - now)
+            next_tick += interval
+            
+            tick_started = time.perf_counter()
+            frames = sys._current_frames()
+            for ident, frame in frames.items():
+                if ident == own_ident:
+                    continue
+                
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(ident)
+                stack.reverse()
+                
+                key = tuple(stack)
+                stacks[key] = stacks.get(key, 0) + 1
+                samples[ident] = samples.get(ident, 0) + 1
+                
+                cpu = _thread_cpu_time(ident)
+                if cpu is not None:
+                    cpu_first.setdefault(ident, cpu)
+                    cpu_last[ident] = cpu
+            del frames
+            sample_count += 1
+            overhead += time.perf_counter() - tick_started
+        
+        elapsed = time.perf_counter() - started
+        
+        # Profil sırasında bağlanan client'lar için etiketleri tazele
+        labels.update(self._labels())
+        
+        collapsed = {}
+        for (ident, *frames), count in stacks.items():
+            root = labels.get(ident, str(ident)).replace(';', '_')
+            line = ';'.join([root] + frames)
+            collapsed[line] = collapsed.get(line, 0) + count
+        
+        threads = []
+        for ident, count in samples.items():
+            cpu = cpu_last[ident] - cpu_first[ident] if ident in cpu_first else None
+            threads.append({
+                'thread': labels.get(ident, str(ident)),
+                'samples': count,
+                'cpu_seconds': round(cpu, 4) if cpu is not None else None,
+                'cpu_percent': round(cpu / elapsed * 100, 2) if cpu is not None else None
+            })
+        threads.sort(key=lambda t: (-(t['cpu_seconds'] or 0), -t['samples']))
+        
+        return {
+            'seconds': round(elapsed, 3),
+            'hz': hz,
+            'samples': sample_count,
+            'overhead_percent': round(overhead / elapsed * 100, 2) if elapsed else 0,
+            'threads': threads,
+            'collapsed': [f"{line} {count}" for line, count in
+                          sorted(collapsed.items(), key=lambda item: -item[1])]
+        }
+    
+    def _labels(self):
+        """Thread ident -> okunabilir etiket"""
+        labels = {thread.ident: thread.name for thread in threading.enumerate()}
+        if self.thread_labels:
+            try:
+                labels.update(self.thread_labels())
+            except Exception as e:
+                print(f"❌ Error collecting thread labels: {e}")
+        return labels
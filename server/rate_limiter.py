@@ -5,19 +5,22 @@ Rate Limiter Module
 Spam koruması ve rate limiting işlemlerini yönetir
 """
 
-import time
 from collections import deque
 from common.config import (
     RATE_LIMIT_WINDOW, RATE_LIMIT_MAX,
     SEVERE_LIMIT_WINDOW, SEVERE_LIMIT_MAX,
     MUTE_DURATION
 )
+from server.clock import SYSTEM_CLOCK
 
 
 class RateLimiter:
     """Rate limiting ve spam koruması sınıfı"""
     
-    def __init__(self):
+    def __init__(self, clock=None):
+        # Simülasyonda sanal saat enjekte edilir
+        self.clock = clock or SYSTEM_CLOCK
+        
         # Her client için mesaj zamanları
         self.message_times = {}  # {nickname: deque([timestamp, ...])}
         # Mute durumları
@@ -54,7 +57,7 @@ class RateLimiter:
         if mute_time is None:
             return False
         
-        current_time = time.time()
+        current_time = self.clock.time()
         if current_time < mute_time:
             return True
         else:
@@ -68,7 +71,7 @@ class RateLimiter:
             return 0
         
         mute_time = self.muted_until[nickname]
-        current_time = time.time()
+        current_time = self.clock.time()
         return int(mute_time - current_time)
     
     def check_rate_limit(self, nickname):
@@ -80,46 +83,59 @@ class RateLimiter:
             ('MUTE', duration) - Mute edildi
             ('KICK', None) - Kick edilmeli
         """
-        current_time = time.time()
-        
-        # Muted ise kick
-        if self.is_muted(nickname):
-            self.total_kicks += 1
-            return ('KICK', None)
+        return self.check_rate_limit_batch(nickname, 1)[0]
+    
+    def check_rate_limit_batch(self, nickname, count):
+        """
+        Aynı anda gelen count mesaj için tek değerlendirme
+        Kararlar count kez check_rate_limit çağrılmış gibidir; ilk KICK'te durur
+        (handler kick'ten sonra kalan mesajları işlemez)
+        Returns:
+            list: her mesaj için (durum, veri)
+        """
+        current_time = self.clock.time()
         
-        # Mesaj zamanını ekle
+        # Mesaj zamanları
         if nickname not in self.message_times:
             self.add_client(nickname)
-        
-        self.message_times[nickname].append(current_time)
+        times = self.message_times[nickname]
         
         # Eski mesajları temizle (SEVERE_LIMIT_WINDOW dışındakiler)
-        while (self.message_times[nickname] and 
-               current_time - self.message_times[nickname][0] > SEVERE_LIMIT_WINDOW):
-            self.message_times[nickname].popleft()
-        
-        # Mesaj sayılarını hesapla
-        recent_messages = list(self.message_times[nickname])
-        
-        # Son 5 saniyedeki mesajlar
-        count_5s = sum(1 for t in recent_messages if current_time - t <= RATE_LIMIT_WINDOW)
-        
-        # Son 10 saniyedeki mesajlar
-        count_10s = len(recent_messages)
+        while times and current_time - times[0] > SEVERE_LIMIT_WINDOW:
+            times.popleft()
         
-        # SEVERE limit kontrolü (MUTE)
-        if count_10s >= SEVERE_LIMIT_MAX:
-            self.muted_until[nickname] = current_time + MUTE_DURATION
-            self.total_mutes += 1
-            return ('MUTE', MUTE_DURATION)
+        # Son 5 ve 10 saniyedeki mesajlar
+        count_5s = sum(1 for t in times if current_time - t <= RATE_LIMIT_WINDOW)
+        count_10s = len(times)
         
-        # Normal limit kontrolü (WARNING)
-        if count_5s >= RATE_LIMIT_MAX:
-            self.warning_counts[nickname] = self.warning_counts.get(nickname, 0) + 1
-            self.total_warnings += 1
-            return ('WARNING', self.warning_counts[nickname])
+        decisions = []
+        for _ in range(count):
+            # Muted ise kick
+            if self.is_muted(nickname):
+                self.total_kicks += 1
+                decisions.append(('KICK', None))
+                break
+            
+            times.append(current_time)
+            count_5s += 1
+            count_10s += 1
+            
+            # SEVERE limit kontrolü (MUTE)
+            if count_10s >= SEVERE_LIMIT_MAX:
+                self.muted_until[nickname] = current_time + MUTE_DURATION
+                self.total_mutes += 1
+                decisions.append(('MUTE', MUTE_DURATION))
+            
+            # Normal limit kontrolü (WARNING)
+            elif count_5s >= RATE_LIMIT_MAX:
+                self.warning_counts[nickname] = self.warning_counts.get(nickname, 0) + 1
+                self.total_warnings += 1
+                decisions.append(('WARNING', self.warning_counts[nickname]))
+            
+            else:
+                decisions.append(('OK', None))
         
-        return ('OK', None)
+        return decisions
     
     def get_statistics(self):
         """İstatistikleri döndür"""
@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Search Index Module
+Chat geçmişi üzerinde arka planda güncellenen tam metin (inverted) index
+"""
+
+import glob
+import json
+import math
+import os
+import queue
+import re
+import threading
+import time
+from array import array
+from common.config import (
+    SEARCH_DOCS_FILE, SEARCH_INDEX_FILE, SEARCH_FLUSH_INTERVAL,
+    MESSAGE_TYPE_PUBLIC, MESSAGE_TYPE_PRIVATE
+)
+
+
+INDEX_MAGIC = b'CSIX2'
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    """Metni küçük harfli kelimelere ayır"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def encode_varint(value, out):
+    """Pozitif tamsayıyı varint olarak bytearray'e ekle"""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_varint(data, pos):
+    """
+    Varint oku
+    Returns:
+        (int, int): (değer, yeni_pozisyon)
+    """
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+class IndexSegment:
+    """
+    Tek bir log segmentine ait dokümanlar ve posting listeleri
+    Aktif segment log'un aktif dosyasına, mühürlenmiş segmentler döndürülmüş
+    log arşivlerine karşılık gelir; arşivle birlikte silinir
+    """
+    
+    def __init__(self, docs_file, index_file, name=None):
+        self.name = name            # log arşivinin son eki, aktif segmentte None
+        self.docs_file = docs_file
+        self.index_file = index_file
+        
+        # {token: (array('Q') doküman offset'leri, array('I') terim frekansları)}
+        self.postings = {}
+        # Son flush'tan sonra eklenenler - flush sadece bunları index dosyasına ekler
+        self.pending = {}
+        self.doc_count = 0
+        self.docs_size = 0      # docs dosyasının index'lenmiş kısmının boyutu
+    
+    def add_document(self, offset, text):
+        """Dokümanın token'larını posting listelerine ekle (index lock'u altında)"""
+        frequencies = {}
+        for token in tokenize(text):
+            frequencies[token] = frequencies.get(token, 0) + 1
+        
+        for postings in (self.postings, self.pending):
+            for token, tf in frequencies.items():
+                entry = postings.get(token)
+                if entry is None:
+                    entry = (array('Q'), array('I'))
+                    postings[token] = entry
+                entry[0].append(offset)
+                entry[1].append(tf)
+        
+        self.doc_count += 1
+    
+    def take_pending(self):
+        """
+        Flush edilecek bloğu al (index lock'u altında)
+        Returns:
+            (dict, int, int) veya None: (postings, docs_size, doc_count)
+        """
+        if not self.pending:
+            return None
+        pending, self.pending = self.pending, {}
+        return pending, self.docs_size, self.doc_count
+    
+    def load(self):
+        """Diskteki index bloklarını yükle, index'lenmemiş dokümanları tamamla"""
+        try:
+            with open(self.index_file, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = b''
+        
+        if data and not data.startswith(INDEX_MAGIC):
+            # Eski tam-snapshot formatı veya bozuk dosya: docs dosyasından yeniden kur
+            print(f"🔄 Rebuilding search index {self.index_file}")
+            data = b''
+            self._remove(self.index_file)
+        
+        valid = self._decode(data) if data else 0
+        if data and valid < len(data):
+            # Crash'te yarım kalmış son blok
+            with open(self.index_file, 'r+b') as f:
+                f.truncate(valid)
+        
+        self._catch_up()
+    
+    def _decode(self, data):
+        """
+        Index bloklarını belleğe aç
+        Returns:
+            int: Tam okunan kısmın byte uzunluğu
+        """
+        pos = len(INDEX_MAGIC)
+        while pos < len(data):
+            try:
+                length, body = decode_varint(data, pos)
+                if body + length > len(data):
+                    break
+                self._decode_block(data, body)
+            except (IndexError, UnicodeDecodeError):
+                break
+            pos = body + length
+        return pos
+    
+    def _decode_block(self, data, pos):
+        """Tek bir flush bloğunu posting listelerine ekle"""
+        docs_size, pos = decode_varint(data, pos)
+        doc_count, pos = decode_varint(data, pos)
+        token_count, pos = decode_varint(data, pos)
+        
+        block = []
+        for _ in range(token_count):
+            length, pos = decode_varint(data, pos)
+            token = data[pos:pos + length].decode('utf-8')
+            pos += length
+            count, pos = decode_varint(data, pos)
+            
+            offsets = array('Q')
+            previous = 0
+            for _ in range(count):
+                delta, pos = decode_varint(data, pos)
+                previous += delta
+                offsets.append(previous)
+            
+            tfs = array('I')
+            for _ in range(count):
+                tf, pos = decode_varint(data, pos)
+                tfs.append(tf)
+            
+            block.append((token, offsets, tfs))
+        
+        # Blok tam okunduktan sonra uygula, yarım blok index'i bozmasın
+        for token, offsets, tfs in block:
+            entry = self.postings.get(token)
+            if entry is None:
+                self.postings[token] = (offsets, tfs)
+            else:
+                entry[0].extend(offsets)
+                entry[1].extend(tfs)
+        self.docs_size = docs_size
+        self.doc_count = doc_count
+    
+    def _catch_up(self):
+        """Son flush'tan sonra docs dosyasına yazılmış dokümanları index'le"""
+        try:
+            with open(self.docs_file, 'rb') as f:
+                f.seek(self.docs_size)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break  # yarım kalmış satır
+                    try:
+                        doc = json.loads(line)
+                        self.add_document(self.docs_size, doc['message'])
+                    except (ValueError, KeyError):
+                        pass
+                    self.docs_size += len(line)
+        except FileNotFoundError:
+            return
+        
+        # Crash sonrası yarım kalmış son satırı at, yeni kayıtlar temiz başlasın
+        if os.path.getsize(self.docs_file) > self.docs_size:
+            with open(self.docs_file, 'r+b') as f:
+                f.truncate(self.docs_size)
+    
+    def remove_files(self):
+        """Segmentin docs ve index dosyalarını sil"""
+        self._remove(self.docs_file)
+        self._remove(self.index_file)
+    
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def encode_block(postings, docs_size, doc_count):
+    """
+    Flush bloğunu encode et
+    Format: uzunluk, docs_size, doc_count, token_count, her token için
+            (uzunluk, utf8, posting_sayısı, offset delta'ları, tf'ler) - hepsi varint
+    """
+    out = bytearray()
+    encode_varint(docs_size, out)
+    encode_varint(doc_count, out)
+    encode_varint(len(postings), out)
+    
+    for token, (offsets, tfs) in postings.items():
+        token_bytes = token.encode('utf-8')
+        encode_varint(len(token_bytes), out)
+        out += token_bytes
+        encode_varint(len(offsets), out)
+        
+        previous = 0
+        for offset in offsets:
+            encode_varint(offset - previous, out)
+            previous = offset
+        for tf in tfs:
+            encode_varint(tf, out)
+    
+    block = bytearray()
+    encode_varint(len(out), block)
+    return block + out
+
+
+class SearchIndex:
+    """
+    Token -> posting list (doküman offset'leri) inverted index'i
+    Index, log segmentleriyle aynı ömre sahip segmentlere bölünür. Aktif
+    segmentin dokümanları append-only bir JSONL dosyasında tutulur; log
+    döndürülünce segment arşivin son ekiyle mühürlenir, arşiv retention ile
+    silinince (ya da log temizlenince) segment de silinir. Doküman id'si
+    (segment, docs dosyasındaki byte offset) çiftidir.
+    """
+    
+    def __init__(self, docs_file=SEARCH_DOCS_FILE, index_file=SEARCH_INDEX_FILE,
+                 flush_interval=SEARCH_FLUSH_INTERVAL):
+        self.docs_file = docs_file
+        self.index_file = index_file
+        self.flush_interval = flush_interval
+        
+        # Eskiden yeniye: mühürlenmiş segmentler, sonda aktif segment
+        self.segments = []
+        self.lock = threading.Lock()
+        # Flush'lar index dosyalarına sırayla eklensin
+        self.flush_lock = threading.Lock()
+        
+        # Kayıtlar (dict), segment olayları (tuple) ve durdurma sentinel'i (None)
+        self.queue = queue.Queue()
+        self.thread = None
+        
+        log_dir = os.path.dirname(self.docs_file)
+        if log_dir and not os.path.exists(log_dir):
+            os.makedirs(log_dir)
+        
+        self._load()
+    
+    @property
+    def doc_count(self):
+        return sum(segment.doc_count for segment in self.segments)
+    
+    @property
+    def active(self):
+        return self.segments[-1]
+    
+    def start(self):
+        """Arka plan index'leme thread'ini başlat"""
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        """Kuyruğu sonuna kadar işle ve index'i diske yaz"""
+        if self.thread:
+            self.queue.put(None)
+            self.thread.join(timeout=5)
+            self.thread = None
+        else:
+            self.flush()
+    
+    def submit(self, record):
+        """
+        Logger listener'ı - sadece kuyruğa ekler, hot path'te iş yapılmaz
+        """
+        if record['type'] in (MESSAGE_TYPE_PUBLIC, MESSAGE_TYPE_PRIVATE):
+            self.queue.put(record)
+    
+    def on_segment(self, event, name):
+        """
+        Logger segment listener'ı - olay kayıtlarla aynı kuyruktan sırayla işlenir
+        Args:
+            event: 'rotate' (aktif segment name ile arşivlendi), 'remove' (name
+                   arşivi silindi) veya 'clear' (aktif segment temizlendi)
+        """
+        self.queue.put((event, name))
+    
+    def retain(self, names):
+        """Log arşivi artık olmayan mühürlü segmentleri sil (başlangıçta)"""
+        names = set(names)
+        with self.lock:
+            dropped = [s for s in self.segments[:-1] if s.name not in names]
+            self.segments = [s for s in self.segments if s.name is None or s.name in names]
+        for segment in dropped:
+            segment.remove_files()
+    
+    def _run(self):
+        """Kuyruktaki işleri sırayla işle, periyodik olarak diske yaz"""
+        last_flush = time.time()
+        docs = open(self.docs_file, 'ab')
+        
+        try:
+            while True:
+                try:
+                    item = self.queue.get(timeout=1)
+                except queue.Empty:
+                    item = False
+                
+                if item is None:
+                    break  # stop(): önündeki her şey işlendi
+                if isinstance(item, dict):
+                    self._index_record(docs, item)
+                elif item:
+                    docs = self._apply_segment_event(docs, *item)
+                
+                if time.time() - last_flush >= self.flush_interval:
+                    self.flush()
+                    last_flush = time.time()
+        finally:
+            docs.close()
+            self.flush()
+    
+    def _index_record(self, docs, record):
+        """Kaydı docs dosyasına yaz ve token'larını posting listelerine ekle"""
+        doc = {
+            'ts': record.get('ts'),
+            'type': record['type'],
+            'sender': record.get('sender'),
+            'recipient': record.get('recipient'),
+            'message': record['message']
+        }
+        line = (json.dumps(doc, ensure_ascii=False) + '\n').encode('utf-8')
+        docs.write(line)
+        # Arama thread'i offset'i görmeden önce satır diskte olmalı
+        docs.flush()
+        
+        with self.lock:
+            active = self.active
+            active.add_document(active.docs_size, doc['message'])
+            active.docs_size += len(line)
+    
+    def _apply_segment_event(self, docs, event, name):
+        """
+        Log segment olayını index'e uygula (index thread'inde)
+        Returns:
+            file: Aktif segmentin (gerekirse yeniden açılmış) docs dosyası
+        """
+        if event == 'remove':
+            with self.lock:
+                dropped = [s for s in self.segments[:-1] if s.name == name]
+                self.segments = [s for s in self.segments if s not in dropped]
+            for segment in dropped:
+                segment.remove_files()
+            return docs
+        
+        self.flush()
+        docs.close()
+        with self.lock:
+            active = self.segments.pop()
+            sealed = None
+            if event == 'rotate' and active.doc_count:
+                sealed = IndexSegment(f"{self.docs_file}.{name}", f"{self.index_file}.{name}", name)
+                try:
+                    os.replace(active.docs_file, sealed.docs_file)
+                    os.replace(active.index_file, sealed.index_file)
+                    sealed.postings = active.postings
+                    sealed.doc_count = active.doc_count
+                    sealed.docs_size = active.docs_size
+                    self.segments.append(sealed)
+                except OSError as e:
+                    print(f"❌ Error sealing search segment {name}: {e}")
+                    sealed.remove_files()
+                    sealed = None
+            if sealed is None:
+                active.remove_files()
+            self.segments.append(IndexSegment(self.docs_file, self.index_file))
+        return open(self.docs_file, 'ab')
+    
+    def flush(self):
+        """
+        Son flush'tan sonra eklenen posting'leri index dosyasına blok olarak ekle
+        Lock altında sadece bekleyen blok alınır; encode ve yazma lock dışında
+        """
+        with self.flush_lock:
+            with self.lock:
+                active = self.active
+                block = active.take_pending()
+            if block is None:
+                return
+            
+            out = encode_block(*block)
+            try:
+                with open(active.index_file, 'ab') as f:
+                    if not f.tell():
+                        f.write(INDEX_MAGIC)
+                    f.write(out)
+            except OSError as e:
+                print(f"❌ Error writing search index: {e}")
+    
+    def _load(self):
+        """Mühürlü segmentleri ve aktif segmenti diskten yükle"""
+        prefix = self.docs_file + '.'
+        for docs_file in sorted(glob.glob(glob.escape(self.docs_file) + '.*')):
+            name = docs_file[len(prefix):]
+            segment = IndexSegment(docs_file, f"{self.index_file}.{name}", name)
+            segment.load()
+            self.segments.append(segment)
+        
+        active = IndexSegment(self.docs_file, self.index_file)
+        active.load()
+        self.segments.append(active)
+    
+    def search(self, query, page=1, per_page=20):
+        """
+        Sorguyu TF-IDF skoruyla sırala ve sayfalı döndür
+        Eşit skorda yeni mesajlar önce gelir
+        """
+        tokens = set(tokenize(query))
+        scores = {}
+        
+        with self.lock:
+            segments = list(self.segments)
+            doc_count = max(self.doc_count, 1)
+            for token in tokens:
+                entries = [(i, s.postings[token]) for i, s in enumerate(segments)
+                           if token in s.postings]
+                if not entries:
+                    continue
+                frequency = sum(len(offsets) for _, (offsets, _) in entries)
+                idf = math.log(1 + doc_count / frequency)
+                for i, (offsets, tfs) in entries:
+                    for offset, tf in zip(offsets, tfs):
+                        key = (i, offset)
+                        scores[key] = scores.get(key, 0.0) + (1 + math.log(tf)) * idf
+        
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], -item[0][0], -item[0][1]))
+        # Negatif per_page dilimi ranked[0:-n] yapıp neredeyse tüm sonuçları döndürürdü
+        page = max(page, 1)
+        per_page = max(per_page, 1)
+        start = (page - 1) * per_page
+        page_items = ranked[start:start + per_page]
+        
+        # Dosyalar lock altında açılır: mühürleme rename'i açık dosyayı etkilemez
+        files = {}
+        with self.lock:
+            for (i, _), _ in page_items:
+                if i not in files and segments[i] in self.segments:
+                    try:
+                        files[i] = open(segments[i].docs_file, 'rb')
+                    except OSError:
+                        pass
+        
+        results = []
+        try:
+            for (i, offset), score in page_items:
+                f = files.get(i)
+                if f is None:
+                    continue  # segment bu sırada silindi
+                f.seek(offset)
+                doc = json.loads(f.readline())
+                doc['score'] = round(score, 4)
+                results.append(doc)
+        finally:
+            for f in files.values():
+                f.close()
+        
+        return {
+            'query': query,
+            'total': len(ranked),
+            'page': page,
+            'per_page': per_page,
+            'results': results
+        }
+    
+    def get_statistics(self):
+        """Index istatistikleri"""
+        with self.lock:
+            return {
+                'documents': self.doc_count,
+                'segments': len(self.segments),
+                'tokens': sum(len(segment.postings) for segment in self.segments),
+                'pending': self.queue.qsize()
+            }
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shared Memory Stats Module
+Sayaçların sabit binary layout'lu bir shared memory segmentinde yayınlanması
+
+Layout (little-endian):
+    0   4s   magic  b'CHST'
+    4   H    layout versiyonu
+    6   H    alan sayısı
+    8   Q    seqlock sayacı (yazım sırasında tek)
+    16  q*N  FIELDS sırasıyla değerler
+
+Alanlar sadece sona eklenir. Okuyucu header'daki alan sayısı kadar değer
+okur; eski server'ın yazmadığı alanlar sonuçta yer almaz, yeni server'ın
+eklediği fazlası yok sayılır.
+"""
+
+import struct
+import threading
+import time
+from common.config import STATS_SHM_PREFIX, STATS_SHM_INTERVAL
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python < 3.8
+    shared_memory = None
+
+
+MAGIC = b'CHST'
+LAYOUT_VERSION = 1      # mevcut alanların yeri veya tipi değişirse artırılır
+
+# Sıra layout'un parçasıdır: yeni alanlar sadece sona eklenir
+FIELDS = (
+    'updated_ms',
+    'start_ms',
+    'connected_clients',
+    'total_connections',
+    'messages_routed',
+    'bytes_received',
+    'bytes_sent',
+    'frames_received',
+    'frames_sent',
+    'rate_ok',
+    'rate_warning',
+    'rate_mute',
+    'rate_kick',
+    'muted_clients',
+    'search_queue',
+    'sse_subscribers',
+    'sse_queue',
+    'threads',
+    'latency_p99_ns',
+    'socket_writes',
+    'socket_writes_saved',
+    'frames_superseded',
+)
+
+HEADER = struct.Struct('<4sHHQ')
+SEQ = struct.Struct('<Q')
+SEQ_OFFSET = 8
+VALUES = struct.Struct('<' + 'q' * len(FIELDS))
+SEGMENT_SIZE = HEADER.size + VALUES.size
+
+
+def segment_name(port, prefix=STATS_SHM_PREFIX):
+    """Server portuna göre segment adı"""
+    return f"{prefix}_{port}"
+
+
+class SharedStatsWriter:
+    """
+    Tek yazıcılı seqlock: okuyucular hiç lock almaz, yazım sırasında
+    sayaç tek olduğu veya okuma boyunca değiştiği için tekrar dener
+    """
+    
+    def __init__(self, name, collect, interval=STATS_SHM_INTERVAL):
+        self.name = name
+        self.collect = collect      # collect() -> {alan: int}
+        self.interval = interval
+        self.shm = None
+        self.seq = 0
+        self.running = False
+        self.thread = None
+    
+    def start(self):
+        """Segmenti oluştur ve yayın thread'ini başlat"""
+        if shared_memory is None:
+            print("⚠️  multiprocessing.shared_memory not available, chatstat disabled")
+            return False
+        
+        try:
+            self.shm = shared_memory.SharedMemory(name=self.name, create=True, size=SEGMENT_SIZE)
+        except FileExistsError:
+            # Çökmüş bir önceki server'dan kalmış segment
+            stale = shared_memory.SharedMemory(name=self.name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=self.name, create=True, size=SEGMENT_SIZE)
+        except OSError as e:
+            print(f"❌ Could not create stats segment {self.name}: {e}")
+            return False
+        
+        HEADER.pack_into(self.shm.buf, 0, MAGIC, LAYOUT_VERSION, len(FIELDS), 0)
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return True
+    
+    def stop(self):
+        """Yayını durdur ve segmenti kaldır"""
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=2)
+        if self.shm:
+            try:
+                self.shm.close()
+                self.shm.unlink()
+            except (OSError, BufferError):
+                pass
+            self.shm = None
+    
+    def publish(self, values):
+        """Değerleri seqlock altında yaz"""
+        data = VALUES.pack(*(int(values.get(field, 0)) for field in FIELDS))
+        buf = self.shm.buf
+        
+        self.seq += 1                                   # tek: yazım başladı
+        SEQ.pack_into(buf, SEQ_OFFSET, self.seq)
+        buf[HEADER.size:SEGMENT_SIZE] = data
+        self.seq += 1                                   # çift: yazım bitti
+        SEQ.pack_into(buf, SEQ_OFFSET, self.seq)
+    
+    def _run(self):
+        """interval'da bir topla ve yayınla"""
+        while self.running:
+            try:
+                self.publish(self.collect())
+            except Exception as e:
+                print(f"❌ Error publishing shared stats: {e}")
+            time.sleep(self.interval)
+
+
+class SharedStatsReader:
+    """Segmenti salt okunur şekilde açar; server'a hiçbir yük bindirmez"""
+    
+    def __init__(self, name):
+        if shared_memory is None:
+            raise RuntimeError("multiprocessing.shared_memory not available")
+        
+        try:
+            # Python 3.13+: okuyucu segmenti resource tracker'a kaydetmemeli
+            self.shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            self.shm = shared_memory.SharedMemory(name=name)
+            # Eski sürümlerde tracker çıkışta segmenti unlink eder, kaydı geri al
+            try:
+                from multiprocessing import resource_tracker
+                resource_tracker.unregister(self.shm._name, 'shared_memory')
+            except Exception:
+                pass
+        
+        magic, version, field_count, _ = HEADER.unpack_from(self.shm.buf, 0)
+        if magic != MAGIC or version != LAYOUT_VERSION:
+            self.close()
+            raise ValueError(f"Unexpected stats segment layout in {name}")
+        # Farklı sürüm server: sadece iki tarafın da bildiği alanlar okunur
+        self.field_count = min(field_count, len(FIELDS))
+        self.values = struct.Struct('<' + 'q' * self.field_count)
+        if HEADER.size + self.values.size > self.shm.size:
+            self.close()
+            raise ValueError(f"Stats segment {name} is smaller than its header says")
+    
+    def read(self, retries=1000):
+        """
+        Tutarlı bir görüntü oku
+        Returns:
+            dict: {alan: değer} - server'ın yazmadığı alanlar yer almaz
+        """
+        buf = self.shm.buf
+        for _ in range(retries):
+            before = SEQ.unpack_from(buf, SEQ_OFFSET)[0]
+            if before & 1:
+                continue
+            values = self.values.unpack_from(buf, HEADER.size)
+            if SEQ.unpack_from(buf, SEQ_OFFSET)[0] == before:
+                return dict(zip(FIELDS[:self.field_count], values))
+        raise RuntimeError("Stats segment is being rewritten too fast to read")
+    
+    def close(self):
+        """Segmenti kapat (unlink etmez)"""
+        self.shm.close()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Stats Snapshot Module
+Dashboard okuyucularının paylaştığı, periyodik üretilen değişmez istatistik görüntüsü
+"""
+
+import hashlib
+import json
+import threading
+import time
+from common.config import STATS_SNAPSHOT_INTERVAL
+
+
+def _etag(body):
+    """Body'nin içerik hash'inden ETag üret"""
+    return '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+
+class StatsSnapshot:
+    """
+    Tek bir anın değişmez görüntüsü
+    JSON body'leri ve ETag'ler üretim anında bir kez hesaplanır
+    """
+    
+    __slots__ = ('version', 'created', 'stats', 'users',
+                 'stats_json', 'users_json', 'stats_etag', 'users_etag')
+    
+    def __init__(self, version, stats, users):
+        self.version = version
+        self.created = time.time()
+        self.stats = stats
+        self.users = tuple(users)
+        self.stats_json = json.dumps(stats).encode('utf-8')
+        self.users_json = json.dumps(list(self.users)).encode('utf-8')
+        self.stats_etag = _etag(self.stats_json)
+        self.users_etag = _etag(self.users_json)
+
+
+class SnapshotPublisher:
+    """
+    Her interval'da (veya invalidate() ile hemen) bir snapshot üretir
+    Okuyucular sadece referansı okur; chat lock'larına hiç dokunmaz, böylece
+    dashboard maliyeti izleyici sayısından bağımsızdır
+    """
+    
+    def __init__(self, collect_stats, collect_users, interval=STATS_SNAPSHOT_INTERVAL,
+                 on_change=None):
+        self.collect_stats = collect_stats
+        self.collect_users = collect_users
+        self.interval = interval
+        self.on_change = on_change   # on_change(eski_snapshot, yeni_snapshot)
+        
+        self.snapshot = None
+        self.version = 0
+        self.build_lock = threading.Lock()
+        self.changed = threading.Event()
+        self.running = False
+        self.thread = None
+    
+    def start(self):
+        """Snapshot üretim thread'ini başlat"""
+        self.running = True
+        self.refresh()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        """Thread'i durdur"""
+        self.running = False
+        self.changed.set()
+    
+    def invalidate(self):
+        """Bir değişiklik oldu, bir sonraki interval'ı beklemeden yeniden üret"""
+        self.changed.set()
+    
+    def current(self):
+        """Güncel snapshot (henüz yoksa senkron üretilir)"""
+        snapshot = self.snapshot
+        if snapshot is None:
+            snapshot = self.refresh()
+        return snapshot
+    
+    def refresh(self):
+        """Yeni snapshot üret ve yayınla"""
+        with self.build_lock:
+            stats = self.collect_stats()
+            users = self.collect_users()
+            previous = self.snapshot
+            
+            # Hiçbir şey değişmediyse aynı nesne (ve aynı ETag) kullanılmaya devam eder
+            if previous is not None and previous.stats == stats and previous.users == tuple(users):
+                return previous
+            
+            self.version += 1
+            snapshot = StatsSnapshot(self.version, stats, users)
+            self.snapshot = snapshot
+        
+        if self.on_change:
+            try:
+                self.on_change(previous, snapshot)
+            except Exception as e:
+                print(f"❌ Snapshot listener error: {e}")
+        return snapshot
+    
+    def _run(self):
+        """Interval'da veya invalidate() çağrıldığında yeniden üret"""
+        while self.running:
+            self.changed.wait(self.interval)
+            self.changed.clear()
+            if not self.running:
+                break
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"❌ Error building stats snapshot: {e}")
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Time Series Module
+Dashboard grafikleri için sabit bellekli, çok çözünürlüklü metrik deposu
+"""
+
+import threading
+from array import array
+from common.config import (
+    TIMESERIES_FINE_STEP, TIMESERIES_FINE_SLOTS,
+    TIMESERIES_COARSE_STEP, TIMESERIES_COARSE_SLOTS
+)
+
+
+# Metrik tipleri:
+#   rate  -> kümülatif sayaçtan saniye başına artış, rollup = ortalama
+#   count -> kümülatif sayaçtan aralık başına artış, rollup = toplam
+#   gauge -> anlık değer, rollup = maksimum
+METRICS = {
+    'messages': 'rate',
+    'clients': 'gauge',
+    'warnings': 'count',
+    'mutes': 'count',
+    'kicks': 'count',
+    'syscalls_saved': 'rate',
+}
+
+
+class RingSeries:
+    """Sabit sayıda slot'lu, zaman hizalı dairesel dizi"""
+    
+    def __init__(self, step, slots):
+        self.step = step
+        self.slots = slots
+        self.times = array('q', [-1]) * slots
+        self.values = array('d', [0.0]) * slots
+    
+    def put(self, ts, value):
+        """ts'nin düştüğü slot'a değeri yaz"""
+        aligned = int(ts) // self.step * self.step
+        index = (aligned // self.step) % self.slots
+        self.times[index] = aligned
+        self.values[index] = value
+    
+    def points(self, start, end):
+        """[start, end] aralığındaki dolu slot'ları (ts, değer) olarak döndür"""
+        # Halkanın tuttuğundan eski slot'lara bakma; başlangıcı adıma yukarı hizala
+        start = max(int(start), int(end) - self.step * (self.slots - 1))
+        start = -(-start // self.step) * self.step
+        result = []
+        for aligned in range(start, int(end) + 1, self.step):
+            index = (aligned // self.step) % self.slots
+            if self.times[index] == aligned:
+                result.append((aligned, self.values[index]))
+        return result
+
+
+class TimeSeriesStore:
+    """
+    Her metrik için iki çözünürlük tutar:
+    1s x 600 (10 dakika) ve 1dk x 1440 (24 saat)
+    Kaba çözünürlük ince örneklerden rollup ile üretilir
+    """
+    
+    def __init__(self, metrics=METRICS, fine_step=TIMESERIES_FINE_STEP,
+                 fine_slots=TIMESERIES_FINE_SLOTS, coarse_step=TIMESERIES_COARSE_STEP,
+                 coarse_slots=TIMESERIES_COARSE_SLOTS):
+        self.metrics = dict(metrics)
+        self.fine = {name: RingSeries(fine_step, fine_slots) for name in self.metrics}
+        self.coarse = {name: RingSeries(coarse_step, coarse_slots) for name in self.metrics}
+        self.rollup_step = coarse_step
+        self.lock = threading.Lock()
+        
+        self.last_sample_time = None
+        self.last_totals = {}
+        self.last_points = {}
+        
+        # Devam eden kaba aralık için birikim {metrik: [toplam, adet, maksimum]}
+        self.bucket_start = None
+        self.bucket = {name: [0.0, 0, 0.0] for name in self.metrics}
+    
+    def sample(self, now, values):
+        """
+        Bir örnek kaydet
+        Args:
+            now: epoch saniye
+            values: {metrik: değer} - rate/count için kümülatif sayaç, gauge için anlık değer
+        """
+        with self.lock:
+            elapsed = now - self.last_sample_time if self.last_sample_time else None
+            self.last_sample_time = now
+            
+            bucket_start = int(now) // self.rollup_step * self.rollup_step
+            if self.bucket_start is not None and bucket_start != self.bucket_start:
+                self._roll_up()
+            self.bucket_start = bucket_start
+            
+            for name, kind in self.metrics.items():
+                if name not in values:
+                    continue
+                value = values[name]
+                
+                if kind == 'gauge':
+                    point = float(value)
+                else:
+                    previous = self.last_totals.get(name)
+                    self.last_totals[name] = value
+                    if previous is None or elapsed is None or value < previous:
+                        continue  # ilk örnek veya sayaç sıfırlandı
+                    delta = value - previous
+                    point = delta / elapsed if kind == 'rate' and elapsed > 0 else float(delta)
+                
+                self.fine[name].put(now, point)
+                self.last_points[name] = point
+                acc = self.bucket[name]
+                acc[0] += point
+                acc[1] += 1
+                acc[2] = max(acc[2], point)
+    
+    def latest(self, metric):
+        """Metriğin son örneklenen değeri (henüz yoksa 0)"""
+        return self.last_points.get(metric, 0.0)
+    
+    def _roll_up(self):
+        """Biten kaba aralığı ince örneklerden özetle (lock altında)"""
+        for name, kind in self.metrics.items():
+            total, count, maximum = self.bucket[name]
+            if count:
+                if kind == 'rate':
+                    value = total / count
+                elif kind == 'count':
+                    value = total
+                else:
+                    value = maximum
+                self.coarse[name].put(self.bucket_start, value)
+            self.bucket[name] = [0.0, 0, 0.0]
+    
+    def query(self, metric, range_seconds, now):
+        """
+        Son range_seconds saniyelik seriyi döndür
+        İnce seri aralığı kapsıyorsa 1s, aksi halde 1dk çözünürlük kullanılır
+        """
+        if metric not in self.metrics:
+            raise KeyError(metric)
+        
+        fine = self.fine[metric]
+        series = fine if range_seconds <= fine.step * fine.slots else self.coarse[metric]
+        
+        with self.lock:
+            points = series.points(now - range_seconds, now)
+        
+        return {
+            'metric': metric,
+            'kind': self.metrics[metric],
+            'resolution': series.step,
+            'range': range_seconds,
+            'points': [[ts, round(value, 3)] for ts, value in points]
+        }
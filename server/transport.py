@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Transport Module
+ClientHandler'ın kullandığı socket arayüzünün bellek içi karşılığı
+
+Bir MemorySocket'e yazılan byte'lar eşinin gelen kutusuna düşer. İki kullanım:
+  - Beklemeli: recv() veri gelene kadar bloklar (thread'li ClientHandler ile)
+  - Push: on_data atanmışsa veri yazan thread'de hemen callback'e verilir,
+    EOF b'' ile bildirilir (thread'siz, deterministik simülasyon için)
+"""
+
+import threading
+
+
+class MemorySocket:
+    """socket.socket'in ClientHandler'ın kullandığı alt kümesi"""
+    
+    def __init__(self):
+        self.peer = None
+        self.inbox = bytearray()
+        self.on_data = None
+        self.closed = False
+        self.peer_closed = False
+        self.condition = threading.Condition()
+    
+    def sendall(self, data):
+        """Veriyi eşe ilet"""
+        if self.closed or self.peer_closed:
+            raise BrokenPipeError("memory socket closed")
+        self.peer._deliver(bytes(data))
+    
+    def send(self, data):
+        self.sendall(data)
+        return len(data)
+    
+    def recv(self, bufsize):
+        """En fazla bufsize byte oku; eş kapandıysa ve veri kalmadıysa b''"""
+        with self.condition:
+            while not self.inbox and not self.peer_closed and not self.closed:
+                self.condition.wait()
+            if self.closed:
+                raise OSError("memory socket closed")
+            data = bytes(self.inbox[:bufsize])
+            del self.inbox[:bufsize]
+            return data
+    
+    def close(self):
+        """Kapat ve eşe EOF bildir"""
+        if self.closed:
+            return
+        self.closed = True
+        with self.condition:
+            self.condition.notify_all()
+        if self.peer:
+            self.peer._peer_closed()
+    
+    def shutdown(self, how=None):
+        self.close()
+    
+    def setblocking(self, flag):
+        pass
+    
+    def settimeout(self, value):
+        pass
+    
+    def _deliver(self, data):
+        if self.closed:
+            return
+        if self.on_data:
+            self.on_data(data)
+            return
+        with self.condition:
+            self.inbox += data
+            self.condition.notify_all()
+    
+    def _peer_closed(self):
+        if self.peer_closed:
+            return
+        self.peer_closed = True
+        if self.on_data and not self.closed:
+            self.on_data(b'')
+            return
+        with self.condition:
+            self.condition.notify_all()
+
+
+def memory_socketpair():
+    """Birbirine bağlı iki MemorySocket"""
+    a, b = MemorySocket(), MemorySocket()
+    a.peer, b.peer = b, a
+    return a, b
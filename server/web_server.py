@@ -5,56 +5,343 @@ Enhanced Web Server Module
 Modern, feature-rich dashboard with dark theme, charts, and user list
 """
 
+import gzip
+import hashlib
 import http.server
 import socketserver
 import threading
 import json
+import math
+import queue
+import time
 from datetime import datetime
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import urlparse, parse_qs
+from common.config import (
+    KEEP_ALIVE_TIMEOUT, SSE_HEARTBEAT_INTERVAL, DEBUG_ENDPOINTS_ENABLED, PROFILE_SAMPLE_HZ
+)
+from server.event_stream import EventHub, encode_event
+from server.stats_snapshot import SnapshotPublisher
+from server.profiler import SamplingProfiler, ProfilerBusy
+from server.memory_report import MemoryReporter
+
+
+def parse_range(value):
+    """'600', '10m', '24h' gibi aralıkları saniyeye çevir"""
+    units = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+    value = value.strip().lower()
+    if value and value[-1] in units:
+        seconds = int(value[:-1]) * units[value[-1]]
+    else:
+        seconds = int(value)
+    if seconds <= 0:
+        raise ValueError(value)
+    return seconds
 
 
 class WebDashboardHandler(http.server.SimpleHTTPRequestHandler):
     """HTTP request handler - web dashboard için"""
     
+    # Keep-alive: dashboard aynı bağlantı üzerinden tekrar tekrar poll eder
+    protocol_version = 'HTTP/1.1'
+    
+    # Boşta kalan keep-alive bağlantıları bu süre sonunda kapatılır
+    timeout = KEEP_ALIVE_TIMEOUT
+    
+    # Header ve body ayrı yazıldığında Nagle + delayed ACK her isteğe ~40ms ekler
+    disable_nagle_algorithm = True
+    
+    # Dashboard HTML'i ilk istekte bir kez render edilip sıkıştırılır
+    _dashboard_cache = None
+    _dashboard_lock = threading.Lock()
+    
     def do_GET(self):
         """GET request handler"""
-        if self.path == '/' or self.path == '/index.html':
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html; charset=utf-8')
-            self.end_headers()
+        parsed_url = urlparse(self.path)
+        path = parsed_url.path
+        query = parse_qs(parsed_url.query)
+        
+        if path == '/' or path == '/index.html':
+            self._send_dashboard()
+        elif path == '/api/stats':
+            # İstatistikleri JSON olarak döndür (önceden encode edilmiş snapshot)
+            snapshot = self.server.get_snapshot()
+            self._send_encoded_json(snapshot.stats_json, snapshot.stats_etag)
+        elif path == '/api/logs':
+            # Logları JSON olarak döndür
+            # ?since=<id> -> sadece yeni kayıtlar
+            # ?from=&to=&type=&user= -> zaman aralığı sorgusu (epoch ms)
+            try:
+                since = int(query['since'][0]) if 'since' in query else None
+                start_ms = int(query['from'][0]) if 'from' in query else None
+                end_ms = int(query['to'][0]) if 'to' in query else None
+            except ValueError:
+                self.send_error(400, 'Invalid log query')
+                return
             
-            html_content = self.get_dashboard_html()
-            self.wfile.write(html_content.encode('utf-8'))
-        elif self.path == '/api/stats':
-            # İstatistikleri JSON olarak döndür
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json; charset=utf-8')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
+            log_type = query.get('type', [None])[0]
+            user = query.get('user', [None])[0]
             
-            stats = self.server.get_stats()
-            self.wfile.write(json.dumps(stats).encode('utf-8'))
-        elif self.path == '/api/logs':
-            # Logları JSON olarak döndür
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json; charset=utf-8')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
+            if start_ms is not None or end_ms is not None or log_type or user:
+                logs = self.server.query_logs(start_ms, end_ms, log_type, user)
+            else:
+                logs = self.server.get_logs(since)
+            self._send_json(logs)
+        elif path == '/api/search':
+            # Chat geçmişinde tam metin arama (?q=&page=&per_page=)
+            q = query.get('q', [''])[0].strip()
+            try:
+                page = int(query.get('page', ['1'])[0])
+                per_page = int(query.get('per_page', ['20'])[0])
+            except ValueError:
+                self.send_error(400, 'Invalid page parameters')
+                return
+            if page < 1 or not 1 <= per_page <= 100:
+                self.send_error(400, 'page must be >= 1 and per_page between 1 and 100')
+                return
+            
+            if not q:
+                self.send_error(400, 'Missing query parameter q')
+                return
             
-            logs = self.server.get_logs()
-            self.wfile.write(json.dumps(logs).encode('utf-8'))
-        elif self.path == '/api/users':
-            # Kullanıcı listesini JSON olarak döndür
+            results = self.server.search(q, page, per_page)
+            self._send_json(results)
+        elif path == '/api/users':
+            # Kullanıcı listesini JSON olarak döndür (önceden encode edilmiş snapshot)
+            snapshot = self.server.get_snapshot()
+            self._send_encoded_json(snapshot.users_json, snapshot.users_etag)
+        elif path == '/api/timeseries':
+            # Grafik geçmişi (?metric=messages&range=600 | 10m | 24h)
+            metric = query.get('metric', ['messages'])[0]
+            try:
+                range_seconds = parse_range(query.get('range', ['600'])[0])
+                series = self.server.get_timeseries(metric, range_seconds)
+            except ValueError:
+                self.send_error(400, 'Invalid range')
+                return
+            except KeyError:
+                self.send_error(404, f"Unknown metric '{metric}'")
+                return
+            
+            self._send_json(series)
+        elif path == '/api/latency':
+            # Mesaj yolu aşamalarının p50/p95/p99/max gecikmeleri
+            self._send_json(self.server.get_latency())
+        elif path == '/metrics':
+            # Prometheus text exposition formatı
+            body = self.server.get_metrics().encode('utf-8')
+            self._send_body(body, 'text/plain; version=0.0.4; charset=utf-8')
+        elif path.startswith('/debug/') and DEBUG_ENDPOINTS_ENABLED:
+            self._handle_debug(path, query)
+        elif path == '/api/events':
+            # Server-Sent Events: stats delta, presence ve yeni loglar push edilir
+            self._stream_events()
+        else:
+            self.send_error(404)
+    
+    def _handle_debug(self, path, query):
+        """Çalışan server için teşhis endpoint'leri"""
+        if path == '/debug/profile':
+            try:
+                seconds = float(query.get('seconds', ['5'])[0])
+                hz = int(query.get('hz', [str(PROFILE_SAMPLE_HZ)])[0])
+                if not math.isfinite(seconds) or seconds <= 0 or not 1 <= hz <= 1000:
+                    raise ValueError
+            except ValueError:
+                self.send_error(400, 'Invalid seconds or hz')
+                return
+            
+            try:
+                result = self.server.web_server.profiler.profile(seconds, hz)
+            except ProfilerBusy:
+                self.send_error(409, 'A profile is already running')
+                return
+            
+            # format=collapsed: doğrudan flamegraph.pl'e verilebilir
+            if query.get('format', ['json'])[0] == 'collapsed':
+                body = ('\n'.join(result['collapsed']) + '\n').encode('utf-8')
+                self._send_body(body, 'text/plain; charset=utf-8')
+            else:
+                self._send_json(result)
+        elif path == '/debug/memory':
+            memory = self.server.web_server.memory
+            
+            # ?tracemalloc=on|off izlemeyi açar/kapatır, ?baseline=reset diff'i sıfırlar
+            tracing = query.get('tracemalloc', [''])[0]
+            if tracing == 'on':
+                memory.start_tracing()
+            elif tracing == 'off':
+                memory.stop_tracing()
+            if query.get('baseline', [''])[0] == 'reset':
+                memory.reset_baseline()
+            
+            try:
+                top = int(query.get('top', ['20'])[0])
+            except ValueError:
+                top = 20
+            self._send_json(memory.report(top))
+        else:
+            self.send_error(404)
+    
+    def _stream_events(self):
+        """SSE bağlantısını açık tut ve hub'dan gelen olayları yaz"""
+        web_server = self.server.web_server
+        # Snapshot'tan önce abone ol ki arada olay kaçmasın
+        subscriber = web_server.events.subscribe()
+        self.close_connection = True
+        
+        try:
             self.send_response(200)
-            self.send_header('Content-type', 'application/json; charset=utf-8')
+            self.send_header('Content-type', 'text/event-stream; charset=utf-8')
+            self.send_header('Cache-Control', 'no-cache')
             self.send_header('Access-Control-Allow-Origin', '*')
             self.end_headers()
             
-            users = self.server.get_users()
-            self.wfile.write(json.dumps(users).encode('utf-8'))
-        else:
-            self.send_error(404)
+            # Yeniden bağlanan tarayıcı Last-Event-ID ile kaçırdığı logları alır
+            last_event_id = self.headers.get('Last-Event-ID', '')
+            since = int(last_event_id) if last_event_id.isdigit() else None
+            self.wfile.write(web_server.initial_events(since))
+            
+            while web_server.running:
+                try:
+                    payload = subscriber.get(timeout=SSE_HEARTBEAT_INTERVAL)
+                except queue.Empty:
+                    # Kopan bağlantıları fark etmek için yorum satırı
+                    payload = b': ping\n\n'
+                
+                if payload is None:
+                    break
+                self.wfile.write(payload)
+        except OSError:
+            pass
+        finally:
+            web_server.events.unsubscribe(subscriber)
+    
+    def _send_dashboard(self):
+        """Önceden render edilmiş ve gzip'lenmiş dashboard'u gönder"""
+        cache = self._get_dashboard_cache()
+        
+        # Her temsilin kendi validator'ı olur (RFC 9110 8.8.3)
+        use_gzip = self._accepts_gzip()
+        etag = cache['gzip_etag'] if use_gzip else cache['etag']
+        
+        # If-None-Match öncelikli, yoksa If-Modified-Since
+        if self._is_not_modified(etag, cache['mtime']):
+            self._send_not_modified(etag, cache['last_modified'], vary='Accept-Encoding')
+            return
+        
+        headers = {
+            'ETag': etag,
+            'Last-Modified': cache['last_modified'],
+            'Cache-Control': 'no-cache',
+            'Vary': 'Accept-Encoding'
+        }
+        if use_gzip:
+            headers['Content-Encoding'] = 'gzip'
+        self._send_body(cache['gzip_body'] if use_gzip else cache['body'],
+                        'text/html; charset=utf-8', headers)
+    
+    @classmethod
+    def _get_dashboard_cache(cls):
+        """Dashboard HTML'ini ilk kullanımda bir kez render et"""
+        if cls._dashboard_cache is None:
+            with cls._dashboard_lock:
+                if cls._dashboard_cache is None:
+                    body = cls.get_dashboard_html().encode('utf-8')
+                    mtime = int(time.time())
+                    digest = hashlib.sha1(body).hexdigest()[:20]
+                    cls._dashboard_cache = {
+                        'body': body,
+                        'gzip_body': gzip.compress(body, compresslevel=9),
+                        'etag': f'"{digest}"',
+                        'gzip_etag': f'"{digest}-gz"',
+                        'mtime': mtime,
+                        'last_modified': formatdate(mtime, usegmt=True)
+                    }
+        return cls._dashboard_cache
+    
+    def _is_not_modified(self, etag, mtime=None):
+        """Conditional GET: client'taki kopya hâlâ geçerli mi"""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            return '*' in tags or etag in tags or f"W/{etag}" in tags
+        
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since and mtime is not None:
+            try:
+                return mtime <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+    
+    def _accepts_gzip(self):
+        """Accept-Encoding gzip'i (veya *) sıfırdan büyük q ile kabul ediyor mu"""
+        weights = {}
+        for item in self.headers.get('Accept-Encoding', '').split(','):
+            coding, _, params = item.partition(';')
+            coding = coding.strip().lower()
+            if not coding:
+                continue
+            weight = 1.0
+            for param in params.split(';'):
+                name, _, value = param.partition('=')
+                if name.strip().lower() == 'q':
+                    try:
+                        weight = float(value)
+                    except ValueError:
+                        weight = 0.0
+            weights[coding] = weight
+        
+        weight = weights.get('gzip', weights.get('x-gzip', weights.get('*', 0.0)))
+        return weight > 0
+    
+    def _send_not_modified(self, etag, last_modified=None, vary=None):
+        """304 Not Modified - body gönderilmez"""
+        self.send_response(304)
+        self.send_header('ETag', etag)
+        if last_modified:
+            self.send_header('Last-Modified', last_modified)
+        if vary:
+            self.send_header('Vary', vary)
+        self.end_headers()
+    
+    def _send_json(self, data):
+        """
+        JSON response gönder
+        Body değişmediyse ETag ile 304 döner, değişmeyen poll'lar neredeyse bedava
+        """
+        body = json.dumps(data).encode('utf-8')
+        etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        self._send_encoded_json(body, etag)
     
-    def get_dashboard_html(self):
+    def _send_encoded_json(self, body, etag):
+        """Hazır JSON body'sini ETag kontrolüyle gönder"""
+        if self._is_not_modified(etag):
+            self._send_not_modified(etag)
+            return
+        
+        self._send_body(body, 'application/json; charset=utf-8', {
+            'Access-Control-Allow-Origin': '*',
+            'ETag': etag,
+            'Cache-Control': 'no-cache'
+        })
+    
+    def _send_body(self, body, content_type, headers=None):
+        """
+        Response gönder
+        HTTP/1.1 keep-alive için Content-Length her zaman gönderilmeli
+        """
+        self.send_response(200)
+        self.send_header('Content-type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    @staticmethod
+    def get_dashboard_html():
         """Web dashboard HTML'ini oluştur - Modern Enhanced Version"""
         return """
 <!DOCTYPE html>
@@ -485,6 +772,35 @@ class WebDashboardHandler(http.server.SimpleHTTPRequestHandler):
             padding: 40px;
             color: var(--text-secondary);
         }
+        
+        .latency-card {
+            margin-top: 30px;
+        }
+        
+        .latency-table {
+            width: 100%;
+            border-collapse: collapse;
+            font-family: 'Courier New', monospace;
+            font-size: 14px;
+        }
+        
+        .latency-table th,
+        .latency-table td {
+            padding: 10px 12px;
+            text-align: right;
+            border-bottom: 1px solid var(--border-color);
+        }
+        
+        .latency-table th {
+            color: var(--text-secondary);
+            font-weight: normal;
+        }
+        
+        .latency-table th:first-child,
+        .latency-table td:first-child {
+            text-align: left;
+            color: var(--accent-primary);
+        }
     </style>
 </head>
 <body>
@@ -532,6 +848,11 @@ class WebDashboardHandler(http.server.SimpleHTTPRequestHandler):
                 <div class="stat-value" id="kicks">0</div>
                 <div class="stat-label">Kicks</div>
             </div>
+            <div class="stat-card">
+                <div class="stat-icon">📦</div>
+                <div class="stat-value" id="syscalls-saved">0</div>
+                <div class="stat-label">Syscalls Saved/s</div>
+            </div>
         </div>
         
         <div class="content-grid">
@@ -572,18 +893,40 @@ class WebDashboardHandler(http.server.SimpleHTTPRequestHandler):
             </div>
         </div>
         
+        <div class="card latency-card">
+            <div class="card-header">
+                <h2 class="card-title">⏱️ Message Latency</h2>
+                <span style="color: var(--text-secondary);">ms</span>
+            </div>
+            
+            <table class="latency-table">
+                <thead>
+                    <tr><th>Stage</th><th>Count</th><th>p50</th><th>p95</th><th>p99</th><th>Max</th></tr>
+                </thead>
+                <tbody id="latency-rows">
+                    <tr><td colspan="6" class="no-data">⏳ Loading latency...</td></tr>
+                </tbody>
+            </table>
+        </div>
+        
         <div class="footer">
             <p>💻 Chat Server Dashboard v2.0 | Enhanced Edition</p>
-            <p>Auto-refresh: Every 3 seconds | Made with ❤️</p>
+            <p>Live updates via Server-Sent Events (3s polling fallback) | Made with ❤️</p>
         </div>
     </div>
     
     <script>
         let allLogs = [];
+        let currentStats = {};
+        let lastLogId = null;
+        const maxLogEntries = 50;
+        const logPageSize = 50;  // /api/logs?since= sayfası (server'daki count)
         let currentFilter = 'ALL';
         let messageChart = null;
         let messageHistory = [];
-        const maxHistoryPoints = 20;
+        const maxHistoryPoints = 200;
+        let lastMessageTotal = null;
+        let lastChartTime = null;
         const startTime = Date.now();
         
         // Chart.js initialization
@@ -594,12 +937,13 @@ class WebDashboardHandler(http.server.SimpleHTTPRequestHandler):
                 data: {
                     labels: [],
                     datasets: [{
-                        label: 'Messages per Interval',
+                        label: 'Messages / sec',
                         data: [],
                         borderColor: 'rgb(0, 217, 255)',
                         backgroundColor: 'rgba(0, 217, 255, 0.1)',
                         borderWidth: 2,
                         tension: 0.4,
+                        pointRadius: 0,
                         fill: true
                     }]
                 },
@@ -636,14 +980,9 @@ class WebDashboardHandler(http.server.SimpleHTTPRequestHandler):
             });
         }
         
-        function updateChart(messageCount) {
-            const now = new Date();
-            const timeLabel = now.toLocaleTimeString();
-            
-            messageHistory.push({ time: timeLabel, count: messageCount });
-            
+        function renderChart() {
             if (messageHistory.length > maxHistoryPoints) {
-                messageHistory.shift();
+                messageHistory = messageHistory.slice(-maxHistoryPoints);
             }
             
             messageChart.data.labels = messageHistory.map(h => h.time);
@@ -651,6 +990,39 @@ class WebDashboardHandler(http.server.SimpleHTTPRequestHandler):
             messageChart.update();
         }
         
+        // Sayfa açılınca server'daki geçmişle grafiği doldur
+        async function loadChartHistory() {
+            try {
+                const response = await fetch('/api/timeseries?metric=messages&range=600');
+                const series = await response.json();
+                
+                messageHistory = series.points.map(([ts, value]) => ({
+                    time: new Date(ts * 1000).toLocaleTimeString(),
+                    count: value
+                }));
+                renderChart();
+            } catch (error) {
+                console.error('Timeseries fetch error:', error);
+            }
+        }
+        
+        function updateChart(messageTotal) {
+            const now = Date.now();
+            
+            // Kümülatif sayaçtan saniye başına mesaj hesapla
+            if (lastMessageTotal !== null && now > lastChartTime) {
+                const rate = Math.max(messageTotal - lastMessageTotal, 0) / ((now - lastChartTime) / 1000);
+                messageHistory.push({
+                    time: new Date(now).toLocaleTimeString(),
+                    count: Math.round(rate * 100) / 100
+                });
+                renderChart();
+            }
+            
+            lastMessageTotal = messageTotal;
+            lastChartTime = now;
+        }
+        
         function updateUptime() {
             const elapsed = Math.floor((Date.now() - startTime) / 1000);
             const hours = Math.floor(elapsed / 3600);
@@ -664,16 +1036,9 @@ class WebDashboardHandler(http.server.SimpleHTTPRequestHandler):
         async function updateStats() {
             try {
                 const response = await fetch('/api/stats');
-                const stats = await response.json();
+                currentStats = await response.json();
                 
-                document.getElementById('connected-clients').textContent = stats.connected_clients || 0;
-                document.getElementById('total-messages').textContent = stats.total_messages || 0;
-                document.getElementById('total-connections').textContent = stats.total_connections || 0;
-                document.getElementById('warnings').textContent = stats.warnings || 0;
-                document.getElementById('mutes').textContent = stats.mutes || 0;
-                document.getElementById('kicks').textContent = stats.kicks || 0;
-                
-                updateChart(stats.total_messages || 0);
+                applyStats(currentStats);
             } catch (error) {
                 console.error('Stats fetch error:', error);
             }
@@ -682,39 +1047,50 @@ class WebDashboardHandler(http.server.SimpleHTTPRequestHandler):
         async function updateUsers() {
             try {
                 const response = await fetch('/api/users');
-                const users = await response.json();
-                
-                const usersList = document.getElementById('users-list');
-                const userCount = document.getElementById('user-count');
-                
-                userCount.textContent = users.length;
-                
-                if (users.length === 0) {
-                    usersList.innerHTML = '<div class="no-data">👤 No users online</div>';
-                    return;
-                }
-                
-                usersList.innerHTML = users.map(user => `
-                    <div class="user-item">
-                        <div class="user-avatar">${user.charAt(0).toUpperCase()}</div>
-                        <div class="user-info">
-                            <div class="user-name">${user}</div>
-                            <div class="user-status">🟢 Online</div>
-                        </div>
-                    </div>
-                `).join('');
+                renderUsers(await response.json());
             } catch (error) {
                 console.error('Users fetch error:', error);
             }
         }
         
+        function renderUsers(users) {
+            const usersList = document.getElementById('users-list');
+            const userCount = document.getElementById('user-count');
+            
+            userCount.textContent = users.length;
+            
+            if (users.length === 0) {
+                usersList.innerHTML = '<div class="no-data">👤 No users online</div>';
+                return;
+            }
+            
+            usersList.innerHTML = users.map(user => `
+                <div class="user-item">
+                    <div class="user-avatar">${user.charAt(0).toUpperCase()}</div>
+                    <div class="user-info">
+                        <div class="user-name">${user}</div>
+                        <div class="user-status">🟢 Online</div>
+                    </div>
+                </div>
+            `).join('');
+        }
+        
         async function refreshLogs() {
             try {
-                const response = await fetch('/api/logs');
-                const logs = await response.json();
-                
-                allLogs = logs;
-                displayLogs();
+                // Cursor'dan sonra bir sayfadan fazla kayıt varsa kalanlar da alınır
+                let logs;
+                do {
+                    const url = lastLogId === null ? '/api/logs' : `/api/logs?since=${lastLogId}`;
+                    const response = await fetch(url);
+                    logs = await response.json();
+                    
+                    // since'ten küçük id dönmesi server'ın yeniden başladığı anlamına gelir
+                    const reset = lastLogId !== null && logs.length > 0 && logs[0].id <= lastLogId;
+                    appendLogs(logs, reset);
+                    if (reset) {
+                        break;
+                    }
+                } while (logs.length >= logPageSize);
             } catch (error) {
                 console.error('Logs fetch error:', error);
             }
@@ -744,7 +1120,7 @@ class WebDashboardHandler(http.server.SimpleHTTPRequestHandler):
                 return;
             }
             
-            logsContainer.innerHTML = filteredLogs.reverse().map(log => `
+            logsContainer.innerHTML = filteredLogs.slice().reverse().map(log => `
                 <div class="log-entry ${log.type.toLowerCase()}">
                     <span class="timestamp">[${log.timestamp}]</span>
                     <span class="log-type">${log.type}</span>
@@ -771,17 +1147,113 @@ class WebDashboardHandler(http.server.SimpleHTTPRequestHandler):
             displayLogs();
         }
         
-        // Initialize
-        initChart();
-        updateStats();
-        updateUsers();
-        refreshLogs();
+        async function updateLatency() {
+            try {
+                const response = await fetch('/api/latency');
+                const latency = await response.json();
+                
+                document.getElementById('latency-rows').innerHTML = latency.stages.map(s => `
+                    <tr>
+                        <td>${s.stage}</td>
+                        <td>${s.count}</td>
+                        <td>${s.p50.toFixed(3)}</td>
+                        <td>${s.p95.toFixed(3)}</td>
+                        <td>${s.p99.toFixed(3)}</td>
+                        <td>${s.max.toFixed(3)}</td>
+                    </tr>
+                `).join('');
+            } catch (error) {
+                console.error('Latency fetch error:', error);
+            }
+        }
         
-        // Auto-refresh
-        setInterval(() => {
+        function applyStats(stats) {
+            document.getElementById('connected-clients').textContent = stats.connected_clients || 0;
+            document.getElementById('total-messages').textContent = stats.total_messages || 0;
+            document.getElementById('total-connections').textContent = stats.total_connections || 0;
+            document.getElementById('warnings').textContent = stats.warnings || 0;
+            document.getElementById('mutes').textContent = stats.mutes || 0;
+            document.getElementById('kicks').textContent = stats.kicks || 0;
+            document.getElementById('syscalls-saved').textContent = stats.syscalls_saved_per_sec || 0;
+        }
+        
+        function appendLogs(logs, reset) {
+            // reset: server yeniden başladı, id'ler baştan başlıyor
+            if (reset) {
+                allLogs = [];
+                lastLogId = null;
+            }
+            
+            logs = logs.filter(log => lastLogId === null || log.id > lastLogId);
+            if (logs.length > 0) {
+                allLogs = allLogs.concat(logs).slice(-maxLogEntries);
+                lastLogId = logs[logs.length - 1].id;
+            }
+            
+            if (reset || logs.length > 0) {
+                displayLogs();
+            }
+        }
+        
+        // Polling (SSE desteklenmiyorsa veya bağlantı koptuysa)
+        let pollTimer = null;
+        
+        function pollAll() {
             updateStats();
             updateUsers();
             refreshLogs();
+        }
+        
+        function startPolling() {
+            if (pollTimer === null) {
+                pollAll();
+                pollTimer = setInterval(pollAll, 3000);
+            }
+        }
+        
+        function stopPolling() {
+            if (pollTimer !== null) {
+                clearInterval(pollTimer);
+                pollTimer = null;
+            }
+        }
+        
+        // Server-Sent Events: değişiklikler geldikçe push edilir
+        function connectEvents() {
+            if (!window.EventSource) {
+                startPolling();
+                return;
+            }
+            
+            const events = new EventSource('/api/events');
+            
+            events.onopen = () => stopPolling();
+            events.onerror = () => startPolling();
+            
+            events.addEventListener('stats', (e) => {
+                Object.assign(currentStats, JSON.parse(e.data));
+                applyStats(currentStats);
+            });
+            events.addEventListener('users', (e) => renderUsers(JSON.parse(e.data)));
+            events.addEventListener('logs', (e) => {
+                const batch = JSON.parse(e.data);
+                appendLogs(batch.records, batch.reset);
+            });
+            events.addEventListener('log', (e) => appendLogs([JSON.parse(e.data)], false));
+        }
+        
+        // Initialize
+        initChart();
+        loadChartHistory();
+        connectEvents();
+        updateLatency();
+        
+        // Gecikme histogramları SSE ile gönderilmez, ETag'li poll yeterli
+        setInterval(updateLatency, 5000);
+        
+        // Chart bilinen son değerle düzenli aralıklarla güncellenir
+        setInterval(() => {
+            updateChart(currentStats.total_messages || 0);
             updateUptime();
         }, 3000);
         
@@ -791,7 +1263,7 @@ class WebDashboardHandler(http.server.SimpleHTTPRequestHandler):
 </body>
 </html>
 """
-    
+
     def log_message(self, format, *args):
         """Log mesajlarını sustur (console'u temiz tut)"""
         pass
@@ -800,24 +1272,44 @@ class WebDashboardHandler(http.server.SimpleHTTPRequestHandler):
 class WebServer:
     """Web server yöneticisi"""
     
-    def __init__(self, host='127.0.0.1', port=8080, chat_server=None):
+    def __init__(self, host='127.0.0.1', port=8080, chat_server=None, threaded=True):
         self.host = host
         self.port = port
         self.chat_server = chat_server
+        self.threaded = threaded
         self.server = None
         self.thread = None
         self.running = False
+        
+        # SSE yayınları
+        self.events = EventHub()
+        
+        # /debug/profile - sadece istek süresince örnekler
+        self.profiler = SamplingProfiler(chat_server.thread_labels if chat_server else None)
+        
+        # /debug/memory - tracemalloc diff'leri ve alt sistem boyutları
+        self.memory = MemoryReporter(chat_server, self)
+        
+        # Tüm okuyucuların paylaştığı stats/users snapshot'ı
+        self.snapshots = SnapshotPublisher(self.collect_stats, self.collect_users,
+                                           on_change=self._on_snapshot_change)
+        if chat_server:
+            chat_server.logger.add_listener(self._on_log_record)
+            chat_server.metrics.gauge('chat_sse_subscribers', 'Connected dashboard event streams',
+                                      function=lambda: len(self.events.subscribers))
+            chat_server.metrics.gauge('chat_sse_queue_depth', 'Events waiting in dashboard queues',
+                                      function=self.events.pending)
     
     def start(self):
         """Web server'ı başlat"""
         try:
-            # Custom TCPServer oluştur
-            self.server = CustomTCPServer(
+            # Custom TCPServer oluştur (varsayılan: her bağlantı ayrı thread'de)
+            server_class = ThreadingDashboardServer if self.threaded else CustomTCPServer
+            self.server = server_class(
                 (self.host, self.port),
                 WebDashboardHandler,
                 self
             )
-            self.server.allow_reuse_address = True
             self.running = True
             
             print(f"🌐 HTTP Server listening on http://{self.host}:{self.port}")
@@ -826,6 +1318,9 @@ class WebServer:
             self.thread = threading.Thread(target=self._run_server, daemon=True)
             self.thread.start()
             
+            # Snapshot'ları üret, değişiklikleri SSE abonelerine yayınla
+            self.snapshots.start()
+        
         except Exception as e:
             print(f"❌ Failed to start web server: {e}")
     
@@ -842,12 +1337,82 @@ class WebServer:
     def stop(self):
         """Web server'ı durdur"""
         self.running = False
+        self.snapshots.stop()
+        self.events.close_all()
         if self.server:
             self.server.shutdown()
             self.server.server_close()
     
+    def _on_snapshot_change(self, previous, snapshot):
+        """Yeni snapshot üretildi - değişen kısmı bir kez hesapla ve yayınla"""
+        if not self.events.has_subscribers():
+            return
+        
+        previous_stats = previous.stats if previous else {}
+        delta = {key: value for key, value in snapshot.stats.items()
+                 if previous_stats.get(key) != value}
+        if delta:
+            self.events.publish('stats', delta)
+        
+        if previous is None or previous.users != snapshot.users:
+            self.events.publish('users', list(snapshot.users))
+    
+    def publish_users(self):
+        """
+        Presence değişti - interval'ı beklemeden yeni snapshot üret
+        'users' olayı snapshot yayınlanırken liste değiştiyse gönderilir
+        """
+        self.snapshots.invalidate()
+    
+    def _on_log_record(self, record):
+        """Logger listener'ı - yeni kaydı SSE abonelerine gönder"""
+        self.events.publish('log', record, event_id=record['id'])
+    
+    def initial_events(self, since=None):
+        """Yeni bağlanan dashboard için tam durum"""
+        # Yeniden bağlanan dashboard kaçırdığı kayıtların hepsini alır (halka kadar)
+        records = self.get_logs(since, count=None if since is not None else 50)
+        # Cursor karşılanamadıysa (server yeniden başladı) dashboard listeyi sıfırlar
+        reset = since is None or bool(records and records[0]['id'] <= since)
+        last_id = records[-1]['id'] if records else since
+        
+        return b''.join([
+            encode_event('stats', self.get_stats()),
+            encode_event('users', self.get_users()),
+            encode_event('logs', {'reset': reset, 'records': records}, event_id=last_id)
+        ])
+    
     def get_stats(self):
-        """Chat server'dan istatistikleri al"""
+        """Güncel snapshot'taki istatistikler"""
+        return self.snapshots.current().stats
+    
+    def get_users(self):
+        """Güncel snapshot'taki kullanıcı listesi"""
+        return list(self.snapshots.current().users)
+    
+    def get_timeseries(self, metric, range_seconds):
+        """Time-series deposundan metrik geçmişini al"""
+        if not self.chat_server:
+            return {'metric': metric, 'range': range_seconds, 'points': []}
+        
+        return self.chat_server.timeseries.query(metric, range_seconds, self.chat_server.clock.time())
+    
+    def get_latency(self):
+        """Mesaj yolu gecikme özetini al"""
+        if not self.chat_server:
+            return {'unit': 'ms', 'stages': []}
+        
+        return self.chat_server.latency.summary()
+    
+    def get_metrics(self):
+        """Prometheus formatında metrikler"""
+        if not self.chat_server:
+            return ''
+        
+        return self.chat_server.metrics.render()
+    
+    def collect_stats(self):
+        """Chat server'dan istatistikleri al (snapshot üretimi için)"""
         if not self.chat_server:
             return {
                 'connected_clients': 0,
@@ -855,7 +1420,8 @@ class WebServer:
                 'total_connections': 0,
                 'warnings': 0,
                 'mutes': 0,
-                'kicks': 0
+                'kicks': 0,
+                'syscalls_saved_per_sec': 0
             }
         
         with self.chat_server.clients_lock:
@@ -869,11 +1435,12 @@ class WebServer:
             'total_connections': self.chat_server.total_connections,
             'warnings': rate_stats['total_warnings'],
             'mutes': rate_stats['total_mutes'],
-            'kicks': rate_stats['total_kicks']
+            'kicks': rate_stats['total_kicks'],
+            'syscalls_saved_per_sec': round(self.chat_server.timeseries.latest('syscalls_saved'), 1)
         }
     
-    def get_users(self):
-        """Aktif kullanıcı listesini al"""
+    def collect_users(self):
+        """Aktif kullanıcı listesini al (snapshot üretimi için)"""
         if not self.chat_server:
             return []
         
@@ -882,57 +1449,34 @@ class WebServer:
         
         return users
     
-    def get_logs(self):
-        """Log dosyasından son 50 satırı oku"""
+    def get_logs(self, since=None, count=50):
+        """Logger'ın bellekteki halkasından kayıtları al (since verilirse cursor'dan sonraki en eski count)"""
         if not self.chat_server:
             return []
         
-        logs = []
-        try:
-            with open(self.chat_server.logger.log_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                
-                # Son 50 satırı al
-                recent_lines = lines[-50:] if len(lines) > 50 else lines
-                
-                for line in recent_lines:
-                    line = line.strip()
-                    if not line or '=' in line:
-                        continue
-                    
-                    # Parse log line
-                    # Format: [2025-11-19 14:30:45] TYPE | message
-                    if '[' in line and ']' in line:
-                        try:
-                            # Timestamp'i çıkar
-                            timestamp_end = line.index(']')
-                            timestamp = line[1:timestamp_end].split()[1]  # Sadece saat kısmı
-                            
-                            # Type ve message'ı çıkar
-                            rest = line[timestamp_end+1:].strip()
-                            if '|' in rest:
-                                parts = rest.split('|', 1)
-                                log_type = parts[0].strip()
-                                message = parts[1].strip() if len(parts) > 1 else ''
-                                
-                                logs.append({
-                                    'timestamp': timestamp,
-                                    'type': log_type,
-                                    'message': message
-                                })
-                        except:
-                            continue
-        except FileNotFoundError:
-            pass
-        except Exception as e:
-            print(f"❌ Error reading logs: {e}")
+        return self.chat_server.logger.get_recent_records(since=since, count=count)
+    
+    def query_logs(self, start_ms=None, end_ms=None, log_type=None, user=None):
+        """Zaman aralığı / tip / kullanıcı filtresiyle log sorgula"""
+        if not self.chat_server:
+            return []
+        
+        return self.chat_server.logger.query_logs(start_ms, end_ms, log_type, user)
+    
+    def search(self, query, page=1, per_page=20):
+        """Chat geçmişinde arama yap"""
+        if not self.chat_server:
+            return {'query': query, 'total': 0, 'page': page, 'per_page': per_page, 'results': []}
         
-        return logs
+        return self.chat_server.search_index.search(query, page, per_page)
 
 
 class CustomTCPServer(socketserver.TCPServer):
     """Custom TCPServer - web_server referansını tutar"""
     
+    # bind'dan önce ayarlanmalı, bu yüzden class attribute
+    allow_reuse_address = True
+    
     def __init__(self, server_address, RequestHandlerClass, web_server):
         self.web_server = web_server
         super().__init__(server_address, RequestHandlerClass)
@@ -941,11 +1485,45 @@ class CustomTCPServer(socketserver.TCPServer):
         """İstatistikleri döndür"""
         return self.web_server.get_stats()
     
+    def get_timeseries(self, metric, range_seconds):
+        """Metrik geçmişini döndür"""
+        return self.web_server.get_timeseries(metric, range_seconds)
+    
+    def get_latency(self):
+        """Gecikme özetini döndür"""
+        return self.web_server.get_latency()
+    
+    def get_metrics(self):
+        """Prometheus metriklerini döndür"""
+        return self.web_server.get_metrics()
+    
+    def get_snapshot(self):
+        """Güncel stats/users snapshot'ını döndür"""
+        return self.web_server.snapshots.current()
+    
     def get_users(self):
         """Kullanıcı listesini döndür"""
         return self.web_server.get_users()
     
-    def get_logs(self):
+    def get_logs(self, since=None):
         """Logları döndür"""
-        return self.web_server.get_logs()
+        return self.web_server.get_logs(since)
+    
+    def query_logs(self, start_ms=None, end_ms=None, log_type=None, user=None):
+        """Filtreli log sorgusu döndür"""
+        return self.web_server.query_logs(start_ms, end_ms, log_type, user)
+    
+    def search(self, query, page=1, per_page=20):
+        """Arama sonuçlarını döndür"""
+        return self.web_server.search(query, page, per_page)
+
+
+
+class ThreadingDashboardServer(socketserver.ThreadingMixIn, CustomTCPServer):
+    """
+    Her bağlantıyı ayrı thread'de işleyen dashboard server'ı
+    Keep-alive bağlantıları birbirini bekletmez
+    """
     
+    daemon_threads = True
+    request_queue_size = 64
\ No newline at end of file
@@ -0,0 +1,699 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WebSocket Gateway Module
+Tarayıcı client'larını ChatServer'a bağlayan, sadece stdlib ile yazılmış RFC 6455 server'ı
+Tüm bağlantıların I/O'su tek bir selector thread'inde non-blocking olarak yapılır;
+decode edilen mesajlar conn_id'ye göre shard'lanmış worker thread'lerinde işlenir
+"""
+
+import base64
+import hashlib
+import json
+import queue
+import selectors
+import socket
+import struct
+import threading
+import time
+from common.protocol import Message
+from common.config import (
+    WS_MAX_MESSAGE_SIZE, WS_MAX_BUFFERED, WS_PING_INTERVAL, WS_HANDSHAKE_TIMEOUT,
+    WS_WORKERS, WS_MAX_PENDING_MESSAGES, WRITE_COALESCE_MAX_BYTES, WRITE_COALESCE_MAX_FRAMES
+)
+from server.client_handler import ClientHandler
+from server.output_buffer import LaneQueue, LANE_CONTROL, LANE_BULK
+
+
+WS_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+CLOSE_NORMAL = 1000
+CLOSE_PROTOCOL_ERROR = 1002
+CLOSE_UNSUPPORTED = 1003
+CLOSE_INVALID_DATA = 1007
+CLOSE_TOO_BIG = 1009
+CLOSE_TRY_AGAIN = 1013
+
+MAX_HANDSHAKE_SIZE = 8192
+
+
+class WebSocketError(Exception):
+    """Bağlantının verilen close koduyla kapatılması gereken protokol hatası"""
+    
+    def __init__(self, code, reason=''):
+        super().__init__(reason)
+        self.code = code
+        self.reason = reason
+
+
+def accept_key(key):
+    """Sec-WebSocket-Key'den Sec-WebSocket-Accept üret"""
+    digest = hashlib.sha1((key + WS_GUID).encode('ascii')).digest()
+    return base64.b64encode(digest).decode('ascii')
+
+
+def encode_frame(opcode, payload):
+    """Server -> client frame'i (FIN=1, maskesiz)"""
+    length = len(payload)
+    if length < 126:
+        header = struct.pack('!BB', 0x80 | opcode, length)
+    elif length < 65536:
+        header = struct.pack('!BBH', 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack('!BBQ', 0x80 | opcode, 127, length)
+    return header + payload
+
+
+def valid_close_code(code):
+    """
+    Close frame'inde gönderilebilir durum kodu mu (RFC 6455 7.4)
+    1004-1006 ve 1015 sadece yerel anlam taşır, kablodan gelemez
+    """
+    return (1000 <= code <= 1014 and code not in (1004, 1005, 1006)) or 3000 <= code <= 4999
+
+
+def apply_mask(mask, data):
+    """Client payload'unu maskeden çıkar (tek büyük tamsayı XOR'u ile)"""
+    length = len(data)
+    if not length:
+        return b''
+    key = (mask * (length // 4 + 1))[:length]
+    value = int.from_bytes(data, 'little') ^ int.from_bytes(key, 'little')
+    return value.to_bytes(length, 'little')
+
+
+def parse_frame(buffer):
+    """
+    Buffer'ın başındaki frame'i çöz
+    Returns:
+        (fin, opcode, payload, tüketilen_byte) veya frame henüz tamamlanmadıysa None
+    Raises:
+        WebSocketError: protokol ihlali
+    """
+    if len(buffer) < 2:
+        return None
+    
+    first, second = buffer[0], buffer[1]
+    if first & 0x70:
+        raise WebSocketError(CLOSE_PROTOCOL_ERROR, 'Reserved bits set')
+    if not second & 0x80:
+        raise WebSocketError(CLOSE_PROTOCOL_ERROR, 'Client frames must be masked')
+    
+    fin = bool(first & 0x80)
+    opcode = first & 0x0F
+    length = second & 0x7F
+    offset = 2
+    
+    if length == 126:
+        if len(buffer) < 4:
+            return None
+        length = struct.unpack_from('!H', buffer, 2)[0]
+        offset = 4
+    elif length == 127:
+        if len(buffer) < 10:
+            return None
+        length = struct.unpack_from('!Q', buffer, 2)[0]
+        offset = 10
+    
+    if opcode >= OP_CLOSE and (length > 125 or not fin):
+        raise WebSocketError(CLOSE_PROTOCOL_ERROR, 'Invalid control frame')
+    if length > WS_MAX_MESSAGE_SIZE:
+        raise WebSocketError(CLOSE_TOO_BIG, 'Message too big')
+    
+    end = offset + 4 + length
+    if len(buffer) < end:
+        return None
+    
+    mask = bytes(buffer[offset:offset + 4])
+    payload = apply_mask(mask, bytes(buffer[offset + 4:end]))
+    return fin, opcode, payload, end
+
+
+class WebSocketClient(ClientHandler):
+    """
+    Tarayıcı bağlantısı - ChatServer için ClientHandler ile aynı arayüz
+    Mesaj işleme mantığı ClientHandler'dan gelir, sadece taşıma katmanı farklıdır:
+    okuma gateway thread'inde, işleme gateway worker'larında, yazma non-blocking
+    buffer üzerinden yapılır
+    """
+    
+    def __init__(self, client_socket, address, server, gateway):
+        super().__init__(client_socket, address, server)
+        self.gateway = gateway
+        self.inflight = 0            # worker kuyruğunda bekleyen mesaj sayısı (out_lock altında)
+        self.handshake_done = False
+        self.fragments = None        # parçalı mesaj: (opcode, bytearray)
+        self.closing = False
+        self.closed = False
+        self.write_requested = False
+        self.created = server.clock.monotonic()
+        self.last_seen = self.created
+        self.ping_sent = False
+    
+    def _setup_transport(self):
+        """OutputBuffer/FrameReader yerine gateway'in non-blocking buffer'ları"""
+        self.inbuf = bytearray()
+        self.outbuf = bytearray()     # socket'e verilmekte olan byte'lar (yarım frame dahil)
+        self.pending = LaneQueue()    # outbuf boşalınca öncelik sırasıyla alınır
+        self.out_lock = threading.Lock()
+    
+    def start(self):
+        """Thread yok - gateway'in selector'ü okur"""
+        self.running = True
+    
+    def stop(self, timeout=None):
+        """Bağlantıyı kapat (gateway thread'inde yapılır, timeout kullanılmaz)"""
+        self.running = False
+        self.gateway.request_close(self)
+    
+    def _close(self, timeout=None):
+        """
+        Bağlantıyı close frame'iyle kapat (gateway thread'inde yapılır)
+        Kuyruktaki frame'ler (ör. nickname reddi) önce gönderilir
+        """
+        self.running = False
+        self.gateway.request_shutdown(self)
+    
+    def queue_encoded(self, payload, lane, key):
+        """JSON satırını text frame olarak kuyruğa ekle (bağlantı kapalıysa 0 döner)"""
+        frame = self.gateway.text_frame(payload)
+        return len(frame) if self.queue(frame, lane, key) else 0
+    
+    def queue(self, data, lane=LANE_BULK, key=None):
+        """
+        Veriyi gönder; socket hemen kabul etmezse kalanını buffer'la
+        Bekleyen veri varsa frame öncelik sınıfının kuyruğuna girer
+        Returns:
+            bool: Bağlantı hâlâ açıksa True
+        """
+        with self.out_lock:
+            if self.closed:
+                return False
+            
+            if not self.outbuf and not self.pending:
+                try:
+                    sent = self.socket.send(data)
+                except BlockingIOError:
+                    sent = 0
+                except OSError:
+                    self.running = False
+                    self.gateway.request_close(self)
+                    return False
+                if sent == len(data):
+                    return True
+                self.outbuf += memoryview(data)[sent:]
+            elif self.pending.push(data, lane, key):
+                self.server.frames_superseded.inc()
+            
+            if len(self.outbuf) + self.pending.size > WS_MAX_BUFFERED:
+                # Yetişemeyen tarayıcı diğerlerini bekletmesin
+                self.running = False
+                self.gateway.request_close(self)
+                return False
+            
+            if self.write_requested:
+                return True
+            self.write_requested = True
+        
+        self.gateway.request_write(self)
+        return True
+    
+    def flush(self):
+        """
+        Buffer'daki veriyi yazmaya çalış (gateway thread'i)
+        Returns:
+            bool: Buffer boşaldıysa True
+        """
+        with self.out_lock:
+            while True:
+                if not self.outbuf and self.pending:
+                    self.outbuf += b''.join(self.pending.take(WRITE_COALESCE_MAX_FRAMES,
+                                                              WRITE_COALESCE_MAX_BYTES))
+                if not self.outbuf:
+                    self.write_requested = False
+                    return True
+                try:
+                    sent = self.socket.send(self.outbuf)
+                except BlockingIOError:
+                    return False
+                del self.outbuf[:sent]
+                if self.outbuf:
+                    return False
+
+
+class WebSocketGateway:
+    """
+    ws_port üzerinde dinleyen, binlerce eşzamanlı tarayıcı bağlantısını
+    tek selector thread'iyle yöneten gateway
+    Selector thread'i sadece I/O ve frame parse eder; mesajlar (katılım, rate
+    limit, broadcast, log) ve ayrılışlar worker'larda işlenir. Bir bağlantının
+    tüm işleri aynı worker kuyruğundan geçtiği için sırası korunur
+    """
+    
+    def __init__(self, host, port, chat_server, workers=WS_WORKERS):
+        self.host = host
+        self.port = port
+        self.chat_server = chat_server
+        self.running = False
+        self.thread = None
+        
+        # Worker kuyrukları: (conn, mesaj, decode_ns) veya ayrılış için (conn, None, 0)
+        self.jobs = [queue.SimpleQueue() for _ in range(max(workers, 1))]
+        self.workers = []
+        
+        self.selector = None        # start'ta kurulur (başlatılmayan gateway socket açmaz)
+        self.listen_socket = None
+        self.connections = set()
+        
+        # Diğer thread'lerden gelen yazma/kapatma istekleri
+        self.lock = threading.Lock()
+        self.pending_writes = set()
+        self.pending_closes = set()
+        self.pending_shutdowns = set()
+        self.wakeup_reader = self.wakeup_writer = None
+        
+        # Broadcast'te aynı payload tüm tarayıcılar için bir kez frame'lenir
+        self.last_frame = (None, None)
+    
+    def start(self):
+        """Dinlemeye başla"""
+        try:
+            self.listen_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.listen_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.listen_socket.bind((self.host, self.port))
+            self.listen_socket.listen(1024)
+            self.listen_socket.setblocking(False)
+        except OSError as e:
+            print(f"❌ Failed to start WebSocket gateway: {e}")
+            return False
+        
+        self.selector = selectors.DefaultSelector()
+        self.wakeup_reader, self.wakeup_writer = socket.socketpair()
+        self.wakeup_reader.setblocking(False)
+        self.wakeup_writer.setblocking(False)
+        self.selector.register(self.listen_socket, selectors.EVENT_READ, None)
+        self.selector.register(self.wakeup_reader, selectors.EVENT_READ, 'wakeup')
+        self.running = True
+        for index, jobs in enumerate(self.jobs):
+            worker = threading.Thread(target=self._work, args=(jobs,), daemon=True,
+                                      name=f'ws-worker-{index}')
+            worker.start()
+            self.workers.append(worker)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        
+        print(f"🔌 WebSocket gateway listening on ws://{self.host}:{self.port}")
+        return True
+    
+    def stop(self):
+        """Gateway'i durdur, tüm bağlantıları kapat"""
+        if not self.running:
+            return
+        self.running = False
+        self._wakeup()
+        if self.thread:
+            self.thread.join(timeout=5)
+        
+        # Selector kapanırken eklenen ayrılışlar dahil kuyrukları bitir
+        for jobs in self.jobs:
+            jobs.put(None)
+        for worker in self.workers:
+            worker.join(timeout=5)
+        self.workers = []
+    
+    def text_frame(self, payload):
+        """JSON satırını ('\\n' hariç) text frame'e çevir, son sonucu önbellekle"""
+        last_payload, last_frame = self.last_frame
+        if last_payload is payload:
+            return last_frame
+        frame = encode_frame(OP_TEXT, memoryview(payload)[:-1])
+        self.last_frame = (payload, frame)
+        return frame
+    
+    def request_write(self, conn):
+        """conn'un buffer'ı dolu - gateway thread'i EVENT_WRITE dinlesin"""
+        with self.lock:
+            self.pending_writes.add(conn)
+        self._wakeup()
+    
+    def request_close(self, conn):
+        """conn'u gateway thread'inde kapat"""
+        if conn.closed:
+            return
+        with self.lock:
+            self.pending_closes.add(conn)
+        self._wakeup()
+    
+    def request_shutdown(self, conn):
+        """conn'u gateway thread'inde close frame'iyle kapat (kick, EXIT)"""
+        with self.lock:
+            self.pending_shutdowns.add(conn)
+        self._wakeup()
+    
+    def _wakeup(self):
+        """select() çağrısını uyandır"""
+        writer = self.wakeup_writer
+        if writer is None:
+            return  # gateway başlatılmadı
+        try:
+            writer.send(b'\0')
+        except (BlockingIOError, OSError):
+            pass  # buffer dolu: zaten uyanacak
+    
+    def _run(self):
+        """Selector döngüsü"""
+        last_sweep = self.chat_server.clock.monotonic()
+        
+        while self.running:
+            for key, mask in self.selector.select(timeout=1.0):
+                if key.data is None:
+                    self._accept()
+                elif key.data == 'wakeup':
+                    self._drain_wakeup()
+                else:
+                    conn = key.data
+                    if mask & selectors.EVENT_READ:
+                        self._on_readable(conn)
+                    if mask & selectors.EVENT_WRITE and not conn.closed:
+                        self._on_writable(conn)
+            
+            self._apply_requests()
+            
+            now = self.chat_server.clock.monotonic()
+            if now - last_sweep >= 1:
+                self._sweep(now)
+                last_sweep = now
+        
+        for conn in list(self.connections):
+            self._drop(conn)
+        self.selector.close()
+        for sock in (self.listen_socket, self.wakeup_reader, self.wakeup_writer):
+            try:
+                sock.close()
+            except OSError:
+                pass
+    
+    def _accept(self):
+        """Bekleyen tüm bağlantıları kabul et"""
+        while True:
+            try:
+                sock, address = self.listen_socket.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                print(f"❌ Error accepting WebSocket client: {e}")
+                return
+            
+            sock.setblocking(False)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            conn = WebSocketClient(sock, address, self.chat_server, self)
+            conn.start()
+            self.connections.add(conn)
+            self.selector.register(sock, selectors.EVENT_READ, conn)
+            self.chat_server.connections_counter.inc()
+    
+    def _drain_wakeup(self):
+        """Uyandırma byte'larını boşalt"""
+        try:
+            while self.wakeup_reader.recv(4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+    
+    def _apply_requests(self):
+        """Diğer thread'lerden gelen istekleri uygula (selector tek thread'den değiştirilir)"""
+        with self.lock:
+            writes, self.pending_writes = self.pending_writes, set()
+            closes, self.pending_closes = self.pending_closes, set()
+            shutdowns, self.pending_shutdowns = self.pending_shutdowns, set()
+        
+        for conn in writes:
+            if not conn.closed and conn not in closes:
+                self.selector.modify(conn.socket, selectors.EVENT_READ | selectors.EVENT_WRITE, conn)
+        for conn in shutdowns:
+            if conn not in closes:
+                self._begin_close(conn, CLOSE_NORMAL)
+        for conn in closes:
+            self._drop(conn)
+    
+    def _on_readable(self, conn):
+        """Gelen veriyi oku ve tamamlanan frame'leri işle"""
+        try:
+            data = conn.socket.recv(65536)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            self._drop(conn)
+            return
+        
+        if not data:
+            self._drop(conn)
+            return
+        
+        self.chat_server.bytes_received.inc(len(data))
+        conn.last_seen = self.chat_server.clock.monotonic()
+        conn.ping_sent = False
+        if conn.closing:
+            return
+        conn.inbuf += data
+        
+        try:
+            if not conn.handshake_done and not self._handshake(conn):
+                return
+            self._process_frames(conn)
+        except WebSocketError as e:
+            self._begin_close(conn, e.code, e.reason)
+    
+    def _on_writable(self, conn):
+        """Buffer'daki veriyi yaz, boşaldıysa sadece okumaya dön"""
+        try:
+            drained = conn.flush()
+        except OSError:
+            self._drop(conn)
+            return
+        
+        if drained:
+            if conn.closing:
+                self._drop(conn)
+            else:
+                self.selector.modify(conn.socket, selectors.EVENT_READ, conn)
+    
+    def _handshake(self, conn):
+        """
+        HTTP Upgrade isteğini işle
+        Returns:
+            bool: Handshake tamamlandıysa True
+        """
+        end = conn.inbuf.find(b'\r\n\r\n')
+        if end < 0:
+            if len(conn.inbuf) > MAX_HANDSHAKE_SIZE:
+                self._reject(conn, '431 Request Header Fields Too Large')
+            return False
+        
+        request = bytes(conn.inbuf[:end]).decode('latin-1')
+        del conn.inbuf[:end + 4]
+        
+        lines = request.split('\r\n')
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        
+        connection_tokens = [t.strip().lower() for t in headers.get('connection', '').split(',')]
+        if (not lines[0].startswith('GET ')
+                or headers.get('upgrade', '').lower() != 'websocket'
+                or 'upgrade' not in connection_tokens
+                or not headers.get('sec-websocket-key')):
+            self._reject(conn, '400 Bad Request')
+            return False
+        
+        if headers.get('sec-websocket-version') != '13':
+            self._reject(conn, '426 Upgrade Required', 'Sec-WebSocket-Version: 13\r\n')
+            return False
+        
+        conn.queue((
+            'HTTP/1.1 101 Switching Protocols\r\n'
+            'Upgrade: websocket\r\n'
+            'Connection: Upgrade\r\n'
+            f"Sec-WebSocket-Accept: {accept_key(headers['sec-websocket-key'])}\r\n"
+            '\r\n'
+        ).encode('ascii'))
+        conn.handshake_done = True
+        return True
+    
+    def _reject(self, conn, status, extra_headers=''):
+        """Handshake'i HTTP hatasıyla reddet"""
+        conn.queue((f"HTTP/1.1 {status}\r\n{extra_headers}"
+                    "Content-Length: 0\r\nConnection: close\r\n\r\n").encode('ascii'))
+        conn.closing = True
+        self._finish_if_flushed(conn)
+    
+    def _process_frames(self, conn):
+        """Buffer'daki tüm tam frame'leri işle"""
+        while conn.running and not conn.closing:
+            frame = parse_frame(conn.inbuf)
+            if frame is None:
+                return
+            fin, opcode, payload, consumed = frame
+            del conn.inbuf[:consumed]
+            
+            if opcode == OP_PING:
+                conn.queue(encode_frame(OP_PONG, payload), LANE_CONTROL)
+            elif opcode == OP_PONG:
+                pass
+            elif opcode == OP_CLOSE:
+                code = CLOSE_NORMAL
+                if payload:
+                    # Gövde varsa en az 2 byte'lık durum kodu ve UTF-8 sebep olmalı (RFC 6455 5.5.1)
+                    if len(payload) < 2:
+                        raise WebSocketError(CLOSE_PROTOCOL_ERROR, 'Invalid close frame')
+                    code = struct.unpack('!H', payload[:2])[0]
+                    if not valid_close_code(code):
+                        raise WebSocketError(CLOSE_PROTOCOL_ERROR, 'Invalid close code')
+                    try:
+                        bytes(payload[2:]).decode('utf-8')
+                    except UnicodeDecodeError:
+                        raise WebSocketError(CLOSE_INVALID_DATA, 'Invalid close reason')
+                self._begin_close(conn, code)
+                return
+            elif opcode == OP_CONTINUATION:
+                if conn.fragments is None:
+                    raise WebSocketError(CLOSE_PROTOCOL_ERROR, 'Unexpected continuation')
+                conn.fragments[1].extend(payload)
+                if len(conn.fragments[1]) > WS_MAX_MESSAGE_SIZE:
+                    raise WebSocketError(CLOSE_TOO_BIG, 'Message too big')
+                if fin:
+                    first_opcode, data = conn.fragments
+                    conn.fragments = None
+                    self._on_data(conn, first_opcode, bytes(data))
+            elif opcode in (OP_TEXT, OP_BINARY):
+                if conn.fragments is not None:
+                    raise WebSocketError(CLOSE_PROTOCOL_ERROR, 'Expected continuation')
+                if fin:
+                    self._on_data(conn, opcode, payload)
+                else:
+                    conn.fragments = (opcode, bytearray(payload))
+            else:
+                raise WebSocketError(CLOSE_PROTOCOL_ERROR, 'Unknown opcode')
+    
+    def _on_data(self, conn, opcode, payload):
+        """Tam bir chat mesajı geldi - decode et ve bağlantının worker'ına ver"""
+        if opcode != OP_TEXT:
+            raise WebSocketError(CLOSE_UNSUPPORTED, 'Only text messages are supported')
+        
+        started = time.perf_counter_ns()
+        try:
+            message = Message.from_dict(json.loads(payload.decode('utf-8')))
+        except (ValueError, AttributeError):
+            raise WebSocketError(CLOSE_INVALID_DATA, 'Invalid JSON message')
+        decode_ns = time.perf_counter_ns() - started
+        self.chat_server.frames_received.labels(str(message.type)).inc()
+        if self.chat_server.capture:
+            self.chat_server.capture.record_frame(conn, message)
+        
+        with conn.out_lock:
+            conn.inflight += 1
+            backlog = conn.inflight > WS_MAX_PENDING_MESSAGES
+        if backlog:
+            # İşlenenden hızlı gönderen bağlantı worker kuyruğunu şişirmesin
+            raise WebSocketError(CLOSE_TRY_AGAIN, 'Too many pending messages')
+        self._jobs_for(conn).put((conn, message, decode_ns))
+    
+    def _jobs_for(self, conn):
+        return self.jobs[conn.conn_id % len(self.jobs)]
+    
+    def _work(self, jobs):
+        """Worker döngüsü - mesajları TCP client'larıyla aynı yoldan işle"""
+        while True:
+            item = jobs.get()
+            if item is None:
+                return
+            
+            conn, message, decode_ns = item
+            try:
+                if message is None:
+                    # Bağlantı kapandı: katılımdan sonra sırayla odadan çıkar
+                    if conn.nickname:
+                        self.chat_server.unregister_client(conn)
+                        self.chat_server.broadcast_leave(conn.nickname)
+                    continue
+                
+                with conn.out_lock:
+                    conn.inflight -= 1
+                if not conn.running:
+                    continue  # kick, EXIT veya kapanmış bağlantı: kalan mesajlar işlenmez
+                
+                conn._record_decode(decode_ns)
+                if conn.nickname is None:
+                    conn._join(message)
+                else:
+                    conn._process_message(message)
+                
+                # Kick veya EXIT sonrası bağlantıyı düzgünce kapat
+                if not conn.running and not conn.closed:
+                    self.request_shutdown(conn)
+            except Exception as e:
+                print(f"❌ Error handling WebSocket client {conn.nickname}: {e}")
+    
+    def _begin_close(self, conn, code, reason=''):
+        """Close frame gönder, buffer boşalınca bağlantıyı kapat"""
+        if conn.closing or conn.closed:
+            return
+        conn.running = False
+        conn.queue(encode_frame(OP_CLOSE, struct.pack('!H', code) + reason.encode('utf-8')[:120]))
+        conn.closing = True
+        self._finish_if_flushed(conn)
+    
+    def _finish_if_flushed(self, conn):
+        """Gönderilecek veri kalmadıysa hemen kapat"""
+        with conn.out_lock:
+            pending = bool(conn.outbuf) or bool(conn.pending)
+        if not pending:
+            self._drop(conn)
+    
+    def _drop(self, conn):
+        """Bağlantıyı kapat ve kullanıcıyı odadan çıkar (gateway thread'i)"""
+        if conn.closed:
+            return
+        with conn.out_lock:
+            conn.closed = True
+        conn.running = False
+        
+        try:
+            self.selector.unregister(conn.socket)
+        except (KeyError, ValueError):
+            pass
+        try:
+            conn.socket.close()
+        except OSError:
+            pass
+        self.connections.discard(conn)
+        if self.chat_server.capture:
+            self.chat_server.capture.record_close(conn)
+        
+        # Ayrılış, bağlantının bekleyen mesajlarından sonra worker'da işlenir
+        self._jobs_for(conn).put((conn, None, 0))
+    
+    def _sweep(self, now):
+        """Zaman aşımları ve keep-alive ping'leri"""
+        for conn in list(self.connections):
+            if not conn.handshake_done:
+                if now - conn.created > WS_HANDSHAKE_TIMEOUT:
+                    self._drop(conn)
+            elif conn.closing:
+                if now - conn.last_seen > 5:
+                    self._drop(conn)
+            else:
+                idle = now - conn.last_seen
+                if idle > WS_PING_INTERVAL * 2:
+                    self._drop(conn)
+                elif idle > WS_PING_INTERVAL and not conn.ping_sent:
+                    conn.ping_sent = True
+                    conn.queue(encode_frame(OP_PING, b''), LANE_CONTROL)